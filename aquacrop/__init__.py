@@ -1,2 +1,58 @@
-
 __version__ = "0.2"
+
+import importlib
+
+# Submodules (and the names most commonly used from them) are imported on
+# first access so that `import aquacrop` does not pull in pandas, numba and
+# the compiled model until they are needed.
+_submodules = {
+    "build",
+    "cache",
+    "calibration",
+    "classes",
+    "comparison",
+    "core",
+    "crops",
+    "data",
+    "discretization",
+    "engine",
+    "env",
+    "initialize",
+    "lars",
+    "profiling",
+    "sensitivity",
+    "solution",
+    "spatial",
+    "sweep",
+    "timestep",
+}
+
+_lazy_names = {
+    "AquaCropModel": "core",
+    "get_data": "core",
+    "get_filepath": "core",
+    "list_data": "core",
+    "prepare_weather": "core",
+    "CropClass": "classes",
+    "FieldMngtClass": "classes",
+    "GwClass": "classes",
+    "InitWCClass": "classes",
+    "IrrMngtClass": "classes",
+    "SoilClass": "classes",
+    "prepare_lars_weather": "lars",
+    "select_lars_wdf": "lars",
+    "planting_date_sweep": "sweep",
+}
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _lazy_names:
+        module = importlib.import_module(f".{_lazy_names[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules | set(_lazy_names))
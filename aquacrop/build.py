@@ -0,0 +1,105 @@
+"""
+Build the compiled model kernels
+
+    python -m aquacrop.build          # AOT compile solution_aot (falls back to --jit)
+    python -m aquacrop.build --jit    # only warm the numba.njit on-disk cache
+"""
+
+__all__ = ["build_aot", "warm_jit_cache", "main"]
+
+# Cell
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+
+# short model run that calls every kernel so that they all get compiled
+_warmup_script = """
+from aquacrop.classes import SoilClass, CropClass, InitWCClass, IrrMngtClass
+from aquacrop.core import prepare_weather, get_filepath, AquaCropModel
+from aquacrop.engine import engine_info
+
+weather_data = prepare_weather(get_filepath("tunis_climate.txt"))
+for crop, irr in [("Wheat", 1), ("WheatGDD", 0)]:
+    model = AquaCropModel("1979/10/01", "1980/09/30", weather_data, SoilClass("SandyLoam"),
+                          CropClass(crop, PlantingDate="10/01"), InitWCClass(value=["FC"]),
+                          IrrMngt=IrrMngtClass(IrrMethod=irr, SMT=[70] * 4))
+    model.initialize()
+    model.step(till_termination=True)
+
+info = engine_info()
+print(info["backend"], info["compile_time"])
+"""
+
+
+# Cell
+def build_aot():
+    """
+    Function to ahead-of-time compile the model kernels into `solution_aot`
+    (requires a C compiler)
+
+    *Returns:*
+
+    `ok` : `bool` : whether the build succeeded
+
+    """
+    return subprocess.call([sys.executable, "solution.py"], cwd=_package_dir) == 0
+
+
+# Cell
+def warm_jit_cache():
+    """
+    Function to compile the model kernels with `numba.njit` and store them in
+    the on-disk cache so later runs without `solution_aot` start quickly
+
+    *Returns:*
+
+    `backend` : `str` : backend that was used (`jit`)
+
+    `compile_time` : `float` : time (s) spent compiling
+
+    """
+    env = dict(os.environ, AQUACROP_ENGINE="jit")
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _warmup_script],
+        cwd=os.path.dirname(_package_dir),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    backend, compile_time = out.stdout.split()[-2:]
+
+    return backend, float(compile_time)
+
+
+# Cell
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m aquacrop.build", description="Build the compiled model kernels"
+    )
+    parser.add_argument(
+        "--jit",
+        action="store_true",
+        help="skip the AOT build and only warm the numba.njit on-disk cache",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.jit:
+        start = time.perf_counter()
+        if build_aot():
+            print(f"backend: aot (compiled in {round(time.perf_counter() - start, 1)} s)")
+            return 0
+
+        print("AOT build failed, falling back to numba.njit")
+
+    backend, compile_time = warm_jit_cache()
+    print(f"backend: {backend} (compiled in {round(compile_time, 1)} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+__all__ = ["model_inputs", "fingerprint", "ResultCache"]
+
+# Cell
+from collections import OrderedDict
+import datetime
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from . import __version__
+
+# Cell
+# AquaCropModel attributes that the results depend on (the weather, `wdf`, is
+# only hashed over the simulation period)
+model_inputs = [
+    "SimStartTime",
+    "SimEndTime",
+    "Soil",
+    "Crop",
+    "InitWC",
+    "IrrMngt",
+    "FieldMngt",
+    "FallowFieldMngt",
+    "Groundwater",
+    "planting_dates",
+    "harvest_dates",
+    "CO2conc",
+    "OffSeason",
+    "daily_outputs",
+    "water_balance_tol",
+]
+
+
+def _update(h, obj):
+    """
+    Function to add a canonical encoding of `obj` to the hash `h`: numbers
+    by value whatever their type, mappings and attributes in sorted order, and
+    arrays and data frames by dtype, shape and data
+    """
+    if obj is None or isinstance(obj, (bool, np.bool_)):
+        h.update(repr(None if obj is None else bool(obj)).encode())
+    elif isinstance(obj, (int, np.integer)):
+        h.update(b"i" + repr(int(obj)).encode())
+    elif isinstance(obj, (float, np.floating)):
+        h.update(b"f" + repr(float(obj)).encode())
+    elif isinstance(obj, str):
+        h.update(b"s%d:" % len(obj) + obj.encode())
+    elif isinstance(obj, (datetime.date, np.datetime64)):
+        h.update(b"t" + pd.Timestamp(obj).isoformat().encode())
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "O":
+            _update(h, obj.tolist())
+        else:
+            h.update(b"a" + obj.dtype.str.encode() + repr(obj.shape).encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, pd.DataFrame):
+        h.update(b"D")
+        _update(h, list(obj.columns))
+        for col in obj.columns:
+            _update(h, obj[col].values)
+    elif isinstance(obj, pd.Series):
+        h.update(b"S")
+        _update(h, obj.values)
+    elif isinstance(obj, dict):
+        h.update(b"{%d" % len(obj))
+        for key in sorted(obj, key=str):
+            _update(h, str(key))
+            _update(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[%d" % len(obj))
+        for item in obj:
+            _update(h, item)
+    elif hasattr(obj, "__dict__"):
+        h.update(b"o" + type(obj).__qualname__.encode())
+        _update(h, vars(obj))
+    else:
+        h.update(b"r" + repr(obj).encode())
+
+
+def fingerprint(model):
+    """
+    Function to get a key of the inputs of a model (see `model_inputs`), its
+    weather over the simulation period and the package version: models with
+    the same fingerprint give the same results
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : model (not initialized)
+
+    *Returns:*
+
+    `key` : `str` : SHA-256 hex digest
+
+    """
+    h = hashlib.sha256()
+    _update(h, __version__)
+    for name in model_inputs:
+        _update(h, name)
+        _update(h, getattr(model, name))
+
+    wdf = model.wdf
+    dates = wdf.Date
+    period = (dates >= pd.to_datetime(model.SimStartTime)) & (
+        dates <= pd.to_datetime(model.SimEndTime)
+    )
+    _update(h, wdf[period.values])
+
+    return h.hexdigest()
+
+
+# Cell
+class ResultCache:
+    """
+    Cache of model outputs keyed by the model's `fingerprint`, kept in memory
+    and (if a directory is given) on disk. Least recently used results are
+    evicted once the memory or the directory holds more than its size limit.
+    The results on disk are shared by every cache using the directory
+
+    **Attributes**:\n
+
+    `path` : `str` : directory of the results on disk (`None` to only keep them in memory)
+
+    `max_memory` : `int` : size limit (bytes) of the results in memory
+
+    `max_disk` : `int` : size limit (bytes) of the results on disk
+
+    `hits` : `int` : number of runs found in the cache
+
+    `memory_hits` : `int` : number of runs found in memory
+
+    `disk_hits` : `int` : number of runs found on disk
+
+    `misses` : `int` : number of runs that were simulated
+
+    `evictions` : `int` : number of results evicted from memory or disk
+
+    `memory_bytes` : `int` : size (bytes) of the results in memory
+
+    """
+
+    def __init__(self, path=None, max_memory=2 ** 28, max_disk=2 ** 30):
+
+        self.path = path
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+        # pickled outputs by key, least recently used first
+        self._memory = OrderedDict()
+        self.memory_bytes = 0
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".pkl")
+
+    def _disk_files(self):
+        """
+        Function to list the results on disk, least recently used first
+        """
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        return sorted(files)
+
+    def _keep(self, key, data):
+        """
+        Function to keep pickled outputs in memory, evicting the least
+        recently used results over the size limit
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        if len(data) > self.max_memory:
+            return
+
+        self._memory[key] = data
+        self.memory_bytes += len(data)
+        while self.memory_bytes > self.max_memory:
+            _, old = self._memory.popitem(last=False)
+            self.memory_bytes -= len(old)
+            self.evictions += 1
+
+    def get(self, key):
+        """
+        Function to get the outputs of a run
+
+        *Arguments:*\n
+
+        `key` : `str` : fingerprint of the model
+
+        *Returns:*
+
+        `Outputs` : `OutputClass` : copy of the outputs (`None` if not in the cache)
+
+        """
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        elif self.path is not None and os.path.exists(self._file(key)):
+            try:
+                with open(self._file(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._file(key))
+            except FileNotFoundError:
+                # evicted by another cache using the directory
+                return None
+            self._keep(key, data)
+            self.disk_hits += 1
+        else:
+            return None
+
+        self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key, Outputs):
+        """
+        Function to add the outputs of a run to the cache
+
+        *Arguments:*\n
+
+        `key` : `str` : fingerprint of the model
+
+        `Outputs` : `OutputClass` : outputs of the model run till termination
+
+        """
+        data = pickle.dumps(Outputs, protocol=pickle.HIGHEST_PROTOCOL)
+        self._keep(key, data)
+
+        if self.path is not None and len(data) <= self.max_disk:
+            # written to a temporary file first so that a result is never read
+            # half-written
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+
+            files = self._disk_files()
+            size = sum(f[1] for f in files)
+            for _, file_size, filepath in files:
+                if size <= self.max_disk:
+                    break
+                try:
+                    os.remove(filepath)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                size -= file_size
+
+    def run(self, model):
+        """
+        Function to get the outputs of a model run till termination, from the
+        cache if the same inputs were run before. A model found in the cache is
+        not initialized, only its `Outputs` are set
+
+        *Arguments:*\n
+
+        `model` : `AquaCropModel` : model (not initialized)
+
+        *Returns:*
+
+        `Outputs` : `OutputClass` : outputs of the model
+
+        """
+        key = fingerprint(model)
+        Outputs = self.get(key)
+        if Outputs is None:
+            self.misses += 1
+            model.initialize()
+            model.step(till_termination=True)
+            self.put(key, model.Outputs)
+        else:
+            model.Outputs = Outputs
+
+        return model.Outputs
+
+    def metrics(self):
+        """
+        Function to get the hits, misses and size of the cache
+
+        *Returns:*
+
+        `metrics` : `dict` : number of hits (all, memory, disk), misses and evictions, hit rate, and number and size (bytes) of the results in memory and on disk
+
+        """
+        files = self._disk_files() if self.path is not None else []
+        requests = self.hits + self.misses
+
+        return dict(
+            hits=self.hits,
+            memory_hits=self.memory_hits,
+            disk_hits=self.disk_hits,
+            misses=self.misses,
+            hit_rate=self.hits / requests if requests else 0.0,
+            evictions=self.evictions,
+            memory_entries=len(self._memory),
+            memory_bytes=self.memory_bytes,
+            disk_entries=len(files),
+            disk_bytes=sum(f[1] for f in files),
+        )
+
+    def clear(self):
+        """
+        Function to remove every result from memory and disk
+        """
+        self._memory.clear()
+        self.memory_bytes = 0
+        if self.path is not None:
+            for _, _, filepath in self._disk_files():
+                os.remove(filepath)
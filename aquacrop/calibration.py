@@ -0,0 +1,265 @@
+__all__ = ["CalibrationSiteClass", "site_error", "site_fingerprint", "calibrate"]
+
+# Cell
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import _update, fingerprint
+from .sensitivity import run_sample
+
+
+# Cell
+class CalibrationSiteClass:
+    """
+    Observations of one site (a model of a field over one or more seasons) to
+    calibrate the model against
+
+    **Attributes**:\n
+
+    `model` : `AquaCropModel` : model of the site (not initialized), calibrated parameters are set on copies of it
+
+    `yields` : `pandas.Series` : observed yield (tonne/ha) indexed by season (`Season` of `Outputs.Final`)
+
+    `daily` : `pandas.DataFrame` : observed daily values indexed by date, with columns of `Outputs.Water` or `Outputs.Growth` (e.g. `th1`, `CC`), missing values are `NaN`
+
+    `weight` : `float` : weight of the site in the objective
+
+    """
+
+    def __init__(self, model, yields=None, daily=None, weight=1.0):
+
+        self.model = model
+        self.yields = yields
+        self.daily = daily
+        self.weight = weight
+
+
+def _nrmse(observed, simulated):
+    """
+    Function to get the root mean square error normalised by the mean observed
+    value, ignoring missing observations
+    """
+    observed = np.asarray(observed, dtype=float)
+    simulated = np.asarray(simulated, dtype=float)
+    mask = ~np.isnan(observed)
+    if np.isnan(simulated[mask]).any():
+        return np.inf
+
+    return np.sqrt(np.mean((simulated[mask] - observed[mask]) ** 2)) / np.abs(observed[mask]).mean()
+
+
+def site_error(model, site):
+    """
+    Function to get the error of a model run at a site: the weighted sum of the
+    normalised root mean square errors (RMSE/mean observed value) of the
+    seasonal yields and of each observed daily variable.
+    Seasons that were not harvested give an infinite error
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : model of the site run till termination
+
+    `site` : `CalibrationSiteClass` : observations of the site
+
+    *Returns:*
+
+    `error` : `float` : error
+
+    """
+    Outputs = model.Outputs
+    assert (
+        site.daily is None or Outputs.Daily
+    ), "daily observations need a model run with daily outputs (daily_outputs=True)"
+    errors = []
+
+    if site.yields is not None:
+        Final = Outputs.Final.set_index(Outputs.Final.Season.astype(int))
+        simulated = Final["Yield (tonne/ha)"].astype(float).reindex(site.yields.index)
+        errors.append(_nrmse(site.yields.values, simulated.values))
+
+    if site.daily is not None:
+        steps = model.ClockStruct.TimeSpan.get_indexer(pd.to_datetime(site.daily.index))
+        assert (steps >= 0).all(), "observation dates must be in the simulation period"
+        for col in site.daily.columns:
+            table = Outputs.Water if col in Outputs.Water.columns else Outputs.Growth
+            errors.append(_nrmse(site.daily[col].values, table[col].values[steps]))
+
+    return site.weight * sum(errors)
+
+
+def site_fingerprint(site):
+    """
+    Function to get a key of a site: the `fingerprint` of its model and its
+    observations and weight. Sites with the same key give the same errors
+
+    *Arguments:*\n
+
+    `site` : `CalibrationSiteClass` : observations of the site
+
+    *Returns:*
+
+    `key` : `str` : SHA-256 hex digest
+
+    """
+    h = hashlib.sha256()
+    _update(h, fingerprint(site.model))
+    for observations in [site.yields, site.daily]:
+        _update(h, observations)
+        if observations is not None:
+            _update(h, observations.index.values)
+    _update(h, site.weight)
+
+    return h.hexdigest()
+
+
+def _site_task(site, names, values):
+    """
+    Function to get the error of a site for one set of parameter values
+    """
+    return site_error(run_sample(site.model, names, values), site)
+
+
+# Cell
+def calibrate(
+    sites,
+    problem,
+    popsize=10,
+    maxiter=50,
+    mutation=0.7,
+    recombination=0.9,
+    tol=0.01,
+    decimals=None,
+    cache=None,
+    n_jobs=None,
+    seed=None,
+):
+    """
+    Function to fit model parameters to observations at a number of sites with
+    differential evolution (rand/1/bin), the objective being the sum of the errors
+    of each site (`site_error`).
+
+    All trial points of a generation are independent, so every (point, site)
+    run of a generation is done in parallel. Errors are cached by parameter names,
+    site (`site_fingerprint`) and point (parameter values rounded to `decimals`, if
+    given, so that points close to each other are only run once); pass the same
+    `cache` dictionary to reuse runs across calls, also with other sites or problems
+
+    *Arguments:*\n
+
+    `sites` : `list` : observations (`CalibrationSiteClass`) of each site
+
+    `problem` : `dict` : `"names"`: parameter names (see `sensitivity.set_parameter`) and `"bounds"`: [lower, upper] bound of each parameter
+
+    `popsize` : `int` : population size (times the number of parameters)
+
+    `maxiter` : `int` : maximum number of generations
+
+    `mutation` : `float` : differential weight
+
+    `recombination` : `float` : crossover probability
+
+    `tol` : `float` : relative tolerance of the spread of the objective in the population to stop at
+
+    `decimals` : `int` : number of decimals parameter values are rounded to
+
+    `cache` : `dict` : error of each (parameter names, site fingerprint, point), updated with the new runs
+
+    `n_jobs` : `int` : number of processes (default: number of processors, 1 runs
+    everything in the current process)
+
+    `seed` : `int` : seed of the random numbers
+
+    *Returns:*
+
+    `best` : `pandas.Series` : best parameter values
+
+    `history` : `pandas.DataFrame` : parameter values, error of each site and objective of every point evaluated (sorted by objective)
+
+    """
+    names = tuple(problem["names"])
+    bounds = np.asarray(problem["bounds"], dtype=float)
+    lower, upper = bounds[:, 0], bounds[:, 1]
+    d = len(names)
+    n = max(popsize * d, 4)
+    rng = np.random.default_rng(seed)
+    if cache is None:
+        cache = {}
+    site_keys = [site_fingerprint(site) for site in sites]
+    # error of each site of every point of this calibration
+    point_errors = {}
+
+    def snap(X):
+        X = np.clip(X, lower, upper)
+        return X if decimals is None else np.round(X, decimals)
+
+    def objectives(X, executor):
+        points = [tuple(x) for x in X]
+        new_points = [p for p in dict.fromkeys(points) if p not in point_errors]
+        tasks = [
+            (p, i)
+            for p in new_points
+            for i in range(len(sites))
+            if (names, site_keys[i], p) not in cache
+        ]
+        if tasks:
+            if executor is None:
+                errors = [_site_task(sites[i], list(names), p) for p, i in tasks]
+            else:
+                errors = executor.map(
+                    _site_task,
+                    [sites[i] for p, i in tasks],
+                    [list(names)] * len(tasks),
+                    [p for p, i in tasks],
+                )
+            for (p, i), error in zip(tasks, errors):
+                cache[(names, site_keys[i], p)] = error
+        for p in new_points:
+            point_errors[p] = np.array([cache[(names, key, p)] for key in site_keys])
+
+        return np.array([point_errors[p].sum() for p in points])
+
+    n_jobs = n_jobs or os.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs != 1 else None
+    try:
+        population = snap(lower + rng.random((n, d)) * (upper - lower))
+        fitness = objectives(population, executor)
+
+        for generation in range(maxiter):
+            if np.isfinite(fitness).all() and fitness.std() <= tol * np.abs(fitness.mean()):
+                break
+
+            # mutant of three other members of the population for each member
+            others = np.array(
+                [rng.choice(np.delete(np.arange(n), i), 3, replace=False) for i in range(n)]
+            )
+            mutants = population[others[:, 0]] + mutation * (
+                population[others[:, 1]] - population[others[:, 2]]
+            )
+
+            # binomial crossover, with at least one parameter from the mutant
+            cross = rng.random((n, d)) < recombination
+            cross[np.arange(n), rng.integers(0, d, n)] = True
+            trials = snap(np.where(cross, mutants, population))
+
+            trial_fitness = objectives(trials, executor)
+            better = trial_fitness <= fitness
+            population[better] = trials[better]
+            fitness[better] = trial_fitness[better]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    history = pd.DataFrame(list(point_errors.keys()), columns=list(names))
+    errors = np.array(list(point_errors.values()))
+    for i in range(len(sites)):
+        history[f"site {i}"] = errors[:, i]
+    history["objective"] = errors.sum(axis=1)
+    history = history.sort_values("objective", ignore_index=True)
+
+    best = pd.Series(population[np.argmin(fitness)], index=list(names))
+
+    return best, history
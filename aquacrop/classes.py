@@ -4,6 +4,9 @@ __all__ = [
     "ParamStructClass",
     "SoilClass",
     "CropClass",
+    "crop_defaults",
+    "crop_record_dtype",
+    "crop_records",
     "IrrMngtClass",
     "IrrMngtStruct",
     "spec",
@@ -50,9 +53,9 @@ from numba import float64, int64, boolean, types
 import typing
 
 try:
-    from .crops.crop_params import crop_params
+    from .crops.crop_params import crop_params, crop_catalog
 except:
-    from crops.crop_params import crop_params
+    from crops.crop_params import crop_params, crop_catalog
 
 
 # Cell
@@ -129,6 +132,30 @@ class OutputClass:
 
     `Final` : `pandas.DataFrame` : final stats
 
+    `Seasonal` : `pandas.DataFrame` : flux totals, yield and water productivity of each growing season
+
+    `Monthly` : `pandas.DataFrame` : flux totals of each month
+
+    `Weekly` : `pandas.DataFrame` : flux totals of each week (starting on Monday)
+
+    `Daily` : `bool` : keep the daily outputs (`Water`, `Flux` and `Growth` are `None` otherwise)
+
+    `SeasonTotals`, `MonthTotals`, `WeekTotals` : `np.array` : running totals of the fluxes in `flux_total_names` (see `init_flux_totals`)
+
+    `MonthIndex`, `WeekIndex` : `list` : row of the month and week totals of each time-step
+
+    `MonthStart`, `WeekStart` : `pandas.DatetimeIndex` : first day of each month and week
+
+    `WaterBalance` : `pandas.DataFrame` : change in water stored, net inflow and residuals of the water balance check of each growing season
+
+    `BalanceErrors` : `pandas.DataFrame` : days flagged by the water balance check
+
+    `BalanceTol` : `float` : largest daily water balance residual (mm) not flagged (`None` if the water balance is not checked)
+
+    `BalanceTotals` : `np.array` : running totals of the water balance check of each growing season (see `balance_total_names`)
+
+    `BalanceDays` : `list` : time-step, season, change in water stored, net inflow and residual of each flagged day
+
     """
 
     def __init__(self):
@@ -137,6 +164,22 @@ class OutputClass:
         self.Flux = []
         self.Growth = []
         self.Final = []
+        self.Seasonal = None
+        self.Monthly = None
+        self.Weekly = None
+        self.Daily = True
+        self.SeasonTotals = None
+        self.MonthTotals = None
+        self.WeekTotals = None
+        self.MonthIndex = None
+        self.WeekIndex = None
+        self.MonthStart = None
+        self.WeekStart = None
+        self.WaterBalance = None
+        self.BalanceErrors = None
+        self.BalanceTol = None
+        self.BalanceTotals = None
+        self.BalanceDays = []
 
 
 # Cell
@@ -159,6 +202,12 @@ class ParamStructClass:
 
     `CO2data` : `pd.Series` : CO2 data indexed by year
 
+    `CO2years` : `np.array` : simulation years
+
+    `CO2conc` : `np.array` : CO2 concentration for each simulation year
+
+    `fCO2data` : `dict` : WP adjustment for each simulation year, keyed by crop (bsted, bface, fsink, WP)
+
     `CO2` : `CO2Class` : object containing reference and current co2 concentration
 
     `WaterTable` : `int` : Water table present (1=yes, 0=no)
@@ -169,13 +218,17 @@ class ParamStructClass:
 
     `WTMethod` : `str` : 'Constant' or 'Variable'
 
+    `IrrSchedule` : `pd.DataFrame` : input irrigation schedule indexed by date (IrrMethod 3)
+
     `CropList` : `list` : List of Crop Objects which contain paramaters for all the differnet crops used in simulations
 
+    `SeasonCrops` : `list` : index of the crop of each season in `CropList`
+
     `python_crop_list` : `list` : List of Crop Objects, one for each season
 
     `python_fallow_crop` : `CropClass` : Crop object for off season
 
-    `Seasonal_Crop_List` : `list` : List of CropStructs, one for each season (jit class objects)
+    `Seasonal_Crop_List` : `list` : CropStruct of each season (seasons of a crop share its CropStruct until they start and get their own copy)
 
     `crop_name_list` : `list` : List of crop names, one for each season
 
@@ -183,6 +236,12 @@ class ParamStructClass:
 
     `Fallow_Crop_Name` : `str` : name of fallow crop
 
+    `SeasonCalendars` : `np.array` : values that differ between seasons: crop calendar (calendar days) for crops in GDD mode and WP adjustment for CO2 (`fCO2`, set when the season starts)
+
+    `SeasonCalendarErrors` : `dict` : reason a season's GDD calendar could not be computed, keyed by season
+
+    `CropNT` : `tuple` : CropStruct of the current day and its `CropStructNT` (passed to the compiled functions), reset to `None` when a CropStruct is changed
+
         """
 
     def __init__(self):
@@ -200,6 +259,9 @@ class ParamStructClass:
 
         # calculated Co2 variables
         self.CO2data = []
+        self.CO2years = []
+        self.CO2conc = []
+        self.fCO2data = {}
         self.CO2 = 0
 
         # water table
@@ -208,14 +270,21 @@ class ParamStructClass:
         self.zGW_dates = []
         self.WTMethod = ""
 
+        # irrigation
+        self.IrrSchedule = None
+
         # crops
         self.CropList = []
+        self.SeasonCrops = []
         self.python_crop_list = []
         self.python_fallow_crop = 0
         self.Seasonal_Crop_List = []
         self.crop_name_list = []
         self.Fallow_Crop = 0
         self.Fallow_Crop_Name = ""
+        self.SeasonCalendars = []
+        self.SeasonCalendarErrors = {}
+        self.CropNT = None
 
 
 # Cell
@@ -571,6 +640,23 @@ class SoilClass:
 
         self.profile.Layer = self.profile.Layer.astype(int)
 
+    def extend_profile(self, zSoil):
+        """
+        Function to thicken the deepest compartments thinner than 0.25 m (by
+        0.1 m at a time) until the soil profile is at least `zSoil` deep
+
+        *Arguments:*\n
+
+        `zSoil` : `float` : minimum depth of the soil profile (m)
+
+        """
+        while self.zSoil < zSoil:
+            for i in self.profile.index[::-1]:
+                if self.profile.loc[i, "dz"] < 0.25:
+                    self.profile.loc[i, "dz"] += 0.1
+                    self.fill_nan()
+                    break
+
     def add_capillary_rise_params(self,):
         # Calculate capillary rise parameters for all soil layers
         # Only do calculation if water table is present. Calculations use equations
@@ -684,6 +770,102 @@ class SoilClass:
         self.profile = prof
 
 
+# Cell
+# Default program properties of every crop (should not be changed without expert knowledge)
+crop_defaults = {
+    "fshape_b": 13.8135,  # Shape factor describing the reduction in biomass production for insufficient growing degree days
+    "PctZmin": 70,  # Initial percentage of minimum effective rooting depth
+    "fshape_ex": -6,  # Shape factor describing the effects of water stress on root expansion
+    "ETadj": 1,  # Adjustment to water stress thresholds depending on daily ET0 (0 = No, 1 = Yes)
+    "Aer": 5,  # Vol (%) below saturation at which stress begins to occur due to deficient aeration
+    "LagAer": 3,  # Number of days lag before aeration stress affects crop growth
+    "beta": 12,  # Reduction (%) to p_lo3 when early canopy senescence is triggered
+    "a_Tr": 1,  # Exponent parameter for adjustment of Kcx once senescence is triggered
+    "GermThr": 0.2,  # Proportion of total water storage needed for crop to germinate
+    "CCmin": 0.05,  # Minimum canopy size below which yield formation cannot occur
+    "MaxFlowPct": 100 / 3,  # Proportion of total flowering time (%) at which peak flowering occurs
+    "HIini": 0.01,  # Initial harvest index
+    "bsted": 0.000138,  # WP co2 adjustment parameter given by Steduto et al. 2007
+    "bface": 0.001165,  # WP co2 adjustment parameter given by FACE experiments
+}
+
+# Crop parameters that can be passed to CropClass
+_crop_keys = frozenset(
+    list(crop_defaults)
+    + [
+        "Name",
+        "CropType",
+        "PlantMethod",
+        "CalendarType",
+        "SwitchGDD",
+        "PlantingDate",
+        "HarvestDate",
+        "Emergence",
+        "MaxRooting",
+        "Senescence",
+        "Maturity",
+        "HIstart",
+        "Flowering",
+        "YldForm",
+        "GDDmethod",
+        "Tbase",
+        "Tupp",
+        "PolHeatStress",
+        "Tmax_up",
+        "Tmax_lo",
+        "PolColdStress",
+        "Tmin_up",
+        "Tmin_lo",
+        "TrColdStress",
+        "GDD_up",
+        "GDD_lo",
+        "Zmin",
+        "Zmax",
+        "fshape_r",
+        "SxTopQ",
+        "SxBotQ",
+        "SeedSize",
+        "PlantPop",
+        "CCx",
+        "CDC",
+        "CGC",
+        "Kcb",
+        "fage",
+        "WP",
+        "WPy",
+        "fsink",
+        "HI0",
+        "dHI_pre",
+        "a_HI",
+        "b_HI",
+        "dHI0",
+        "Determinant",
+        "exc",
+        "p_up1",
+        "p_up2",
+        "p_up3",
+        "p_up4",
+        "p_lo1",
+        "p_lo2",
+        "p_lo3",
+        "p_lo4",
+        "fshape_w1",
+        "fshape_w2",
+        "fshape_w3",
+        "fshape_w4",
+        "CGC_CD",
+        "CDC_CD",
+        "EmergenceCD",
+        "MaxRootingCD",
+        "SenescenceCD",
+        "MaturityCD",
+        "HIstartCD",
+        "FloweringCD",
+        "YldFormCD",
+    ]
+)
+
+
 # Cell
 class CropClass:
     """
@@ -723,27 +905,7 @@ class CropClass:
         self.Name = c_name
 
         # Assign default program properties (should not be changed without expert knowledge)
-
-        self.fshape_b = 13.8135  # Shape factor describing the reduction in biomass production for insufficient growing degree days
-        self.PctZmin = 70  # Initial percentage of minimum effective rooting depth
-        self.fshape_ex = -6  # Shape factor describing the effects of water stress on root expansion
-        self.ETadj = (
-            1  # Adjustment to water stress thresholds depending on daily ET0 (0 = No, 1 = Yes)
-        )
-        self.Aer = (
-            5  # Vol (%) below saturation at which stress begins to occur due to deficient aeration
-        )
-        self.LagAer = 3  # Number of days lag before aeration stress affects crop growth
-        self.beta = 12  # Reduction (%) to p_lo3 when early canopy senescence is triggered
-        self.a_Tr = 1  # Exponent parameter for adjustment of Kcx once senescence is triggered
-        self.GermThr = 0.2  # Proportion of total water storage needed for crop to germinate
-        self.CCmin = 0.05  # Minimum canopy size below which yield formation cannot occur
-        self.MaxFlowPct = (
-            100 / 3
-        )  # Proportion of total flowering time (%) at which peak flowering occurs
-        self.HIini = 0.01  # Initial harvest index
-        self.bsted = 0.000138  # WP co2 adjustment parameter given by Steduto et al. 2007
-        self.bface = 0.001165  # WP co2 adjustment parameter given by FACE experiments
+        self.__dict__.update(crop_defaults)
 
         if c_name == "custom":
 
@@ -763,96 +925,42 @@ class CropClass:
         pre-defined crops: {crop_params.keys()}"
 
         # overide any pre-defined paramater with any passed by the user
-        allowed_keys = {
-            "fshape_b",
-            "PctZmin",
-            "fshape_ex",
-            "ETadj",
-            "Aer",
-            "LagAer",
-            "beta",
-            "a_Tr",
-            "GermThr",
-            "CCmin",
-            "MaxFlowPct",
-            "HIini",
-            "bsted",
-            "bface",
-            "Name",
-            "CropType",
-            "PlantMethod",
-            "CalendarType",
-            "SwitchGDD",
-            "PlantingDate",
-            "HarvestDate",
-            "Emergence",
-            "MaxRooting",
-            "Senescence",
-            "Maturity",
-            "HIstart",
-            "Flowering",
-            "YldForm",            
-            "GDDmethod",
-            "Tbase",
-            "Tupp",
-            "PolHeatStress",
-            "Tmax_up",
-            "Tmax_lo",
-            "PolColdStress",
-            "Tmin_up",
-            "Tmin_lo",
-            "TrColdStress",
-            "GDD_up",
-            "GDD_lo",
-            "Zmin",
-            "Zmax",
-            "fshape_r",
-            "SxTopQ",
-            "SxBotQ",
-            "SeedSize",
-            "PlantPop",
-            "CCx",
-            "CDC",
-            "CGC",
-            "Kcb",
-            "fage",
-            "WP",
-            "WPy",
-            "fsink",
-            "HI0",
-            "dHI_pre",
-            "a_HI",
-            "b_HI",
-            "dHI0",
-            "Determinant",
-            "exc",
-            "p_up1",
-            "p_up2",
-            "p_up3",
-            "p_up4",
-            "p_lo1",
-            "p_lo2",
-            "p_lo3",
-            "p_lo4",
-            "fshape_w1",
-            "fshape_w2",
-            "fshape_w3",
-            "fshape_w4",
-            "CGC_CD",
-            "CDC_CD",
-            "EmergenceCD",
-            "MaxRootingCD",
-            "SenescenceCD",
-            "MaturityCD",
-            "HIstartCD",
-            "FloweringCD",
-            "YldFormCD",
+        self.__dict__.update((k, v) for k, v in kwargs.items() if k in _crop_keys)
 
-        }
+        self.calculate_additional_params()
 
-        self.__dict__.update((k, v) for k, v in kwargs.items() if k in allowed_keys)
+    @classmethod
+    def from_record(cls, record, PlantingDate, HarvestDate=None):
+        """
+        Function to make a crop from a record of its parameters (a row of
+        `crop_records`), much faster than passing the parameters to `CropClass`.
+        Parameters not given by every crop in the catalog (e.g. `EmergenceCD`)
+        are left out if they are `NaN`
 
-        self.calculate_additional_params()
+        *Arguments:*\n
+
+        `record` : `numpy.void` : crop parameters (with the fields of `crop_record_dtype`)
+
+        `PlantingDate` : `str` : Planting Date (mm/dd)
+
+        `HarvestDate` : `str` : Latest Harvest Date (mm/dd)
+
+        *Returns:*
+
+        `crop` : `CropClass` : crop
+
+        """
+        crop = cls.__new__(cls)
+        params = crop.__dict__
+        params.update(zip(record.dtype.names, record.item()))
+        for k in _crop_optional:
+            if params[k] != params[k]:
+                del params[k]
+        crop.PlantingDate = PlantingDate
+        crop.HarvestDate = HarvestDate
+        crop.calculate_additional_params()
+
+        return crop
 
     def calculate_additional_params(self,):
 
@@ -904,6 +1012,82 @@ class CropClass:
 #         return (0.00558*(xx**0.63))-(0.000969*xx)-0.00383
 
 
+# Cell
+def _record_dtype():
+    """
+    Function to get the type of a crop record: the fields of the crop catalog
+    and the default program properties (`float64` unless integers in both)
+    """
+    fields = dict(crop_catalog.dtype.descr)
+    for k, v in crop_defaults.items():
+        if type(v) is int:
+            fields.setdefault(k, "<i8")
+        else:
+            fields[k] = "<f8"
+
+    return np.dtype(list(fields.items()))
+
+
+crop_record_dtype = _record_dtype()
+
+
+def _make_crop_table():
+    """
+    Function to make the record of each crop in the catalog, with the default
+    program properties where the catalog does not give them
+    """
+    table = np.zeros(len(crop_catalog), dtype=crop_record_dtype)
+    for k in crop_record_dtype.names:
+        if k in crop_catalog.dtype.names:
+            table[k] = crop_catalog[k]
+            if k in crop_defaults:
+                table[k][np.isnan(table[k])] = crop_defaults[k]
+        else:
+            table[k] = crop_defaults[k]
+
+    return table
+
+
+_crop_table = _make_crop_table()
+
+# parameters that some crops in the catalog do not give
+_crop_optional = [
+    k
+    for k in crop_catalog.dtype.names
+    if crop_catalog.dtype[k].kind == "f" and np.isnan(_crop_table[k]).any()
+]
+_crop_rows = {name: i for i, name in enumerate(_crop_table["Name"])}
+
+
+def crop_records(c_name, n=1, **kwargs):
+    """
+    Function to make `n` records of the parameters of a built-in crop, with
+    any parameter overridden by a value or an array of `n` values
+    (e.g. for parameter sweeps, see `CropClass.from_record`)
+
+    *Arguments:*\n
+
+    `c_name` : `str` : crop name (one of the built-in crops e.g. 'PaddyRice')
+
+    `n` : `int` : number of records
+
+    `kwargs` : parameters to override, as a value or `n` values
+
+    *Returns:*
+
+    `records` : `numpy.ndarray` : `n` records (`crop_record_dtype`)
+
+    """
+    assert c_name in _crop_rows, f"Crop name not defined in crop_params dictionary, \
+        use one of the pre-defined crops: {list(_crop_rows)}"
+    records = np.repeat(_crop_table[_crop_rows[c_name] : _crop_rows[c_name] + 1], n)
+    for k, v in kwargs.items():
+        assert k in crop_record_dtype.names, f"{k} is not a crop parameter"
+        records[k] = v
+
+    return records
+
+
 # Cell
 class IrrMngtClass:
 
@@ -1025,7 +1209,7 @@ class IrrMngtStruct:
 
     """
 
-    def __init__(self, sim_len):
+    def __init__(self, sim_len, cri_len=1):
         self.IrrMethod = 0
 
         self.WetSurf = 100.0
@@ -1602,6 +1786,9 @@ class InitCondClass:
         self.Depletion = 0
         self.TAW = 0
 
+        # root zone water summary for current th (see solution.root_zone_summary)
+        self.RootZone = None
+
 
 
 
@@ -1672,6 +1859,8 @@ SoilProfileNT_spec = [
     ("th_fc_Adj", float64[:]),
     ("aCR", float64[:]),
     ("bCR", float64[:]),
+    ("dthdt_s", float64[:]),
+    ("exp_s", float64[:]),
 ]
 
 
@@ -1695,6 +1884,10 @@ class SoilProfileClass:
 
     `zMid` : `list` :
 
+    `dthdt_s` : `list` : drainage ability at saturation
+
+    `exp_s` : `list` : exp(th_s - th_fc) - 1, used in drainage ability calculations
+
     """
 
     def __init__(self, length):
@@ -1716,6 +1909,8 @@ class SoilProfileClass:
         self.th_fc_Adj = np.zeros(length, dtype=np.float64)
         self.aCR = np.zeros(length, dtype=np.float64)
         self.bCR = np.zeros(length, dtype=np.float64)
+        self.dthdt_s = np.zeros(length, dtype=np.float64)
+        self.exp_s = np.zeros(length, dtype=np.float64)
 
 
 SoilProfileNT = typing.NamedTuple("SoilProfileNT", SoilProfileNT_spec)
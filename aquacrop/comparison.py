@@ -6,12 +6,10 @@ import sys
 _ = [sys.path.append(i) for i in [".", ".."]]
 
 # Cell
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from .core import *
 from .classes import *
-import seaborn as sns
 
 # Cell
 def run_comparison(model, name):
@@ -30,6 +28,10 @@ def run_comparison(model, name):
 
 
     """
+    # plotting libraries are slow to import so only load them when needed
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     Outputs = model.Outputs
 
     py = Outputs.Final.round(3)
@@ -4,6 +4,7 @@ import numpy as np
 import os
 import pandas as pd
 import sys
+from copy import copy, deepcopy
 
 [sys.path.append(i) for i in [".", ".."]]
 
@@ -11,6 +12,7 @@ import sys
 from .initialize import *
 from .timestep import *
 from .classes import *
+from .profiling import Profiler
 from aquacrop import data
 
 # Cell
@@ -82,6 +84,33 @@ def prepare_weather(weatherFilePath):
     return weather_df
 
 
+# Cell
+def _grow_rows(array, n):
+    """
+    Function to make sure an array has at least `n` rows. Arrays are grown to (at
+    least) twice their size, so extending a simulation one day at a time only
+    copies the array now and again
+
+    *Arguments:*\n
+
+    `array` : `np.array` :  array to grow
+
+    `n` : `int` :  number of rows needed
+
+    *Returns:*
+
+    `array` : `np.array` :  array with the same first rows and room for `n` rows
+
+    """
+    if len(array) >= n:
+        return array
+
+    new = np.zeros((max(n, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    new[: len(array)] = array
+
+    return new
+
+
 # Cell
 class AquaCropModel:
     def __init__(
@@ -99,6 +128,11 @@ class AquaCropModel:
         planting_dates=None,
         harvest_dates=None,
         CO2conc=None,
+        profile=False,
+        OffSeason=False,
+        checkpoint_interval=30,
+        daily_outputs=True,
+        water_balance_tol=None,
     ):
 
         self.SimStartTime = SimStartTime
@@ -110,6 +144,13 @@ class AquaCropModel:
         self.planting_dates = planting_dates
         self.harvest_dates = harvest_dates
         self.CO2conc = CO2conc
+        self.profile = profile
+        self.OffSeason = OffSeason
+        # days between the checkpoints that `update_weather` re-simulates
+        # from (`None` or 0 keeps only the checkpoint of the first day)
+        self.checkpoint_interval = checkpoint_interval
+        self.daily_outputs = daily_outputs
+        self.water_balance_tol = water_balance_tol
 
         self.IrrMngt = IrrMngt
         self.FieldMngt = FieldMngt
@@ -135,30 +176,52 @@ class AquaCropModel:
 
         """
 
+        # the parameter objects are changed as they are read (soil profile,
+        # crop calendar, irrigation schedule), so the model is set up from
+        # copies and its inputs stay as they were given (e.g. for `fingerprint`)
+        (Soil, Crop, InitWC, IrrMngt, FieldMngt, FallowFieldMngt, Groundwater) = deepcopy(
+            (
+                self.Soil,
+                self.Crop,
+                self.InitWC,
+                self.IrrMngt,
+                self.FieldMngt,
+                self.FallowFieldMngt,
+                self.Groundwater,
+            )
+        )
+
         # define model runtime
-        self.ClockStruct = read_clock_paramaters(self.SimStartTime, self.SimEndTime)
+        self.ClockStruct = read_clock_paramaters(
+            self.SimStartTime, self.SimEndTime, self.OffSeason
+        )
 
         # get weather data
         self.weather_df = read_weather_inputs(self.ClockStruct, self.wdf)
 
         # read model params
         self.ClockStruct, self.ParamStruct = read_model_parameters(
-            self.ClockStruct, self.Soil, self.Crop, self.weather_df
+            self.ClockStruct,
+            Soil,
+            Crop,
+            self.weather_df,
+            self.planting_dates,
+            self.harvest_dates,
         )
 
         # read irrigation management
         self.ParamStruct = read_irrigation_management(
-            self.ParamStruct, self.IrrMngt, self.ClockStruct
+            self.ParamStruct, IrrMngt, self.ClockStruct
         )
 
         # read field management
         self.ParamStruct = read_field_management(
-            self.ParamStruct, self.FieldMngt, self.FallowFieldMngt
+            self.ParamStruct, FieldMngt, FallowFieldMngt
         )
 
         # read groundwater table
         self.ParamStruct = read_groundwater_table(
-            self.ParamStruct, self.Groundwater, self.ClockStruct
+            self.ParamStruct, Groundwater, self.ClockStruct
         )
 
         # Compute additional variables
@@ -167,17 +230,24 @@ class AquaCropModel:
 
         # read, calculate inital conditions
         self.ParamStruct, self.InitCond = read_model_initial_conditions(
-            self.ParamStruct, self.ClockStruct, self.InitWC
+            self.ParamStruct, self.ClockStruct, InitWC
         )
 
         self.ParamStruct = create_soil_profile(self.ParamStruct)
 
         # self.InitCond.ParamStruct = self.ParamStruct
 
+        # without daily outputs each day is written to one row and only the
+        # seasonal, monthly and weekly totals are kept
         Outputs = OutputClass()
-        Outputs.Water = np.zeros((len(self.ClockStruct.TimeSpan), 3 + len(self.InitCond.th)))
-        Outputs.Flux = np.zeros((len(self.ClockStruct.TimeSpan), 16))
-        Outputs.Growth = np.zeros((len(self.ClockStruct.TimeSpan), 13))
+        Outputs.Daily = self.daily_outputs
+        # the water balance of each day is checked if a tolerance (mm) is given
+        Outputs.BalanceTol = self.water_balance_tol
+        nDays = len(self.ClockStruct.TimeSpan) if self.daily_outputs else 1
+        Outputs.Water = np.zeros((nDays, 3 + len(self.InitCond.th)))
+        Outputs.Flux = np.zeros((nDays, 16))
+        Outputs.Growth = np.zeros((nDays, 13))
+        init_flux_totals(Outputs, self.ClockStruct)
         Outputs.Final = pd.DataFrame(
             columns=[
                 "Season",
@@ -194,6 +264,24 @@ class AquaCropModel:
         # save model weather to InitCond
         self.weather = self.weather_df.values
 
+        # planting and harvest dates for the end year (used to extend the simulation)
+        self._season_dates = None
+
+        # time the model steps if profiling (original functions are used
+        # otherwise), every call is also recorded with `profile="trace"`
+        self._solution = solution
+        self._update_time = update_time
+        self.profiler = None
+        if self.profile:
+            self.profiler = Profiler(trace=self.profile == "trace")
+            self._solution = self.profiler.profile_solution(solution)
+            self._update_time = self.profiler.profile_update_time(update_time)
+
+        # state at the start of the simulation (and every `checkpoint_interval`
+        # days while stepping) to re-simulate from when the weather changes
+        self.checkpoints = {}
+        self._save_checkpoint()
+
         # return self.ClockStruct,self.InitCond,self.Outputs
         return
 
@@ -203,6 +291,9 @@ class AquaCropModel:
 
             while self.ClockStruct.ModelTermination == False:
 
+                if self.ClockStruct.TimeStepCounter >= self._next_checkpoint:
+                    self._save_checkpoint()
+
                 (
                     self.ClockStruct,
                     self.InitCond,
@@ -213,6 +304,9 @@ class AquaCropModel:
 
             for i in range(num_steps):
 
+                if self.ClockStruct.TimeStepCounter >= self._next_checkpoint:
+                    self._save_checkpoint()
+
                 (
                     self.ClockStruct,
                     self.InitCond,
@@ -238,7 +332,7 @@ class AquaCropModel:
         weather_step = self.weather[self.ClockStruct.TimeStepCounter]
 
         #%% Get model solution %%
-        NewCond, ParamStruct, Outputs = solution(
+        NewCond, ParamStruct, Outputs = self._solution(
             self.InitCond, self.ParamStruct, self.ClockStruct, weather_step, self.Outputs
         )
 
@@ -246,8 +340,381 @@ class AquaCropModel:
         ClockStruct = check_model_termination(self.ClockStruct, NewCond)
 
         #%% Update time step %%
-        ClockStruct, InitCond, ParamStruct, Outputs = update_time(
+        ClockStruct, InitCond, ParamStruct, Outputs = self._update_time(
             ClockStruct, NewCond, ParamStruct, Outputs, self.weather
         )
 
         return ClockStruct, InitCond, ParamStruct, Outputs
+
+    def _save_checkpoint(self):
+        """
+        Save the state that changes during the simulation at the start of the
+        current time-step
+        """
+        ClockStruct = self.ClockStruct
+        ParamStruct = self.ParamStruct
+        step = ClockStruct.TimeStepCounter
+
+        self.checkpoints[step] = dict(
+            TimeStepCounter=step,
+            SeasonCounter=ClockStruct.SeasonCounter,
+            StepStartTime=ClockStruct.StepStartTime,
+            StepEndTime=ClockStruct.StepEndTime,
+            InitCond=deepcopy(self.InitCond),
+            Seasonal_Crop_List=list(ParamStruct.Seasonal_Crop_List),
+            fCO2=ParamStruct.SeasonCalendars["fCO2"].copy(),
+            CurrentConc=ParamStruct.CO2.CurrentConc,
+            nFinal=len(self.Outputs.Final),
+            SeasonTotals=self.Outputs.SeasonTotals.copy(),
+            MonthTotals=self.Outputs.MonthTotals.copy(),
+            WeekTotals=self.Outputs.WeekTotals.copy(),
+            BalanceTotals=self.Outputs.BalanceTotals.copy(),
+            nBalanceDays=len(self.Outputs.BalanceDays),
+        )
+
+        if self.checkpoint_interval:
+            self._next_checkpoint = step + self.checkpoint_interval
+        else:
+            self._next_checkpoint = np.inf
+
+    def _restore_checkpoint(self, step):
+        """
+        Return the model to the state of the checkpoint at time-step `step`
+        (later checkpoints are removed)
+        """
+        ClockStruct = self.ClockStruct
+        ParamStruct = self.ParamStruct
+        Outputs = self.Outputs
+        checkpoint = self.checkpoints[step]
+
+        if ClockStruct.ModelTermination:
+            self._reopen_outputs()
+
+        # days that are not simulated again (e.g. a season ending earlier) are
+        # left as if never simulated
+        Outputs.Water[step:] = 0
+        Outputs.Flux[step:] = 0
+        Outputs.Growth[step:] = 0
+        Outputs.Final = Outputs.Final.iloc[: checkpoint["nFinal"]].copy()
+        del Outputs.BalanceDays[checkpoint["nBalanceDays"] :]
+        for name in ["SeasonTotals", "MonthTotals", "WeekTotals", "BalanceTotals"]:
+            totals = getattr(Outputs, name)
+            n = len(checkpoint[name])
+            totals[:n] = checkpoint[name]
+            totals[n:] = 0
+
+        ClockStruct.TimeStepCounter = checkpoint["TimeStepCounter"]
+        ClockStruct.SeasonCounter = checkpoint["SeasonCounter"]
+        ClockStruct.StepStartTime = checkpoint["StepStartTime"]
+        ClockStruct.StepEndTime = checkpoint["StepEndTime"]
+        ClockStruct.ModelTermination = False
+
+        self.InitCond = deepcopy(checkpoint["InitCond"])
+
+        # seasons added by extend_end_date since the checkpoint have not started
+        n = len(checkpoint["Seasonal_Crop_List"])
+        ParamStruct.Seasonal_Crop_List[:n] = checkpoint["Seasonal_Crop_List"]
+        ParamStruct.SeasonCalendars["fCO2"][:n] = checkpoint["fCO2"]
+        ParamStruct.CO2.CurrentConc = checkpoint["CurrentConc"]
+        ParamStruct.CropNT = None
+
+        self.checkpoints = {k: v for k, v in self.checkpoints.items() if k <= step}
+        self._save_checkpoint()
+
+    def _reopen_outputs(self):
+        """
+        Turn the outputs of a terminated model (converted to DataFrames) back
+        into the arrays that are written to while stepping
+        """
+        Outputs = self.Outputs
+        if Outputs.Daily:
+            Outputs.Water = Outputs.Water.values
+            Outputs.Flux = Outputs.Flux.values
+            Outputs.Growth = Outputs.Growth.values
+        else:
+            Outputs.Water = np.zeros((1, 3 + len(self.InitCond.th)))
+            Outputs.Flux = np.zeros((1, 16))
+            Outputs.Growth = np.zeros((1, 13))
+
+    def copy(self):
+        """
+        Copy an initialized model so that the copy can be run on its own, e.g.
+        for many cells or samples that start from the same initialization.
+
+        The copy has its own state, outputs, weather and checkpoints, and its own
+        copy of the parts of `ParamStruct` that the time-steps write to (crop of
+        each season, season calendars, CO2 and the crop cache). The rest of
+        `ParamStruct` (soil profile, crop list, tables) and the model inputs are
+        only read and are shared, replace them (not change them in place) to
+        change the copy
+
+        *Returns:*
+
+        `model` : `AquaCropModel` : copy of the model
+
+        """
+        model = copy(self)
+        model.ClockStruct = copy(self.ClockStruct)
+        model.InitCond = deepcopy(self.InitCond)
+        model.Outputs = deepcopy(self.Outputs)
+        model.weather = self.weather.copy()
+        model.checkpoints = dict(self.checkpoints)
+
+        model.ParamStruct = ParamStruct = copy(self.ParamStruct)
+        ParamStruct.Seasonal_Crop_List = list(ParamStruct.Seasonal_Crop_List)
+        ParamStruct.SeasonCalendars = ParamStruct.SeasonCalendars.copy()
+        ParamStruct.CO2 = copy(ParamStruct.CO2)
+        ParamStruct.CropNT = None
+
+        return model
+
+    def update_weather(self, wdf):
+        """
+        Replace the model's weather data, e.g. when a forecast is updated, and
+        re-simulate from the first day whose weather has changed so that the
+        model is back where it was (the same day, or terminated). The simulation
+        restarts from the latest checkpoint before that day (one every
+        `checkpoint_interval` days, 30 by default), outputs of earlier days
+        are kept.
+
+        GDD crop calendars are recomputed from the new temperatures: a season
+        whose calendar changes is re-simulated from before its planting date,
+        and the whole simulation is re-run if the calendar of a crop's first
+        season changes (it sets the crop's parameters)
+
+        *Arguments:*\n
+
+        `wdf` : `pandas.DataFrame` :  weather data (same format as `prepare_weather`) covering the simulation period
+
+        *Returns:*
+
+        `first` : `int` : first time-step whose results may change (`None` if the weather of the simulation period is unchanged)
+
+        """
+        ClockStruct = self.ClockStruct
+        ParamStruct = self.ParamStruct
+        n = ClockStruct.nSteps
+
+        weather_df = read_weather_inputs(ClockStruct, wdf)[self.weather_df.columns]
+        weather = weather_df.values
+        old = self.weather[:n]
+        changed = (weather != old).any(axis=1)
+        self.wdf = wdf
+        self.weather_df = weather_df
+        self.weather[:n] = weather
+        if not changed.any():
+            return None
+
+        first = int(np.argmax(changed))
+        temps = [self.weather_df.columns.get_loc(c) for c in ["MinTemp", "MaxTemp"]]
+        temp_changed = (weather[:, temps] != old[:, temps]).any(axis=1)
+
+        # days simulated so far, and where to stop re-simulating
+        terminated = ClockStruct.ModelTermination
+        target = ClockStruct.TimeStepCounter
+        simulated = target + 1 if terminated else target
+
+        def resimulate():
+            if terminated:
+                self.step(till_termination=True)
+            else:
+                while (
+                    self.ClockStruct.TimeStepCounter < target
+                    and not self.ClockStruct.ModelTermination
+                ):
+                    self.step()
+
+        # crop parameters converted to GDD from the weather of the crop's first
+        # season (see compute_crop_calander)
+        for i, crop in enumerate(ParamStruct.CropList):
+            if crop.CalendarType == 2 or crop.SwitchGDD == 1:
+                season = ParamStruct.SeasonCrops.index(i)
+                start = ClockStruct.TimeSpan.get_loc(ClockStruct.PlantingDates[season])
+                if temp_changed[start : start + 365].any():
+                    self.initialize()
+                    resimulate()
+                    return 0
+
+        # calendars of seasons that develop in GDD, a season that has started
+        # is re-simulated from before its planting date if its calendar changes
+        calendars = ParamStruct.SeasonCalendars.copy()
+        errors = ParamStruct.SeasonCalendarErrors
+        ParamStruct = compute_season_calendars(ParamStruct, ClockStruct, weather_df)
+        ParamStruct.SeasonCalendars["fCO2"] = calendars["fCO2"]
+        for season in range(ClockStruct.SeasonCounter + 1):
+            if (ParamStruct.SeasonCalendars[season] != calendars[season]) or (
+                ParamStruct.SeasonCalendarErrors.get(season) != errors.get(season)
+            ):
+                start = ClockStruct.TimeSpan.get_loc(ClockStruct.PlantingDates[season])
+                first = min(first, start - 1)
+
+        if first >= simulated:
+            return first
+        if first < min(self.checkpoints):
+            self.initialize()
+            resimulate()
+            return 0
+
+        self._restore_checkpoint(max(k for k in self.checkpoints if k <= first))
+        resimulate()
+
+        return first
+
+    def extend_weather(self, wdf):
+        """
+        Add weather data after the last day of the model's weather, e.g. when new
+        observations or forecasts arrive for an operational run. Days that the
+        model already has weather for are ignored. Use `extend_end_date` to
+        simulate the new days
+
+        *Arguments:*\n
+
+        `wdf` : `pandas.DataFrame` :  weather data (same format as `prepare_weather`)
+
+        """
+        last_date = self.wdf.Date.iloc[-1]
+        new = wdf[wdf.Date > last_date]
+        if len(new) == 0:
+            return
+
+        dates = pd.DatetimeIndex(new.Date)
+        assert dates[0] == last_date + np.timedelta64(1, "D"), "missing weather data"
+        assert (np.diff(dates.values) == np.timedelta64(1, "D")).all(), "missing weather data"
+
+        self.wdf = pd.concat([self.wdf, new[self.wdf.columns]], ignore_index=True)
+
+    def extend_end_date(self, SimEndTime=None):
+        """
+        Move the end of the simulation to a later date so that `step` continues
+        from the current conditions, also after the model has terminated at the
+        previous end date. Growing seasons that start before the new end date are
+        added. Weather data must cover the new end date (see `extend_weather`)
+
+        *Arguments:*\n
+
+        `SimEndTime` : `str` :  new simulation end date (default: last day of weather data)
+
+        """
+        ClockStruct = self.ClockStruct
+        ParamStruct = self.ParamStruct
+        Outputs = self.Outputs
+
+        if SimEndTime is None:
+            SimEndTime = self.wdf.Date.iloc[-1]
+
+        SimEndTime = pd.to_datetime(SimEndTime)
+        n = ClockStruct.nSteps
+        nSteps = (SimEndTime - ClockStruct.SimulationStartDate).days + 1
+
+        # everything is checked before the model is changed, so a failed
+        # extension leaves the model as it was
+        assert SimEndTime >= ClockStruct.SimulationEndDate, "end date is before the current end date"
+        assert self.wdf.Date.iloc[-1] >= SimEndTime, "weather data does not cover the end date"
+        new_weather = self.wdf[
+            (self.wdf.Date > self.weather_df.Date.iloc[-1]) & (self.wdf.Date <= SimEndTime)
+        ]
+        assert len(new_weather) == nSteps - n, "weather data has missing days"
+
+        # extend clock
+        self.SimEndTime = SimEndTime
+        ClockStruct.SimulationEndDate = SimEndTime
+        ClockStruct.nSteps = nSteps
+        ClockStruct.TimeSpan = pd.date_range(
+            freq="D", start=ClockStruct.SimulationStartDate, end=SimEndTime
+        )
+
+        # extend weather
+        self.weather_df = pd.concat([self.weather_df, new_weather])
+        self.weather = _grow_rows(self.weather, ClockStruct.nSteps)
+        self.weather[n : ClockStruct.nSteps] = new_weather.values
+
+        # outputs are converted to DataFrames when the model terminates
+        if ClockStruct.ModelTermination:
+            self._reopen_outputs()
+
+        if Outputs.Daily:
+            Outputs.Water = _grow_rows(Outputs.Water, ClockStruct.nSteps)
+            Outputs.Flux = _grow_rows(Outputs.Flux, ClockStruct.nSteps)
+            Outputs.Growth = _grow_rows(Outputs.Growth, ClockStruct.nSteps)
+
+        # extend irrigation schedules
+        for IrrMngt in [ParamStruct.IrrMngt, ParamStruct.FallowIrrMngt]:
+            if isinstance(IrrMngt.Schedule, np.ndarray):
+                IrrMngt.Schedule = _grow_rows(IrrMngt.Schedule, ClockStruct.nSteps)
+
+        if ParamStruct.IrrSchedule is not None:
+            df = ParamStruct.IrrSchedule.reindex(ClockStruct.TimeSpan[n:], fill_value=0)
+            df = df.drop("Date", axis=1)
+            ParamStruct.IrrMngt.Schedule[n : ClockStruct.nSteps] = np.array(
+                df.values, dtype=float
+            ).flatten()
+
+        # extend groundwater depths
+        ParamStruct = read_groundwater_table(ParamStruct, self.Groundwater, ClockStruct)
+
+        # CO2 concentration of any new years (WP adjustments are recomputed at
+        # the start of each season)
+        sim_years = np.arange(ClockStruct.SimulationStartDate.year, SimEndTime.year + 1)
+        if len(sim_years) > len(ParamStruct.CO2years):
+            CO2conc = compute_co2_series(sim_years, ParamStruct.CO2concAdj)
+            ParamStruct.CO2years = sim_years
+            ParamStruct.CO2conc = CO2conc
+            ParamStruct.CO2data = pd.Series(CO2conc, index=sim_years)
+            ParamStruct.fCO2data = {}
+
+        # add new growing seasons once they have started before the end of the
+        # simulation (a model waiting for the next season stays terminated)
+        # (season dates only depend on the end year). Seasons given by their
+        # dates are kept as they are
+        if self.planting_dates is None:
+            if self._season_dates is None or self._season_dates[0] != SimEndTime.year:
+                self._season_dates = (SimEndTime.year,) + read_season_dates(
+                    ClockStruct, ParamStruct.CropList[0]
+                )
+
+            _, PlantingDates, HarvestDates = self._season_dates
+            nSeasons = max(ClockStruct.nSeasons, (PlantingDates < SimEndTime).sum())
+            PlantingDates = PlantingDates[:nSeasons]
+            HarvestDates = HarvestDates[:nSeasons]
+            assert (PlantingDates[: ClockStruct.nSeasons] == ClockStruct.PlantingDates).all()
+            crop_struct = make_crop_struct(ParamStruct.CropList[0])
+            for season in range(ClockStruct.nSeasons, len(PlantingDates)):
+                ParamStruct.Seasonal_Crop_List.append(crop_struct)
+                ParamStruct.SeasonCrops.append(0)
+                ParamStruct.CropChoices.append(ParamStruct.CropList[0].Name)
+
+            ClockStruct.PlantingDates = PlantingDates
+            ClockStruct.HarvestDates = HarvestDates
+            ClockStruct.nSeasons = nSeasons
+
+        # totals of new seasons, months and weeks
+        init_flux_totals(Outputs, ClockStruct)
+
+        # recompute GDD calendars of seasons that have not started yet (earlier
+        # seasons keep the calendar they were simulated with)
+        started = ClockStruct.SeasonCounter + 1
+        calendars = ParamStruct.SeasonCalendars
+        errors = ParamStruct.SeasonCalendarErrors
+        ParamStruct = compute_season_calendars(ParamStruct, ClockStruct, self.weather_df)
+        ParamStruct.SeasonCalendars[:started] = calendars[:started]
+        ParamStruct.SeasonCalendarErrors = {
+            season: error
+            for season, error in ParamStruct.SeasonCalendarErrors.items()
+            if season >= started
+        }
+        ParamStruct.SeasonCalendarErrors.update(
+            {season: error for season, error in errors.items() if season < started}
+        )
+
+        # continue after the last simulated day as if the model had not terminated
+        if ClockStruct.ModelTermination:
+            ClockStruct.StepStartTime = ClockStruct.TimeSpan[ClockStruct.TimeStepCounter]
+            ClockStruct.StepEndTime = ClockStruct.TimeSpan[ClockStruct.TimeStepCounter + 1]
+            ClockStruct = check_model_termination(ClockStruct, self.InitCond)
+            ClockStruct, self.InitCond, ParamStruct, Outputs = self._update_time(
+                ClockStruct, self.InitCond, ParamStruct, Outputs, self.weather
+            )
+
+        self.ClockStruct = ClockStruct
+        self.ParamStruct = ParamStruct
+        self.Outputs = Outputs
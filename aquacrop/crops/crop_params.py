@@ -1,2070 +1,43 @@
-crop_params={'Barley': {'Aer': 15.0,
-  'CCx': 0.8,
-  'CDC': -9.0,
-  'CDC_CD': 0.07697,
-  'CGC': -9.0,
-  'CGC_CD': 0.1241,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 7.0,
-  'Flowering': -9.0,
-  'FloweringCD': 12.0,
-  'GDD_lo': 0,
-  'GDD_up': 14.0,
-  'GDDmethod': 3,
-  'HI0': 0.33,
-  'HIstart': -9.0,
-  'HIstartCD': 60.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 93.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 60.0,
-  'Name': 'Barley',
-  'PlantMethod': 1.0,
-  'PlantPop': 1500000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.5,
-  'Senescence': -9.0,
-  'SenescenceCD': 65.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 0.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 0.0,
-  'Tmin_up': 5.0,
-  'TrColdStress': 1,
-  'Tupp': 15.0,
-  'WP': 15.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 27.0,
-  'Zmax': 1.3,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 5.0,
-  'dHI0': 15.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.6,
-  'p_up3': 0.55,
-  'p_up4': 0.85},
- 'BarleyGDD': {'Aer': 15.0,
-  'CCx': 0.8,
-  'CDC': 0.006,
-  'CDC_CD': 0.07971,
-  'CGC': 0.008697,
-  'CGC_CD': 0.1241,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 98.0,
-  'EmergenceCD': 7.0,
-  'Flowering': 160.0,
-  'FloweringCD': 12.0,
-  'GDD_lo': 0,
-  'GDD_up': 14.0,
-  'GDDmethod': 3,
-  'HI0': 0.33,
-  'HIstart': 867.0,
-  'HIstartCD': 60.0,
-  'Kcb': 1.1,
-  'Maturity': 1296.0,
-  'MaturityCD': 93.0,
-  'MaxRooting': 854.0,
-  'MaxRootingCD': 60.0,
-  'Name': 'BarleyGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 1500000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.5,
-  'Senescence': 924.0,
-  'SenescenceCD': 65.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 0.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 0.0,
-  'Tmin_up': 5.0,
-  'TrColdStress': 1,
-  'Tupp': 15.0,
-  'WP': 15.0,
-  'WPy': 100.0,
-  'YldForm': 351.0,
-  'YldFormCD': 27.0,
-  'Zmax': 1.3,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 5.0,
-  'dHI0': 15.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.6,
-  'p_up3': 0.55,
-  'p_up4': 0.85},
- 'Cotton': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': -9.0,
-  'CDC_CD': 0.02917,
-  'CGC': -9.0,
-  'CGC_CD': 0.07611,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 14.0,
-  'Flowering': -9.0,
-  'FloweringCD': 52.0,
-  'GDD_lo': 0,
-  'GDD_up': -9.0,
-  'GDDmethod': 3,
-  'HI0': 0.35,
-  'HIstart': -9.0,
-  'HIstartCD': 64.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 174.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 98.0,
-  'Name': 'Cotton',
-  'PlantMethod': 1.0,
-  'PlantPop': 120000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 144.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 12.0,
-  'Tmax_lo': 48.0,
-  'Tmax_up': 43.0,
-  'Tmin_lo': 10.0,
-  'Tmin_up': 15.0,
-  'TrColdStress': 0,
-  'Tupp': 35.0,
-  'WP': 15.0,
-  'WPy': 70.0,
-  'YldForm': -9.0,
-  'YldFormCD': 105.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': 2.0,
-  'b_HI': 10.0,
-  'dHI0': 30.0,
-  'dHI_pre': 5.0,
-  'exc': 200.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.7,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.75,
-  'p_up3': 0.75,
-  'p_up4': 0.85},
- 'CottonGDD': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': 0.002465,
-  'CDC_CD': 0.02823,
-  'CGC': 0.006503,
-  'CGC_CD': 0.06712,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': 12.0,
-  'EmergenceCD': 14.0,
-  'Flowering': 709.0,
-  'FloweringCD': 52.0,
-  'GDD_lo': 0,
-  'GDD_up': -9.0,
-  'GDDmethod': 3,
-  'HI0': 0.35,
-  'HIstart': 502.0,
-  'HIstartCD': 65.0,
-  'Kcb': 1.1,
-  'Maturity': 1956.0,
-  'MaturityCD': 174.0,
-  'MaxRooting': 956.0,
-  'MaxRootingCD': 99.0,
-  'Name': 'CottonGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 120000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.0,
-  'Senescence': 1601.0,
-  'SenescenceCD': 144.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 12.0,
-  'Tmax_lo': 48.0,
-  'Tmax_up': 43.0,
-  'Tmin_lo': 10.0,
-  'Tmin_up': 15.0,
-  'TrColdStress': 0,
-  'Tupp': 35.0,
-  'WP': 15.0,
-  'WPy': 70.0,
-  'YldForm': 1403.0,
-  'YldFormCD': 106.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': 2.0,
-  'b_HI': 10.0,
-  'dHI0': 30.0,
-  'dHI_pre': 5.0,
-  'exc': 200.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.7,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.75,
-  'p_up3': 0.75,
-  'p_up4': 0.85},
- 'DryBean': {'Aer': 5.0,
-  'CCx': 0.99,
-  'CDC': -9.0,
-  'CDC_CD': 0.08612,
-  'CGC': -9.0,
-  'CGC_CD': 0.11804,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 6.0,
-  'Flowering': -9.0,
-  'FloweringCD': 20.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.4,
-  'HIstart': -9.0,
-  'HIstartCD': 47.0,
-  'Kcb': 1.05,
-  'Maturity': -9.0,
-  'MaturityCD': 115.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 75.0,
-  'Name': 'DryBean',
-  'PlantMethod': 1.0,
-  'PlantPop': 131579.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 10.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 75.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 9.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 15.0,
-  'WPy': 90.0,
-  'YldForm': -9.0,
-  'YldFormCD': 61.0,
-  'Zmax': 1.7,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 1.0,
-  'dHI0': 10.0,
-  'dHI_pre': 3.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 2.5,
-  'fshape_w2': 3.0,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.88},
- 'DryBeanGDD': {'Aer': 5.0,
-  'CCx': 0.99,
-  'CDC': 0.008813,
-  'CDC_CD': 0.08612,
-  'CGC': 0.009879,
-  'CGC_CD': 0.11804,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': 59.0,
-  'EmergenceCD': 6.0,
-  'Flowering': 233.0,
-  'FloweringCD': 20.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.4,
-  'HIstart': 556.0,
-  'HIstartCD': 47.0,
-  'Kcb': 1.05,
-  'Maturity': 1298.0,
-  'MaturityCD': 115.0,
-  'MaxRooting': 888.0,
-  'MaxRootingCD': 75.0,
-  'Name': 'DryBeanGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 131579.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 10.0,
-  'Senescence': 903.0,
-  'SenescenceCD': 75.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 9.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 15.0,
-  'WPy': 90.0,
-  'YldForm': 668.0,
-  'YldFormCD': 61.0,
-  'Zmax': 1.7,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 1.0,
-  'dHI0': 10.0,
-  'dHI_pre': 3.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 2.5,
-  'fshape_w2': 3.0,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.88},
- 'Maize': {'Aer': 5.0,
-  'CCx': 0.96,
-  'CDC': -9.0,
-  'CDC_CD': 0.11691,
-  'CGC': -9.0,
-  'CGC_CD': 0.16312,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 6.0,
-  'Flowering': -9.0,
-  'FloweringCD': 13.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.48,
-  'HIstart': -9.0,
-  'HIstartCD': 66.0,
-  'Kcb': 1.05,
-  'Maturity': -9.0,
-  'MaturityCD': 132.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 108.0,
-  'Name': 'Maize',
-  'PlantMethod': 1.0,
-  'PlantPop': 75000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.5,
-  'Senescence': -9.0,
-  'SenescenceCD': 107.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.011,
-  'SxTopQ': 0.045,
-  'Tbase': 8.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 33.7,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 61.0,
-  'Zmax': 2.3,
-  'Zmin': 0.3,
-  'a_HI': 7.0,
-  'b_HI': 3.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 2.9,
-  'fshape_w2': 6.0,
-  'fshape_w3': 2.7,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.72,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.14,
-  'p_up2': 0.69,
-  'p_up3': 0.69,
-  'p_up4': 0.8},
- 'MaizeGDD': {'Aer': 5.0,
-  'CCx': 0.96,
-  'CDC': 0.01,
-  'CDC_CD': 0.11691,
-  'CGC': 0.012494,
-  'CGC_CD': 0.16312,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 80.0,
-  'EmergenceCD': 6.0,
-  'Flowering': 180.0,
-  'FloweringCD': 13.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.48,
-  'HIstart': 880.0,
-  'HIstartCD': 66.0,
-  'Kcb': 1.05,
-  'Maturity': 1700.0,
-  'MaturityCD': 132.0,
-  'MaxRooting': 1409.0,
-  'MaxRootingCD': 108.0,
-  'Name': 'MaizeGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 75000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.5,
-  'Senescence': 1400.0,
-  'SenescenceCD': 107.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.011,
-  'SxTopQ': 0.045,
-  'Tbase': 8.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 33.7,
-  'WPy': 100.0,
-  'YldForm': 750.0,
-  'YldFormCD': 61.0,
-  'Zmax': 2.3,
-  'Zmin': 0.3,
-  'a_HI': 7.0,
-  'b_HI': 3.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 2.9,
-  'fshape_w2': 6.0,
-  'fshape_w3': 2.7,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.72,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.14,
-  'p_up2': 0.69,
-  'p_up3': 0.69,
-  'p_up4': 0.8},
- 'PaddyRice': {
-   'Aer': -1e10,
-   'LagAer': 1e10,
-     'CCx': 0.95,
-  'CDC': -9.0,
-  'CDC_CD': 0.0933,
-  'CGC': -9.0,
-  'CGC_CD': 0.12257,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 3.0,
-  'Flowering': -9.0,
-  'FloweringCD': 19.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.43,
-  'HIstart': -9.0,
-  'HIstartCD': 65.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 104.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 21.0,
-  'Name': 'PaddyRice',
-  'PlantMethod': 0.0,
-  'PlantPop': 1000000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 73.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 8.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 19.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 36.0,
-  'Zmax': 0.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 2.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.4,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.0,
-  'p_up2': 0.5,
-  'p_up3': 0.55,
-  'p_up4': 0.75},
- 'PaddyRiceGDD': {
-   'Aer': -1e10,
-   'LagAer': 1e10,
-     'CCx': 0.95,
-  'CDC': 0.005003,
-  'CDC_CD': 0.0933,
-  'CGC': 0.007004,
-  'CGC_CD': 0.12257,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 50.0,
-  'EmergenceCD': 3.0,
-  'Flowering': 350.0,
-  'FloweringCD': 19.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.43,
-  'HIstart': 1150.0,
-  'HIstartCD': 65.0,
-  'Kcb': 1.1,
-  'Maturity': 1900.0,
-  'MaturityCD': 104.0,
-  'MaxRooting': 370.0,
-  'MaxRootingCD': 21.0,
-  'Name': 'PaddyRiceGDD',
-  'PlantMethod': 0.0,
-  'PlantPop': 1000000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.0,
-  'Senescence': 1300.0,
-  'SenescenceCD': 73.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 8.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 19.0,
-  'WPy': 100.0,
-  'YldForm': 680.0,
-  'YldFormCD': 36.0,
-  'Zmax': 0.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 2.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.4,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.0,
-  'p_up2': 0.5,
-  'p_up3': 0.55,
-  'p_up4': 0.75},
- 'Potato': {'Aer': 5.0,
-  'CCx': 0.92,
-  'CDC': -9.0,
-  'CDC_CD': 0.01884,
-  'CGC': -9.0,
-  'CGC_CD': 0.18896,
-  'CalendarType': 1,
-  'CropType': 2,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 16.0,
-  'Flowering': -9.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 7.0,
-  'GDDmethod': 3,
-  'HI0': 0.75,
-  'HIstart': -9.0,
-  'HIstartCD': 47.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 121.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 100.0,
-  'Name': 'Potato',
-  'PlantMethod': 0.0,
-  'PlantPop': 40000.0,
-  'PolColdStress': 0,
-  'PolHeatStress': 0,
-  'SeedSize': 15.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 90.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 2.0,
-  'Tmax_lo': -4.0,
-  'Tmax_up': -9.0,
-  'Tmin_lo': -14.0,
-  'Tmin_up': -9.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 18.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 72.0,
-  'Zmax': 1.5,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 10.0,
-  'dHI0': 5.0,
-  'dHI_pre': 2.0,
-  'exc': -9.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.6,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.8},
- 'PotatoGDD': {'Aer': 5.0,
-  'CCx': 0.92,
-  'CDC': 0.002,
-  'CDC_CD': 0.02781,
-  'CGC': 0.01615,
-  'CGC_CD': 0.26994,
-  'CalendarType': 2,
-  'CropType': 2,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': 200.0,
-  'EmergenceCD': 11.0,
-  'Flowering': 0.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 7.0,
-  'GDDmethod': 3,
-  'HI0': 0.75,
-  'HIstart': 550.0,
-  'HIstartCD': 32.0,
-  'Kcb': 1.1,
-  'Maturity': 1276.0,
-  'MaturityCD': 80.0,
-  'MaxRooting': 1079.0,
-  'MaxRootingCD': 66.0,
-  'Name': 'PotatoGDD',
-  'PlantMethod': 0.0,
-  'PlantPop': 40000.0,
-  'PolColdStress': 0,
-  'PolHeatStress': 0,
-  'SeedSize': 15.0,
-  'Senescence': 984.0,
-  'SenescenceCD': 59.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 2.0,
-  'Tmax_lo': -4.0,
-  'Tmax_up': -9.0,
-  'Tmin_lo': -14.0,
-  'Tmin_up': -9.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 18.0,
-  'WPy': 100.0,
-  'YldForm': 700.0,
-  'YldFormCD': 47.0,
-  'Zmax': 1.5,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 10.0,
-  'dHI0': 5.0,
-  'dHI_pre': 2.0,
-  'exc': -9.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.6,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.8},
- 'PotatoLocal': {'Aer': 5.0,
-  'CCx': 0.92,
-  'CDC': -9.0,
-  'CDC_CD': 0.01884,
-  'CGC': -9.0,
-  'CGC_CD': 0.12597,
-  'CalendarType': 1,
-  'CropType': 2,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 15.0,
-  'Flowering': -9.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 7.0,
-  'GDDmethod': 3,
-  'HI0': 0.85,
-  'HIstart': -9.0,
-  'HIstartCD': 46.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 125.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 50.0,
-  'Name': 'PotatoLocal',
-  'PlantMethod': 0.0,
-  'PlantPop': 40000.0,
-  'PolColdStress': 0,
-  'PolHeatStress': 0,
-  'SeedSize': 15.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 105.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 2.0,
-  'Tmax_lo': -4.0,
-  'Tmax_up': -9.0,
-  'Tmin_lo': -14.0,
-  'Tmin_up': -9.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 18.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 77.0,
-  'Zmax': 0.6,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 10.0,
-  'dHI0': 5.0,
-  'dHI_pre': 2.0,
-  'exc': -9.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.6,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.8},
- 'Quinoa': {'Aer': 10.0,
-  'CCx': 0.75,
-  'CDC': -9.0,
-  'CDC_CD': 0.1,
-  'CGC': -9.0,
-  'CGC_CD': 0.1,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 7.0,
-  'Flowering': -9.0,
-  'FloweringCD': 20.0,
-  'GDD_lo': 0,
-  'GDD_up': -9.0,
-  'GDDmethod': 3,
-  'HI0': 0.5,
-  'HIstart': -9.0,
-  'HIstartCD': 70.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 180.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 83.0,
-  'Name': 'Quinoa',
-  'PlantMethod': 1.0,
-  'PlantPop': 200000.0,
-  'PolColdStress': 0,
-  'PolHeatStress': 0,
-  'SeedSize': 6.5,
-  'Senescence': -9.0,
-  'SenescenceCD': 160.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 2.0,
-  'Tmax_lo': -4.0,
-  'Tmax_up': -9.0,
-  'Tmin_lo': -14.0,
-  'Tmin_up': -9.0,
-  'TrColdStress': 0,
-  'Tupp': 30.0,
-  'WP': 10.5,
-  'WPy': 90.0,
-  'YldForm': -9.0,
-  'YldFormCD': 90.0,
-  'Zmax': 1.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 9.0,
-  'dHI0': 10.0,
-  'dHI_pre': 0.0,
-  'exc': 50.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 4.0,
-  'fshape_w2': 4.0,
-  'fshape_w3': 4.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.8,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.5,
-  'p_up2': 0.6,
-  'p_up3': 0.98,
-  'p_up4': 0.85},
- 'Sorghum': {'Aer': 5.0,
-  'CCx': 0.9,
-  'CDC': -9.0,
-  'CDC_CD': 0.117,
-  'CGC': -9.0,
-  'CGC_CD': 0.1815,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 13.0,
-  'Flowering': -9.0,
-  'FloweringCD': 20.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.45,
-  'HIstart': -9.0,
-  'HIstartCD': 65.0,
-  'Kcb': 1.07,
-  'Maturity': -9.0,
-  'MaturityCD': 102.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 96.0,
-  'Name': 'Sorghum',
-  'PlantMethod': 1.0,
-  'PlantPop': 74000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 3.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 91.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 8.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 33.7,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 37.0,
-  'Zmax': 1.8,
-  'Zmin': 0.3,
-  'a_HI': 1.0,
-  'b_HI': 3.0,
-  'dHI0': 25.0,
-  'dHI_pre': 4.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.7,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.75,
-  'p_up3': 0.7,
-  'p_up4': 0.8},
- 'SorghumGDD': {'Aer': 5.0,
-  'CCx': 0.9,
-  'CDC': 0.009862,
-  'CDC_CD': 0.119,
-  'CGC': 0.012001,
-  'CGC_CD': 0.14326,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 136.0,
-  'EmergenceCD': 11.0,
-  'Flowering': 306.0,
-  'FloweringCD': 26.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.45,
-  'HIstart': 1041.0,
-  'HIstartCD': 87.0,
-  'Kcb': 1.07,
-  'Maturity': 1760.0,
-  'MaturityCD': 147.0,
-  'MaxRooting': 1583.0,
-  'MaxRootingCD': 132.0,
-  'Name': 'SorghumGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 200000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 3.0,
-  'Senescence': 1579.0,
-  'SenescenceCD': 132.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 8.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 33.7,
-  'WPy': 100.0,
-  'YldForm': 719.0,
-  'YldFormCD': 60.0,
-  'Zmax': 1.8,
-  'Zmin': 0.3,
-  'a_HI': 1.0,
-  'b_HI': 3.0,
-  'dHI0': 25.0,
-  'dHI_pre': 4.0,
-  'exc': 100.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.7,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.75,
-  'p_up3': 0.7,
-  'p_up4': 0.8},
- 'Soybean': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': -9.0,
-  'CDC_CD': 0.02885,
-  'CGC': -9.0,
-  'CGC_CD': 0.10569,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 9.0,
-  'Flowering': -9.0,
-  'FloweringCD': 29.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.4,
-  'HIstart': -9.0,
-  'HIstartCD': 71.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 130.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 92.0,
-  'Name': 'Soybean',
-  'PlantMethod': 1.0,
-  'PlantPop': 330000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 5.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 104.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 5.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 15.0,
-  'WPy': 60.0,
-  'YldForm': -9.0,
-  'YldFormCD': 59.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 10.0,
-  'dHI_pre': 3.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'SoybeanGDD': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': 0.0015,
-  'CDC_CD': 0.02778,
-  'CGC': 0.005,
-  'CGC_CD': 0.10425,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 200.0,
-  'EmergenceCD': 10.0,
-  'Flowering': 600.0,
-  'FloweringCD': 30.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.4,
-  'HIstart': 1500.0,
-  'HIstartCD': 72.0,
-  'Kcb': 1.1,
-  'Maturity': 2700.0,
-  'MaturityCD': 133.0,
-  'MaxRooting': 1934.0,
-  'MaxRootingCD': 93.0,
-  'Name': 'SoybeanGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 330000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 5.0,
-  'Senescence': 2200.0,
-  'SenescenceCD': 106.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 5.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 15.0,
-  'WPy': 60.0,
-  'YldForm': 1180.0,
-  'YldFormCD': 60.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 10.0,
-  'dHI_pre': 3.0,
-  'exc': 50.0,
-  'fage': 0.3,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'SugarBeet': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': -9.0,
-  'CDC_CD': 0.07143,
-  'CGC': -9.0,
-  'CGC_CD': 0.13572,
-  'CalendarType': 1,
-  'CropType': 2,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 4.0,
-  'Flowering': -9.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 9.0,
-  'GDDmethod': 3,
-  'HI0': 0.7,
-  'HIstart': -9.0,
-  'HIstartCD': 70.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 142.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 42.0,
-  'Name': 'SugarBeet',
-  'PlantMethod': 1.0,
-  'PlantPop': 100000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 115.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 5.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 17.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 70.0,
-  'Zmax': 1.0,
-  'Zmin': 0.3,
-  'a_HI': 4.0,
-  'b_HI': -9.0,
-  'dHI0': 20.0,
-  'dHI_pre': 0.0,
-  'exc': -9.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.6,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.65,
-  'p_up3': 0.75,
-  'p_up4': 0.8},
- 'SugarBeetGDD': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': 0.003857,
-  'CDC_CD': 0.07128,
-  'CGC': 0.010541,
-  'CGC_CD': 0.13227,
-  'CalendarType': 2,
-  'CropType': 2,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': 23.0,
-  'EmergenceCD': 5.0,
-  'Flowering': 0.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 9.0,
-  'GDDmethod': 3,
-  'HI0': 0.7,
-  'HIstart': 865.0,
-  'HIstartCD': 71.0,
-  'Kcb': 1.1,
-  'Maturity': 2203.0,
-  'MaturityCD': 142.0,
-  'MaxRooting': 408.0,
-  'MaxRootingCD': 43.0,
-  'Name': 'SugarBeetGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 100000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.0,
-  'Senescence': 1704.0,
-  'SenescenceCD': 116.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 5.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 17.0,
-  'WPy': 100.0,
-  'YldForm': 1301.0,
-  'YldFormCD': 70.0,
-  'Zmax': 1.0,
-  'Zmin': 0.3,
-  'a_HI': 4.0,
-  'b_HI': -9.0,
-  'dHI0': 20.0,
-  'dHI_pre': 0.0,
-  'exc': -9.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.6,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.65,
-  'p_up3': 0.75,
-  'p_up4': 0.8},
- 'SugarCane': {'Aer': 5.0,
-  'CCx': 0.95,
-  'CDC': -9.0,
-  'CDC_CD': 0.07615,
-  'CGC': -9.0,
-  'CGC_CD': 0.12548,
-  'CalendarType': 1,
-  'CropType': 1,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 7.0,
-  'Flowering': -9.0,
-  'FloweringCD': 0.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.35,
-  'HIstart': -9.0,
-  'HIstartCD': 0.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 365.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 60.0,
-  'Name': 'SugarCane',
-  'PlantMethod': 0.0,
-  'PlantPop': 140000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.5,
-  'Senescence': -9.0,
-  'SenescenceCD': 330.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 9.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 32.0,
-  'WP': 30.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 73.0,
-  'Zmax': 1.8,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': -9.0,
-  'dHI0': -9.0,
-  'dHI_pre': -9.0,
-  'exc': 20.0,
-  'fage': 0.15,
-  'fshape_r': 1.3,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.55,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.25,
-  'p_up2': 0.5,
-  'p_up3': 0.6,
-  'p_up4': 0.9},
- 'Sunflower': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': -9.0,
-  'CDC_CD': 0.13562,
-  'CGC': -9.0,
-  'CGC_CD': 0.2197,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 18.0,
-  'Flowering': -9.0,
-  'FloweringCD': 16.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.35,
-  'HIstart': -9.0,
-  'HIstartCD': 78.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 127.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 100.0,
-  'Name': 'Sunflower',
-  'PlantMethod': 1.0,
-  'PlantPop': 58000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 5.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 105.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 4.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 18.0,
-  'WPy': 60.0,
-  'YldForm': -9.0,
-  'YldFormCD': 47.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 10.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 2.5,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'SunflowerGDD': {'Aer': 5.0,
-  'CCx': 0.98,
-  'CDC': 0.006,
-  'CDC_CD': 0.11476,
-  'CGC': 0.014993,
-  'CGC_CD': 0.24606,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 170.0,
-  'EmergenceCD': 18.0,
-  'Flowering': 350.0,
-  'FloweringCD': 18.0,
-  'GDD_lo': 0,
-  'GDD_up': 12.0,
-  'GDDmethod': 3,
-  'HI0': 0.35,
-  'HIstart': 1266.0,
-  'HIstartCD': 81.0,
-  'Kcb': 1.1,
-  'Maturity': 2400.0,
-  'MaturityCD': 138.0,
-  'MaxRooting': 1784.0,
-  'MaxRootingCD': 106.0,
-  'Name': 'SunflowerGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 57000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 5.0,
-  'Senescence': 1900.0,
-  'SenescenceCD': 112.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 4.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 18.0,
-  'WPy': 60.0,
-  'YldForm': 1087.0,
-  'YldFormCD': 55.0,
-  'Zmax': 2.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 10.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.3,
-  'fshape_r': 1.3,
-  'fshape_w1': 2.5,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.6,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'Tomato': {'Aer': 5.0,
-  'CCx': 0.75,
-  'CDC': -9.0,
-  'CDC_CD': 0.07238,
-  'CGC': -9.0,
-  'CGC_CD': 0.12286,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 4.0,
-  'Flowering': -9.0,
-  'FloweringCD': 42.0,
-  'GDD_lo': 0,
-  'GDD_up': -9.0,
-  'GDDmethod': 3,
-  'HI0': 0.63,
-  'HIstart': -9.0,
-  'HIstartCD': 34.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 110.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 55.0,
-  'Name': 'Tomato',
-  'PlantMethod': 0.0,
-  'PlantPop': 33333.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 20.0,
-  'Senescence': -9.0,
-  'SenescenceCD': 91.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 7.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 0,
-  'Tupp': 28.0,
-  'WP': 18.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 58.0,
-  'Zmax': 1.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.55,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.5,
-  'p_up3': 0.7,
-  'p_up4': 0.92},
- 'TomatoGDD': {'Aer': 5.0,
-  'CCx': 0.75,
-  'CDC': 0.004,
-  'CDC_CD': 0.06333,
-  'CGC': 0.007504,
-  'CGC_CD': 0.10819,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 0.0,
-  'ETadj': 1.0,
-  'Emergence': 43.0,
-  'EmergenceCD': 5.0,
-  'Flowering': 750.0,
-  'FloweringCD': 49.0,
-  'GDD_lo': 0,
-  'GDD_up': -9.0,
-  'GDDmethod': 3,
-  'HI0': 0.63,
-  'HIstart': 525.0,
-  'HIstartCD': 41.0,
-  'Kcb': 1.1,
-  'Maturity': 1933.0,
-  'MaturityCD': 130.0,
-  'MaxRooting': 891.0,
-  'MaxRootingCD': 65.0,
-  'Name': 'TomatoGDD',
-  'PlantMethod': 0.0,
-  'PlantPop': 33333.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 20.0,
-  'Senescence': 1553.0,
-  'SenescenceCD': 106.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 7.0,
-  'Tmax_lo': 45.0,
-  'Tmax_up': 40.0,
-  'Tmin_lo': 5.0,
-  'Tmin_up': 10.0,
-  'TrColdStress': 0,
-  'Tupp': 28.0,
-  'WP': 18.0,
-  'WPy': 100.0,
-  'YldForm': 1050.0,
-  'YldFormCD': 67.0,
-  'Zmax': 1.0,
-  'Zmin': 0.3,
-  'a_HI': -9.0,
-  'b_HI': 3.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.55,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.15,
-  'p_up2': 0.5,
-  'p_up3': 0.7,
-  'p_up4': 0.92},
- 'Wheat': {'Aer': 5.0,
-  'CCx': 0.96,
-  'CDC': -9.0,
-  'CDC_CD': 0.07179,
-  'CGC': -9.0,
-  'CGC_CD': 0.04901,
-  'CalendarType': 1,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': -9.0,
-  'EmergenceCD': 13.0,
-  'Flowering': -9.0,
-  'FloweringCD': 15.0,
-  'GDD_lo': 0,
-  'GDD_up': 14.0,
-  'GDDmethod': 3,
-  'HI0': 0.48,
-  'HIstart': -9.0,
-  'HIstartCD': 127.0,
-  'Kcb': 1.1,
-  'Maturity': -9.0,
-  'MaturityCD': 197.0,
-  'MaxRooting': -9.0,
-  'MaxRootingCD': 93.0,
-  'Name': 'Wheat',
-  'PlantMethod': 1.0,
-  'PlantPop': 4500000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.5,
-  'Senescence': -9.0,
-  'SenescenceCD': 158.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 0.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 0.0,
-  'Tmin_up': 5.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 15.0,
-  'WPy': 100.0,
-  'YldForm': -9.0,
-  'YldFormCD': 67.0,
-  'Zmax': 1.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 5.0,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.65,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'WheatGDD': {'Aer': 5.0,
-  'CCx': 0.96,
-  'CDC': 0.004,
-  'CDC_CD': 0.07179,
-  'CGC': 0.005001,
-  'CGC_CD': 0.04902,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 150.0,
-  'EmergenceCD': 13.0,
-  'Flowering': 200.0,
-  'FloweringCD': 15.0,
-  'GDD_lo': 0,
-  'GDD_up': 14.0,
-  'GDDmethod': 3,
-  'HI0': 0.48,
-  'HIstart': 1250.0,
-  'HIstartCD': 127.0,
-  'Kcb': 1.1,
-  'Maturity': 2400.0,
-  'MaturityCD': 197.0,
-  'MaxRooting': 864.0,
-  'MaxRootingCD': 93.0,
-  'Name': 'WheatGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 4500000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.5,
-  'Senescence': 1700.0,
-  'SenescenceCD': 158.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 0.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 0.0,
-  'Tmin_up': 5.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 15.0,
-  'WPy': 100.0,
-  'YldForm': 1100.0,
-  'YldFormCD': 67.0,
-  'Zmax': 1.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 5.0,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.65,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'WheatLongGDD': {'Aer': 5.0,
-  'CCx': 0.9,
-  'CDC': 0.003888,
-  'CDC_CD': 0.07179,
-  'CGC': 0.002734,
-  'CGC_CD': 0.03463,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 289.0,
-  'EmergenceCD': 15.0,
-  'Flowering': 264.0,
-  'FloweringCD': 20.0,
-  'GDD_lo': 0,
-  'GDD_up': 14.0,
-  'GDDmethod': 3,
-  'HI0': 0.48,
-  'HIstart': 2252.0,
-  'HIstartCD': 170.0,
-  'Kcb': 1.1,
-  'Maturity': 3390.0,
-  'MaturityCD': 240.0,
-  'MaxRooting': 1322.0,
-  'MaxRootingCD': 95.0,
-  'Name': 'WheatLongGDD',
-  'PlantMethod': 1.0,
-  'PlantPop': 3500000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 1.5,
-  'Senescence': 2835.0,
-  'SenescenceCD': 210.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 0.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 0.0,
-  'Tmin_up': 5.0,
-  'TrColdStress': 1,
-  'Tupp': 26.0,
-  'WP': 15.0,
-  'WPy': 100.0,
-  'YldForm': 1073.0,
-  'YldFormCD': 67.0,
-  'Zmax': 1.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 5.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 1.5,
-  'fshape_w1': 5.0,
-  'fshape_w2': 2.5,
-  'fshape_w3': 2.5,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.65,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.2,
-  'p_up2': 0.65,
-  'p_up3': 0.7,
-  'p_up4': 0.85},
- 'localpaddy': {
-   'Aer': -1e10,
-   'LagAer': 1e10,
-  'CCx': 0.95,
-  'CDC': 0.006172,
-  'CDC_CD': 0.08348,
-  'CGC': 0.006163,
-  'CGC_CD': 0.09861,
-  'CalendarType': 2,
-  'CropType': 3,
-  'Determinant': 1.0,
-  'ETadj': 1.0,
-  'Emergence': 102.0,
-  'EmergenceCD': 7.0,
-  'Flowering': 318.0,
-  'FloweringCD': 21.0,
-  'GDD_lo': 0,
-  'GDD_up': 10.0,
-  'GDDmethod': 3,
-  'HI0': 0.43,
-  'HIstart': 1088.0,
-  'HIstartCD': 68.0,
-  'Kcb': 1.1,
-  'Maturity': 1707.0,
-  'MaturityCD': 109.0,
-  'MaxRooting': 381.0,
-  'MaxRootingCD': 25.0,
-  'Name': 'localpaddy',
-  'PlantMethod': 0.0,
-  'PlantPop': 1000000.0,
-  'PolColdStress': 1,
-  'PolHeatStress': 1,
-  'SeedSize': 6.0,
-  'Senescence': 1450.0,
-  'SenescenceCD': 91.0,
-  'SwitchGDD': 0,
-  'SxBotQ': 0.012,
-  'SxTopQ': 0.048,
-  'Tbase': 8.0,
-  'Tmax_lo': 40.0,
-  'Tmax_up': 35.0,
-  'Tmin_lo': 3.0,
-  'Tmin_up': 8.0,
-  'TrColdStress': 1,
-  'Tupp': 30.0,
-  'WP': 19.0,
-  'WPy': 100.0,
-  'YldForm': 577.0,
-  'YldFormCD': 40.0,
-  'Zmax': 0.5,
-  'Zmin': 0.3,
-  'a_HI': 10.0,
-  'b_HI': 7.0,
-  'dHI0': 15.0,
-  'dHI_pre': 0.0,
-  'exc': 100.0,
-  'fage': 0.15,
-  'fshape_r': 2.5,
-  'fshape_w1': 3.0,
-  'fshape_w2': 3.0,
-  'fshape_w3': 3.0,
-  'fshape_w4': 1,
-  'fsink': 0.5,
-  'p_lo1': 0.4,
-  'p_lo2': 1,
-  'p_lo3': 1,
-  'p_lo4': 1,
-  'p_up1': 0.0,
-  'p_up2': 0.5,
-  'p_up3': 0.55,
-  'p_up4': 0.75},
-'MaizeChampionGDD':
-{
-"Name":"MaizeChampionGDD",
-"CropType":3,
-"PlantMethod":1,
-"CalendarType":2,
-"SwitchGDD":0,
-"Emergence":80,
-"MaxRooting":1420,
-"Senescence":1420,
-"Maturity":1670,
-"HIstart":850,
-"Flowering":190,
-"YldForm":775,
-"GDDmethod":2,
-"Tbase":8,
-"Tupp":30 ,
-"PolHeatStress":1,
-"Tmax_up":40,
-"Tmax_lo":45,
-"PolColdStress":1,
-"Tmin_up":10,
-"Tmin_lo":5,
-"TrColdStress":1,
-"GDD_up":12,
-"GDD_lo":0,
-"Zmin":0.3,
-"Zmax":1.7,
-"fshape_r":1.3,
-"SxTopQ":0.0480,
-"SxBotQ":0.0117,
-"SeedSize":6.5,
-"PlantPop":75_000,
-"CCx":0.96,
-"CDC":0.01,
-"CGC":0.0125,
-"Kcb":1.05,
-"fage":0.3,
-"WP":33.7,
-"WPy":100,
-"fsink":0.5,
-"HI0":0.48,
-"dHI_pre":0,
-"a_HI":7,
-"b_HI":3,
-"dHI0":15,
-"Determinant":1,
-"exc":50,
-"p_up1":0.14,
-"p_up2":0.69,
-"p_up3":0.69,
-"p_up4":0.8,
-"p_lo1":0.72,
-"p_lo2":1,
-"p_lo3":1,
-"p_lo4":1,
-"fshape_w1":2.9,
-"fshape_w2":6,
-"fshape_w3":2.7,
-"fshape_w4":1 },
-
-
-  }
\ No newline at end of file
+__all__ = ["crop_params", "crop_catalog"]
+
+import json
+import os
+
+import numpy as np
+
+# Default parameters for built-in crops, keyed by crop name. Stored as JSON
+# (one line per crop) as it loads much faster than an equivalent dict literal.
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "crop_params.json")) as f:
+    crop_params = json.load(f)
+
+
+def _catalog(params):
+    """
+    Function to make the structured array of the parameters of each crop.
+
+    Parameters that are integers for every crop are stored as `int64`, the others
+    as `float64` with `NaN` for crops that do not give them
+
+    *Arguments:*\n
+
+    `params` : `dict` : parameters of each crop, keyed by crop name
+
+    *Returns:*
+
+    `catalog` : `numpy.ndarray` : one row per crop, with a `Name` field and a field for each parameter
+
+    """
+    keys = list(dict.fromkeys(k for p in params.values() for k in p if k != "Name"))
+    dtype = [("Name", f"U{max(len(name) for name in params)}")]
+    for k in keys:
+        values = [p.get(k) for p in params.values()]
+        is_int = all(type(v) is int for v in values)
+        dtype.append((k, np.int64 if is_int else np.float64))
+
+    rows = [(name,) + tuple(p.get(k, np.nan) for k in keys) for name, p in params.items()]
+
+    return np.array(rows, dtype=dtype)
+
+
+# One row per built-in crop (e.g. crop_catalog[crop_catalog["Name"] == "PaddyRice"])
+crop_catalog = _catalog(crop_params)
@@ -0,0 +1,166 @@
+__all__ = ["water_balance_terms", "coarsen_soil", "optimize_compartments"]
+
+# Cell
+from copy import deepcopy
+import time
+
+import numpy as np
+import pandas as pd
+
+# Cell
+# daily fluxes (columns of Outputs.Flux) compared between discretizations
+water_balance_terms = ["IrrDay", "Infl", "Runoff", "DeepPerc", "CR", "GwIn", "Es", "Tr"]
+
+
+def coarsen_soil(Soil, zKeep, max_dz):
+    """
+    Function to make a copy of a soil with fewer compartments: below `zKeep`,
+    neighbouring compartments of the same layer are merged into compartments
+    of up to `max_dz` m. The soil is first made as deep as the model would
+    (`SoilClass.extend_profile`) so that the compartments above `zKeep` are
+    not changed
+
+    *Arguments:*\n
+
+    `Soil` : `SoilClass` : soil (not used in an initialized model)
+
+    `zKeep` : `float` : depth (m) above which compartments are kept, usually the maximum rooting depth
+
+    `max_dz` : `float` : maximum thickness (m) of merged compartments
+
+    *Returns:*
+
+    `Soil` : `SoilClass` : copy of the soil with merged compartments
+
+    """
+    Soil = deepcopy(Soil)
+    Soil.fill_nan()
+    Soil.extend_profile(zKeep + 0.1)
+
+    prof = Soil.profile
+    dz = prof.dz.values
+    blocks = []
+    for i in range(len(prof)):
+        if (
+            blocks
+            and prof.zTop.values[blocks[-1][0]] >= zKeep - 1e-9
+            and prof.Layer.values[i] == prof.Layer.values[blocks[-1][0]]
+            and dz[blocks[-1]].sum() + dz[i] <= max_dz + 1e-9
+        ):
+            blocks[-1].append(i)
+        else:
+            blocks.append([i])
+
+    rows = prof.iloc[[block[0] for block in blocks]].copy()
+    rows["dz"] = [dz[block].sum() for block in blocks]
+    rows["dzsum"] = prof.dzsum.values[[block[-1] for block in blocks]]
+    rows["zBot"] = prof.zBot.values[[block[-1] for block in blocks]]
+    rows["zMid"] = (rows.zTop + rows.zBot) / 2
+    rows["Comp"] = np.arange(len(blocks))
+
+    Soil.profile = rows.reset_index(drop=True)
+    Soil.profile.dz = Soil.profile.dz.round(2)
+    Soil.nComp = len(Soil.profile)
+
+    return Soil
+
+
+def _run(model, Soil, repeat):
+    """
+    Function to run a copy of a model with another soil, timing its steps
+    (best of `repeat` runs)
+    """
+    best = np.inf
+    for _ in range(repeat):
+        sample = deepcopy(model, {id(model.wdf): model.wdf})
+        sample.Soil = deepcopy(Soil)
+        sample.initialize()
+        start = time.perf_counter()
+        sample.step(till_termination=True)
+        best = min(best, time.perf_counter() - start)
+
+    return sample, best
+
+
+# Cell
+def optimize_compartments(
+    model, yield_tol=0.01, water_tol=0.01, max_dz=(0.2, 0.4, 0.8, 1.6), zKeep=None, repeat=1
+):
+    """
+    Function to find the coarsest soil discretization (see `coarsen_soil`)
+    whose results are within a tolerance of those of the model's own soil.
+
+    Each discretization is run and compared with the model's soil: the yield
+    error is the largest difference in seasonal yield relative to the mean
+    yield, the water balance error the largest difference in the total of a
+    flux (`water_balance_terms`) over the growing seasons relative to the total
+    rain and irrigation of the growing seasons. Only seasonal totals
+    (`Outputs.Seasonal`) are used, so the model can be run without daily outputs
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : model (not initialized)
+
+    `yield_tol` : `float` : largest yield error accepted
+
+    `water_tol` : `float` : largest water balance error accepted
+
+    `max_dz` : `list` : maximum thickness (m) of merged compartments of each discretization
+
+    `zKeep` : `float` : depth (m) above which compartments are kept (default: maximum rooting depth of the crops)
+
+    `repeat` : `int` : number of runs of each discretization (the fastest is reported)
+
+    *Returns:*
+
+    `Soil` : `SoilClass` : coarsest soil accepted (a copy of the model's soil if none)
+
+    `report` : `pandas.DataFrame` : number of compartments, run time, speedup, errors and acceptance of each discretization (the model's soil first)
+
+    """
+    if zKeep is None:
+        crops = model.Crop if isinstance(model.Crop, (list, tuple)) else [model.Crop]
+        zKeep = max(crop.Zmax for crop in crops)
+
+    Soil = deepcopy(model.Soil)
+    Soil.fill_nan()
+    reference, ref_time = _run(model, Soil, repeat)
+    ref_yield = reference.Outputs.Final["Yield (tonne/ha)"].values.astype(float)
+    ref_flux = reference.Outputs.Seasonal[water_balance_terms].sum()
+    water_in = reference.Outputs.Seasonal[["P", "IrrDay"]].values.sum()
+
+    rows = [[np.nan, reference.ParamStruct.Soil.nComp, ref_time, 1.0, 0.0, 0.0, True]]
+    soils = [Soil]
+    for dz in max_dz:
+        soil = coarsen_soil(model.Soil, zKeep, dz)
+        sample, t = _run(model, soil, repeat)
+
+        Y = sample.Outputs.Final["Yield (tonne/ha)"].values.astype(float)
+        yield_error = np.abs(Y - ref_yield).max() / max(ref_yield.mean(), 1e-9)
+        flux = sample.Outputs.Seasonal[water_balance_terms].sum()
+        water_error = (flux - ref_flux).abs().max() / max(water_in, 1e-9)
+
+        accepted = (yield_error <= yield_tol) and (water_error <= water_tol)
+        rows.append(
+            [dz, sample.ParamStruct.Soil.nComp, t, ref_time / t, yield_error, water_error, accepted]
+        )
+        soils.append(soil)
+
+    report = pd.DataFrame(
+        rows,
+        columns=[
+            "max_dz",
+            "nComp",
+            "time (s)",
+            "speedup",
+            "yield error",
+            "water balance error",
+            "accepted",
+        ],
+    )
+
+    # fewest compartments that are accepted
+    accepted = report[report.accepted]
+    best = accepted.index[accepted.nComp.values.argmin()]
+
+    return soils[best], report
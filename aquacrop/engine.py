@@ -0,0 +1,289 @@
+__all__ = ["KernelRegistry", "registry", "kernel_stamp", "typed_record", "load_kernels", "engine_info"]
+
+# Cell
+import hashlib
+import importlib
+import os
+import time
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+from numba import njit, types
+from numba.core import event, sigutils
+
+# Cell
+class KernelRegistry:
+    """
+    Registry of the functions in `solution.py` that are compiled to machine code.
+    Has the same `export` decorator as `numba.pycc.CC` so the same signatures are
+    used whether the kernels come from the AOT module or are compiled with `numba.njit`
+
+    **Attributes**:\n
+
+    `kernels` : `dict` : (python function, signature) for each exported name
+
+    """
+
+    def __init__(self):
+        self.kernels = {}
+
+    def export(self, exported_name, sig):
+        def register(func):
+            self.kernels[exported_name] = (func, sig)
+            return func
+
+        return register
+
+
+registry = KernelRegistry()
+
+_engine = SimpleNamespace(kernels=None, backend=None, compile_time=0.0)
+
+_solution_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solution.py")
+
+
+def kernel_stamp(signatures, source):
+    """
+    Function to get a stamp of the kernels: a hash of the name and signature of
+    every kernel and of the source they are compiled from. It is compiled into
+    `solution_aot` (as `_kernel_stamp`) so a module built from other kernels is
+    not loaded
+
+    *Arguments:*\n
+
+    `signatures` : `dict` : signature of each kernel name
+
+    `source` : `bytes` : source of `solution.py`
+
+    *Returns:*
+
+    `stamp` : `int` : stamp (fits a signed 64 bit integer)
+
+    """
+    h = hashlib.sha256()
+    for name in sorted(signatures):
+        args, return_type = sigutils.normalize_signature(signatures[name])
+        h.update(f"{name}:{return_type}{args}\n".encode())
+    h.update(source)
+
+    return int(h.hexdigest()[:15], 16)
+
+
+# Cell
+class _CompileTimer(event.Listener):
+    """
+    numba event listener that adds the time spent compiling (or loading from
+    the on-disk cache) to the engine compile time
+
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.start = 0.0
+
+    def on_start(self, evt):
+        if self.depth == 0:
+            self.start = time.perf_counter()
+        self.depth += 1
+
+    def on_end(self, evt):
+        self.depth -= 1
+        if self.depth == 0:
+            _engine.compile_time += time.perf_counter() - self.start
+
+
+def _c_layout(ty):
+    """
+    Function to switch arrays inside named tuples to C layout. Arrays inside
+    tuples are not converted to the layout in the signature, and the
+    parameter records are always contiguous (see `typed_record`)
+
+    """
+    if isinstance(ty, types.BaseNamedTuple):
+        fields = [_c_layout(t) for t in ty.types]
+        if len(set(fields)) == 1:
+            # tuples with a single field type are typed as NamedUniTuple
+            return types.NamedUniTuple(fields[0], len(fields), ty.instance_class)
+        return types.NamedTuple(fields, ty.instance_class)
+    if isinstance(ty, types.Array):
+        return ty.copy(layout="C")
+    return ty
+
+
+def _converter(ty):
+    """
+    Function to get a function converting a python value to numba type `ty`,
+    mirroring the argument conversion done by the AOT wrappers
+
+    """
+    if isinstance(ty, types.Array):
+        return lambda x: np.ascontiguousarray(x, dtype=ty.dtype.name)
+    if isinstance(ty, types.Boolean):
+        return bool
+    if isinstance(ty, types.Integer):
+        return int
+    if isinstance(ty, types.Float):
+        return float
+    return lambda x: x
+
+
+def typed_record(ty, record):
+    """
+    Function to convert the fields of a named tuple of parameters (`CropStructNT`,
+    `SoilProfileNT`) to the field types of its kernel signature type, as the AOT
+    wrappers do on every call. jit dispatchers only accept exactly matching
+    named tuples, so records are converted once when they are made and the
+    kernels are called with them directly
+
+    *Arguments:*\n
+
+    `ty` : `numba.types.NamedTuple` : signature type of the record
+
+    `record` : `tuple` : named tuple of parameters
+
+    *Returns:*
+
+    `record` : `tuple` : named tuple with fields of the signature types
+
+    """
+    return record._make(_converter(t)(v) for t, v in zip(ty.types, record))
+
+
+def _jit_kernel(func, sig):
+    """
+    Function to compile a kernel with `numba.njit` for its AOT signature. The
+    dispatcher is called directly, so named tuple arguments must already have
+    the signature field types (see `typed_record`)
+
+    """
+    args, return_type = sigutils.normalize_signature(sig)
+    # array arguments keep the layout of the signature (any layout for `f8[:]`)
+    args = tuple(_c_layout(t) if isinstance(t, types.BaseNamedTuple) else t for t in args)
+    return njit(args if return_type is None else return_type(*args), cache=True)(func)
+
+
+def _jit_kernels():
+    """
+    Function to compile every registered kernel with `numba.njit`. Compiled
+    code is cached on disk so only the first run after installation (or
+    `python -m aquacrop.build --jit`) pays for compilation
+
+    *Returns:*
+
+    `kernels` : `SimpleNamespace` : one attribute per compiled kernel
+
+    """
+    # make sure all kernels have been registered
+    importlib.import_module(".solution", __package__)
+
+    event.register("numba:compile", _CompileTimer())
+
+    return SimpleNamespace(
+        **{name: _jit_kernel(func, sig) for name, (func, sig) in registry.kernels.items()}
+    )
+
+
+def _aot_mismatch(module):
+    """
+    Function to check that an AOT module was built from the registered kernels
+
+    *Arguments:*\n
+
+    `module` : `module` : AOT compiled kernels
+
+    *Returns:*
+
+    `reason` : `str` : why the module does not match (`None` if it does)
+
+    """
+    missing = [name for name in registry.kernels if not hasattr(module, name)]
+    if missing:
+        return f"it has no {', '.join(missing)}"
+    if not hasattr(module, "_kernel_stamp"):
+        return "it has no kernel stamp"
+
+    with open(_solution_path, "rb") as f:
+        source = f.read()
+    signatures = {name: sig for name, (func, sig) in registry.kernels.items()}
+    if module._kernel_stamp() != kernel_stamp(signatures, source):
+        return "the kernels or their signatures have changed since it was built"
+
+    return None
+
+
+def load_kernels():
+    """
+    Function to load the compiled model kernels. Uses the ahead-of-time compiled
+    `solution_aot` module when it has been built from the current kernels,
+    otherwise falls back to compiling the kernels with `numba.njit` (with a
+    warning if the AOT module is out of date). The backend can be forced by
+    setting the `AQUACROP_ENGINE` environment variable to `aot` or `jit`
+
+    *Returns:*
+
+    `kernels` : `module` : object with one attribute per compiled kernel
+
+    """
+    if _engine.kernels is not None:
+        return _engine.kernels
+
+    backend = os.environ.get("AQUACROP_ENGINE", "").lower()
+    assert backend in ("", "aot", "jit"), f"unknown AQUACROP_ENGINE: {backend}"
+
+    start = time.perf_counter()
+    kernels = None
+    if backend != "jit":
+        # make sure all kernels have been registered (the kernels are loaded
+        # at the end of `solution`)
+        importlib.import_module(".solution", __package__)
+        if _engine.kernels is not None:
+            return _engine.kernels
+
+        try:
+            kernels = importlib.import_module(".solution_aot", __package__)
+        except ImportError:
+            if backend == "aot":
+                raise
+        else:
+            reason = _aot_mismatch(kernels)
+            if reason is None:
+                backend = "aot"
+            else:
+                message = (
+                    f"solution_aot does not match the model kernels ({reason}), "
+                    "rebuild it with `python -m aquacrop.build`"
+                )
+                if backend == "aot":
+                    raise ImportError(message)
+                warnings.warn(message + ", falling back to numba.njit")
+                kernels = None
+
+    if kernels is None:
+        kernels = _jit_kernels()
+        backend = "jit"
+
+    _engine.kernels = kernels
+    _engine.backend = backend
+    _engine.compile_time = time.perf_counter() - start
+
+    return kernels
+
+
+# Cell
+def engine_info():
+    """
+    Function to report which backend the model kernels are running on
+
+    *Returns:*
+
+    `info` : `dict` : backend (`aot` or `jit`, `None` if not loaded yet),
+    time (s) taken to load the kernels (including any jit compilation so far)
+    and number of kernels
+
+    """
+    return {
+        "backend": _engine.backend,
+        "compile_time": _engine.compile_time,
+        "kernels": len(registry.kernels),
+    }
@@ -0,0 +1,213 @@
+__all__ = ["observation_names", "IrrigationVectorEnv"]
+
+# Cell
+from copy import copy, deepcopy
+
+import numpy as np
+
+from .timestep import solution, check_model_termination, update_time
+
+# Cell
+# variables in each observation (the weather is that of the day the action is
+# applied to)
+observation_names = [
+    "Depletion",
+    "TAW",
+    "SurfaceStorage",
+    "GrowthStage",
+    "CC",
+    "IrrCum",
+    "MinTemp",
+    "MaxTemp",
+    "Precipitation",
+    "ReferenceET",
+]
+
+
+# Cell
+class IrrigationVectorEnv:
+    """
+    Gym-style vector environment of `num_envs` copies of a simulation in which the
+    daily irrigation is chosen by the agent. The environments share the model
+    parameters and weather and are stepped together. Each episode is the whole
+    simulation, and environments are reset (automatically when they terminate)
+    to a copy of the model's conditions just after initialization, so the soil,
+    crop and weather are only set up once.
+
+    Actions are irrigation depths (mm) or, with `ponding=True`, target depths of
+    ponded water (mm) between the bunds, which are topped up with irrigation at
+    the start of the day. Irrigation is only applied in the growing season and
+    is limited by `MaxIrr` and `MaxIrrSeason` of the model's irrigation management
+
+    The reward of each day is the yield (tonne/ha) on the day of harvest minus
+    `irrigation_cost` times the irrigation applied (mm)
+
+    **Attributes**:\n
+
+    `num_envs` : `int` : number of environments
+
+    `ClockStructs` : `list` : model time paramaters of each environment
+
+    `InitConds` : `list` : current conditions of each environment
+
+    `Outputs` : `list` : outputs of the current episode of each environment
+
+    `FinalOutputs` : `list` : outputs of the last finished episode of each environment
+
+    `observation_names` : `list` : variables in each observation
+
+    """
+
+    def __init__(self, model, num_envs=1, ponding=False, irrigation_cost=0.0):
+        """
+        *Arguments:*\n
+
+        `model` : `AquaCropModel` : model to simulate, with irrigation method 5 (depth applied each day)
+
+        `num_envs` : `int` : number of environments
+
+        `ponding` : `bool` : actions are target ponding depths rather than irrigation depths
+
+        `irrigation_cost` : `float` : cost of irrigation (tonne/ha per mm)
+
+        """
+        assert model.IrrMngt.IrrMethod == 5, "irrigation method must be 5 (depth applied each day)"
+
+        model.initialize()
+
+        self.model = model
+        self.num_envs = num_envs
+        self.ponding = ponding
+        self.irrigation_cost = irrigation_cost
+        self.observation_names = observation_names
+        self.ParamStruct = model.ParamStruct
+        self.weather = model.weather
+
+        # conditions just after initialization that every episode starts from
+        self._ClockStruct = copy(model.ClockStruct)
+        self._InitCond = deepcopy(model.InitCond)
+        self._Outputs = deepcopy(model.Outputs)
+
+        self.ClockStructs = [None] * num_envs
+        self.InitConds = [None] * num_envs
+        self.Outputs = [None] * num_envs
+        self.FinalOutputs = [None] * num_envs
+
+    def _reset_env(self, i):
+        """
+        Function to restore environment `i` to the conditions after initialization
+        """
+        self.ClockStructs[i] = copy(self._ClockStruct)
+        self.InitConds[i] = deepcopy(self._InitCond)
+        self.Outputs[i] = deepcopy(self._Outputs)
+
+    def _observe(self, i):
+        """
+        Function to get the observation of environment `i`
+        """
+        InitCond = self.InitConds[i]
+        weather_step = self.weather[self.ClockStructs[i].TimeStepCounter]
+
+        return [
+            InitCond.Depletion,
+            InitCond.TAW,
+            InitCond.SurfaceStorage,
+            InitCond.GrowthStage,
+            InitCond.CC,
+            InitCond.IrrCum,
+            weather_step[0],
+            weather_step[1],
+            weather_step[2],
+            weather_step[3],
+        ]
+
+    def reset(self):
+        """
+        Function to reset every environment
+
+        *Returns:*
+
+        `observations` : `np.array` : observation of each environment (environments x `observation_names`)
+
+        `infos` : `dict` : empty
+
+        """
+        for i in range(self.num_envs):
+            self._reset_env(i)
+
+        return np.array([self._observe(i) for i in range(self.num_envs)], dtype=float), {}
+
+    def step(self, actions):
+        """
+        Function to simulate one day in every environment
+
+        *Arguments:*\n
+
+        `actions` : `np.array` : irrigation depth (or target ponding depth) of each environment (mm)
+
+        *Returns:*
+
+        `observations` : `np.array` : observation of each environment (of the reset environment if it has terminated)
+
+        `rewards` : `np.array` : reward of each environment
+
+        `terminated` : `np.array` : whether each environment reached the end of the simulation (and has been reset)
+
+        `truncated` : `np.array` : always False
+
+        `infos` : `dict` : `"final_observation"`, the last observation of terminated environments
+
+        """
+        actions = np.asarray(actions, dtype=float).reshape(self.num_envs)
+        ParamStruct = self.ParamStruct
+        IrrMngt = ParamStruct.IrrMngt
+
+        observations = np.zeros((self.num_envs, len(self.observation_names)))
+        rewards = np.zeros(self.num_envs)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        final_observations = np.full((self.num_envs, len(self.observation_names)), np.nan)
+
+        for i in range(self.num_envs):
+            ClockStruct = self.ClockStructs[i]
+            InitCond = self.InitConds[i]
+
+            depth = actions[i]
+            if self.ponding:
+                depth = (depth - InitCond.SurfaceStorage) * 100 / IrrMngt.AppEff
+
+            IrrMngt.depth = max(depth, 0)
+            harvested = InitCond.HarvestFlag
+            IrrCum = InitCond.IrrCum
+
+            InitCond, ParamStruct, Outputs = solution(
+                InitCond,
+                ParamStruct,
+                ClockStruct,
+                self.weather[ClockStruct.TimeStepCounter],
+                self.Outputs[i],
+            )
+
+            rewards[i] = -self.irrigation_cost * (InitCond.IrrCum - IrrCum)
+            if InitCond.HarvestFlag and not harvested:
+                rewards[i] += InitCond.Y
+
+            ClockStruct = check_model_termination(ClockStruct, InitCond)
+            ClockStruct, InitCond, ParamStruct, Outputs = update_time(
+                ClockStruct, InitCond, ParamStruct, Outputs, self.weather
+            )
+
+            self.ClockStructs[i] = ClockStruct
+            self.InitConds[i] = InitCond
+            self.Outputs[i] = Outputs
+
+            if ClockStruct.ModelTermination:
+                terminated[i] = True
+                final_observations[i] = self._observe(i)
+                self.FinalOutputs[i] = Outputs
+                self._reset_env(i)
+
+            observations[i] = self._observe(i)
+
+        infos = {"final_observation": final_observations}
+
+        return observations, rewards, terminated, np.zeros(self.num_envs, dtype=bool), infos
@@ -2,24 +2,36 @@ __all__ = [
     "read_clock_paramaters",
     "read_weather_inputs",
     "read_model_parameters",
+    "compute_harvest_date",
+    "read_season_dates",
     "read_irrigation_management",
     "read_field_management",
     "read_groundwater_table",
+    "load_co2_table",
+    "compute_co2_series",
+    "compute_fCO2",
+    "make_crop_struct",
     "compute_variables",
+    "compute_soil_variables",
+    "compute_crop_variables",
     "compute_crop_calander",
     "calculate_HIGC",
     "calculate_HI_linear",
+    "compute_gdd_series",
+    "compute_season_calendars",
     "read_model_initial_conditions",
     "create_soil_profile",
 ]
 
 # Cell
+import math
 import numpy as np
 import os
 import pandas as pd
 from .classes import *
 import pathlib
 from copy import deepcopy
+from .engine import typed_record
 import aquacrop
 
 
@@ -98,11 +110,18 @@ def read_weather_inputs(ClockStruct, weather_df):
 
 
 # Cell
-def read_model_parameters(ClockStruct, Soil, Crop, weather_df):
+def read_model_parameters(
+    ClockStruct, Soil, Crop, weather_df, planting_dates=None, harvest_dates=None
+):
     """
     Finalise soil and crop paramaters including planting and harvest dates
     save to new object ParamStruct
 
+    Seasons are found from the crop's planting and harvest dates (mm/dd) unless
+    the date of each season is given. A crop rotation is given by a list of
+    crops, one for each season. Seasons of the same crop object share its
+    parameters
+
 
     *Arguments:*\n
 
@@ -110,11 +129,13 @@ def read_model_parameters(ClockStruct, Soil, Crop, weather_df):
 
     `Soil` : `SoilClass` :  soil object
 
-    `Crop` : `CropClass` :  crop object
+    `Crop` : `CropClass` or `list` :  crop object, or crop object of each season
 
-    `planting_dates` : `list` :  list of datetimes
+    `weather_df`: `pandas.DataFrame` :  weather data for simulation period
 
-    `harvest_dates` : `list` : list of datetimes
+    `planting_dates` : `list` :  planting date (YYYY/MM/DD) of each season
+
+    `harvest_dates` : `list` : latest harvest date (YYYY/MM/DD) of each season
 
     *Returns:*
 
@@ -131,59 +152,123 @@ def read_model_parameters(ClockStruct, Soil, Crop, weather_df):
     # Assign Soil object to ParamStruct
     ParamStruct.Soil = Soil
 
-    while Soil.zSoil < Crop.Zmax + 0.1:
-        for i in Soil.profile.index[::-1]:
-            if Soil.profile.loc[i, "dz"] < 0.25:
-                Soil.profile.loc[i, "dz"] += 0.1
-                Soil.fill_nan()
-                break
-
     ###########
     # crop
     ###########
 
-    #     if isinstance(Crop, Iterable):
-    #         CropList=list(Crop)
-    #     else:
-    #         CropList = [Crop]
+    if isinstance(Crop, (list, tuple)):
+        assert planting_dates is not None, "planting_dates are needed for a crop rotation"
+        SeasonCropList = list(Crop)
+    elif planting_dates is not None:
+        SeasonCropList = [Crop] * len(planting_dates)
+    else:
+        SeasonCropList = None
+
+    if SeasonCropList is None:
+        # Only one crop type considered during simulation - i.e. no rotations
+        # either within or between years
+        ParamStruct.CropList = [Crop]
+        ParamStruct.SpecifiedPlantCalander = "N"
+
+        if Crop.HarvestDate == None:
+            Crop = compute_harvest_date(Crop, ClockStruct, weather_df)
+
+        # planting and harvest date of every growing season
+        PlantingDates, HarvestDates = read_season_dates(ClockStruct, Crop)
+        SeasonCrops = [0] * len(PlantingDates)
+
+    else:
+        # Crop and dates of each season are given (e.g. crop rotations)
+        ParamStruct.CropList = list({id(crop): crop for crop in SeasonCropList}.values())
+        ParamStruct.SpecifiedPlantCalander = "Y"
+
+        crop_index = {id(crop): i for i, crop in enumerate(ParamStruct.CropList)}
+        SeasonCrops = [crop_index[id(crop)] for crop in SeasonCropList]
+
+        PlantingDates = pd.to_datetime(planting_dates)
+        HarvestDates = pd.to_datetime(harvest_dates)
+        assert (
+            len(SeasonCropList) == len(PlantingDates) == len(HarvestDates)
+        ), "a crop, planting date and harvest date are needed for each season"
+        assert (HarvestDates > PlantingDates).all(), "seasons must be harvested after planting"
+        assert (PlantingDates[1:] > HarvestDates[:-1]).all(), "seasons must not overlap"
+        assert (PlantingDates >= ClockStruct.SimulationStartDate).all() and (
+            HarvestDates <= ClockStruct.SimulationEndDate
+        ).all(), "seasons must be in the simulation period"
+
+    # assign variables to paramstruct
+    ParamStruct.NCrops = len(ParamStruct.CropList)
+    ParamStruct.SeasonCrops = SeasonCrops
+
+    # soil must be deeper than the deepest rooting crop
+    Zmax = max(crop.Zmax for crop in ParamStruct.CropList)
+    Soil.extend_profile(Zmax + 0.1)
+
+    # save crop choices
+    ParamStruct.CropChoices = [ParamStruct.CropList[i].Name for i in SeasonCrops]
+
+    # save clock paramaters
+    ClockStruct.PlantingDates = PlantingDates
+    ClockStruct.HarvestDates = HarvestDates
+    ClockStruct.nSeasons = len(PlantingDates)
+
+    # Initialise growing season counter
+    if pd.to_datetime(ClockStruct.StepStartTime) == ClockStruct.PlantingDates[0]:
+        ClockStruct.SeasonCounter = 0
+    else:
+        ClockStruct.SeasonCounter = -1
+
+    # return the FileLocations object as i have added some elements
+    return ClockStruct, ParamStruct
+
+
+def compute_harvest_date(Crop, ClockStruct, weather_df):
+    """
+    Function to set the latest harvest date of a crop that has none, 30 days
+    after the crop matures in its first season
+
+    *Arguments:*\n
+
+    `Crop` : `CropClass` :  crop object (without a harvest date)
+
+    `ClockStruct` : `ClockStructClass`:  time params
+
+    `weather_df`: `pandas.DataFrame` :  weather data for simulation period
 
-    #     # assign variables to paramstruct
-    #     ParamStruct.NCrops = len(CropList)
-    #     if ParamStruct.NCrops > 1:
-    #         ParamStruct.SpecifiedPlantCalander = 'Y'
-    #     else:
-    #         ParamStruct.SpecifiedPlantCalander = 'N'
+    *Returns:*
 
-    #     # add crop list to ParamStruct
-    #     ParamStruct.CropList = CropList
+    `Crop` : `CropClass` :  crop object with its harvest date
+
+    """
+    Crop = compute_crop_calander(Crop, ClockStruct, weather_df)
+    mature = int(Crop.MaturityCD + 30)
+    plant = pd.to_datetime("1990/" + Crop.PlantingDate)
+    harv = plant + np.timedelta64(mature, "D")
+    new_harvest_date = str(harv.month) + "/" + str(harv.day)
+    Crop.HarvestDate = new_harvest_date
 
-    ############################
-    # plant and harvest times
-    ############################
+    return Crop
 
-    #     # find planting and harvest dates
-    #     # check if there is more than 1 crop or multiple plant dates in sim year
-    #     if ParamStruct.SpecifiedPlantCalander == "Y":
-    #         # if here than crop rotation occours during same period
 
-    #         # create variables from dataframe
-    #         PlantingDates = pd.to_datetime(planting_dates)
-    #         HarvestDates = pd.to_datetime(harvest_dates)
+# Cell
+def read_season_dates(ClockStruct, Crop):
+    """
+    Function to find the planting and harvest date of every growing season
+    in the simulation period
+
+    *Arguments:*\n
 
-    #         if (ParamStruct.NCrops > 1):
+    `ClockStruct` : `ClockStructClass`:  time params
 
-    #             CropChoices = [crop.Name for crop in ParamStruct.CropList]
+    `Crop` : `CropClass` :  crop object (with planting and harvest dates)
 
-    #         assert len(CropChoices) == len(PlantingDates) == len(HarvestDates)
+    *Returns:*
 
-    # elif ParamStruct.NCrops == 1:
-    # Only one crop type considered during simulation - i.e. no rotations
-    # either within or between years
+    `PlantingDates` : `pandas.DatetimeIndex` :  planting date of each season
 
-    CropList = [Crop]
-    ParamStruct.CropList = CropList
-    ParamStruct.NCrops = 1
+    `HarvestDates` : `pandas.DatetimeIndex` :  harvest date of each season
 
+    """
     # Get start and end years for full simulation
     SimStartDate = ClockStruct.SimulationStartDate
     SimEndDate = ClockStruct.SimulationEndDate
@@ -192,14 +277,6 @@ def read_model_parameters(ClockStruct, Soil, Crop, weather_df):
     start_end_years = pd.DatetimeIndex([SimStartDate, SimEndDate]).year
     start_end_months = pd.DatetimeIndex([SimStartDate, SimEndDate]).month
 
-    if Crop.HarvestDate == None:
-        Crop = compute_crop_calander(Crop, ClockStruct, weather_df)
-        mature = int(Crop.MaturityCD + 30)
-        plant = pd.to_datetime("1990/" + Crop.PlantingDate)
-        harv = plant + np.timedelta64(mature, "D")
-        new_harvest_date = str(harv.month) + "/" + str(harv.day)
-        Crop.HarvestDate = new_harvest_date
-
     # check if crop growing season runs over calander year
     # Planting and harvest dates are in days/months format so just add arbitrary year
     singleYear = pd.to_datetime("1990/" + Crop.PlantingDate) < pd.to_datetime(
@@ -241,30 +318,13 @@ def read_model_parameters(ClockStruct, Soil, Crop, weather_df):
     # create lists to hold variables
     PlantingDates = []
     HarvestDates = []
-    CropChoices = []
 
-    # save full harvest/planting dates and crop choices to lists
+    # save full harvest/planting dates to lists
     for i in range(len(plant_years)):
-        PlantingDates.append(str(plant_years[i]) + "/" + ParamStruct.CropList[0].PlantingDate)
-        HarvestDates.append(str(harvest_years[i]) + "/" + ParamStruct.CropList[0].HarvestDate)
-        CropChoices.append(ParamStruct.CropList[0].Name)
-
-    # save crop choices
-    ParamStruct.CropChoices = list(CropChoices)
-
-    # save clock paramaters
-    ClockStruct.PlantingDates = pd.to_datetime(PlantingDates)
-    ClockStruct.HarvestDates = pd.to_datetime(HarvestDates)
-    ClockStruct.nSeasons = len(PlantingDates)
+        PlantingDates.append(str(plant_years[i]) + "/" + Crop.PlantingDate)
+        HarvestDates.append(str(harvest_years[i]) + "/" + Crop.HarvestDate)
 
-    # Initialise growing season counter
-    if pd.to_datetime(ClockStruct.StepStartTime) == ClockStruct.PlantingDates[0]:
-        ClockStruct.SeasonCounter = 0
-    else:
-        ClockStruct.SeasonCounter = -1
-
-    # return the FileLocations object as i have added some elements
-    return ClockStruct, ParamStruct
+    return pd.to_datetime(PlantingDates), pd.to_datetime(HarvestDates)
 
 
 # Cell
@@ -296,6 +356,9 @@ def read_irrigation_management(ParamStruct, IrrMngt, ClockStruct):
         # change the index to the date
         df.index = pd.DatetimeIndex(df.Date)
 
+        # keep the dated schedule in case the simulation is extended
+        ParamStruct.IrrSchedule = df
+
         # create a dateframe containing the daily irrigation to
         # be applied for every day in the simulation
         df = df.reindex(ClockStruct.TimeSpan, fill_value=0).drop("Date", axis=1)
@@ -353,6 +416,10 @@ def read_field_management(ParamStruct, FieldMngt, FallowFieldMngt):
         if hasattr(fallow_field_mngt_struct, a):
             fallow_field_mngt_struct.__setattr__(a, v)
 
+    # bund heights are stored as 0-d arrays, the compiled functions take floats
+    for struct in [field_mngt_struct, fallow_field_mngt_struct]:
+        struct.zBund = float(struct.zBund)
+
     ParamStruct.FieldMngt = field_mngt_struct
     ParamStruct.FallowFieldMngt = fallow_field_mngt_struct
 
@@ -451,6 +518,171 @@ def read_groundwater_table(ParamStruct, GwStruct, ClockStruct):
 
 
 # Cell
+_CO2_TABLES = {}
+
+
+def load_co2_table(
+    filepath=pathlib.Path(os.path.abspath(aquacrop.__file__)).parent / "data/MaunaLoaCO2.txt",
+):
+    """
+    Function to read in a table of annual CO2 concentrations. Tables are
+    cached by file path so the file is only read once per process
+
+    *Arguments:*\n
+
+    `filepath` : `str` :  location of CO2 file (two header lines followed by year, ppm columns)
+
+    *Returns:*
+
+    `years` : `np.array` :  years of CO2 record
+
+    `ppm` : `np.array` :  CO2 concentration (ppm) for each year
+
+    """
+
+    key = os.path.abspath(filepath)
+    if key not in _CO2_TABLES:
+        table = np.loadtxt(key, skiprows=2, ndmin=2)
+        years = table[:, 0].copy()
+        ppm = table[:, 1].copy()
+        years.flags.writeable = False
+        ppm.flags.writeable = False
+        _CO2_TABLES[key] = (years, ppm)
+
+    return _CO2_TABLES[key]
+
+
+# Cell
+def compute_co2_series(
+    sim_years,
+    CO2concAdj=None,
+    acfp=pathlib.Path(os.path.abspath(aquacrop.__file__)).parent,
+):
+    """
+    Function to get the CO2 concentration for each simulation year
+
+    *Arguments:*\n
+
+    `sim_years` : `np.array` :  simulation years
+
+    `CO2concAdj` : `float`, `pd.Series`, `np.array` or `str` :  CO2 concentration to use instead of the Mauna Loa record.
+    A single value is used for every year. A `pd.Series` indexed by year, an (n, 2) array of year, ppm pairs
+    or a path to a file in the same format as `MaunaLoaCO2.txt` is interpolated to the simulation years
+    (e.g. an RCP pathway). A 1D array with one value per simulation year is used as is.
+
+    `acfp` : `Path` :  path to aquacrop directory containing co2 data
+
+    *Returns:*
+
+    `CO2conc` : `np.array` :  CO2 concentration (ppm) for each simulation year
+
+    """
+
+    sim_years = np.asarray(sim_years)
+
+    if CO2concAdj is None:
+        years, ppm = load_co2_table(acfp / "data/MaunaLoaCO2.txt")
+    elif isinstance(CO2concAdj, (str, pathlib.Path)):
+        years, ppm = load_co2_table(CO2concAdj)
+    elif isinstance(CO2concAdj, pd.Series):
+        years, ppm = CO2concAdj.index.values, CO2concAdj.values
+    elif np.ndim(CO2concAdj) == 0:
+        return np.full(len(sim_years), float(CO2concAdj))
+    else:
+        CO2concAdj = np.asarray(CO2concAdj, dtype=float)
+        if CO2concAdj.ndim == 1:
+            assert len(CO2concAdj) == len(
+                sim_years
+            ), "CO2 pathway must have one value per simulation year"
+            return CO2concAdj.copy()
+
+        years, ppm = CO2concAdj[:, 0], CO2concAdj[:, 1]
+
+    # Interpolate data
+    return np.interp(sim_years, years, ppm)
+
+
+# Cell
+def compute_fCO2(CO2conc, CO2ref, bsted, bface, fsink, WP):
+    """
+    Function to calculate water productivity adjustment factor for
+    elevated CO2 concentration. Works on single values or arrays of
+    concentrations (e.g. one per simulation year)
+
+    *Arguments:*\n
+
+    `CO2conc` : `float` or `np.array` :  CO2 concentration (ppm)
+
+    `CO2ref` : `float` :  reference CO2 concentration (ppm)
+
+    `bsted` : `float` :  WP co2 adjustment parameter given by Steduto et al. 2007
+
+    `bface` : `float` :  WP co2 adjustment parameter given by FACE experiments
+
+    `fsink` : `float` :  Crop performance under elevated atmospheric CO2 concentration (%/100)
+
+    `WP` : `float` :  Water productivity normalized for ET0 and C02 (g/m2)
+
+    *Returns:*
+
+    `fCO2` : `float` or `np.array` :  WP adjustment factor
+
+    """
+
+    CO2conc = np.asarray(CO2conc, dtype=float)
+
+    # Get CO2 weighting factor (0 at or below reference, 1 at or above 550 ppm)
+    fw = np.clip(1 - ((550 - CO2conc) / (550 - CO2ref)), 0, 1)
+
+    # Determine initial adjustment
+    fCO2 = (CO2conc / CO2ref) / (
+        1
+        + (CO2conc - CO2ref)
+        * ((1 - fw) * bsted + fw * ((bsted * fsink) + (bface * (1 - fsink))))
+    )
+
+    # Consider crop type
+    if WP >= 40:
+        # No correction for C4 crops
+        ftype = 0
+    elif WP <= 20:
+        # Full correction for C3 crops
+        ftype = 1
+    else:
+        ftype = (40 - WP) / (40 - 20)
+
+    # Total adjustment
+    fCO2 = 1 + ftype * (fCO2 - 1)
+    if fCO2.ndim == 0:
+        return float(fCO2)
+
+    return fCO2
+
+
+# Cell
+# attributes of a crop that are copied to its CropStruct
+_crop_struct_fields = frozenset(dict(crop_spec))
+
+
+def make_crop_struct(crop):
+    """
+    Function to make the CropStruct of a crop
+
+    *Arguments:*\n
+
+    `crop` : `CropClass` : crop
+
+    *Returns:*
+
+    `crop_struct` : `CropStruct` : crop parameters used by the model
+
+    """
+    crop_struct = CropStruct()
+    crop_struct.__dict__.update((a, v) for a, v in crop.__dict__.items() if a in _crop_struct_fields)
+
+    return crop_struct
+
+
 def compute_variables(
     ParamStruct,
     weather_df,
@@ -476,6 +708,50 @@ def compute_variables(
     `ParamStruct` : `ParamStructClass` :  updated model params
 
 
+    """
+
+    ParamStruct = compute_soil_variables(ParamStruct)
+
+    ## Calculate WP adjustment factor for elevation in CO2 concentration ##
+    # Years
+    start_year, end_year = pd.DatetimeIndex(
+        [ClockStruct.SimulationStartDate, ClockStruct.SimulationEndDate]
+    ).year
+    sim_years = np.arange(start_year, end_year + 1)
+
+    # CO2 concentration for each simulation year (Mauna Loa record unless a
+    # fixed value or custom pathway has been supplied)
+    CO2conc = compute_co2_series(sim_years, ParamStruct.CO2concAdj, acfp)
+
+    # Store data
+    ParamStruct.CO2years = sim_years
+    ParamStruct.CO2conc = CO2conc
+    ParamStruct.CO2data = pd.Series(CO2conc, index=sim_years)  # maybe get rid of this
+
+    ParamStruct.CO2 = CO2Class()
+
+    # Get CO2 concentration for first year
+    ParamStruct.CO2.CurrentConc = CO2conc[0]
+
+    ParamStruct = compute_crop_variables(ParamStruct, weather_df, ClockStruct)
+
+    return ParamStruct
+
+
+def compute_soil_variables(ParamStruct):
+    """
+    Function to compute the variables that depend on the soil profile
+    (capillary rise parameters, readily evaporable water and curve number)
+
+    *Arguments:*\n
+
+    `ParamStruct` : `ParamStructClass` :  Contains model paramaters
+
+    *Returns:*
+
+    `ParamStruct` : `ParamStructClass` :  updated model params
+
+
     """
 
     if ParamStruct.WaterTable == 1:
@@ -507,13 +783,40 @@ def compute_variables(
 
         assert ksat > 0
 
+    return ParamStruct
+
+
+def compute_crop_variables(ParamStruct, weather_df, ClockStruct):
+    """
+    Function to compute the crop variables (calendar, harvest index growth and
+    CO2 adjustment of each crop in `ParamStruct.CropList`) and create the
+    CropStruct of each season, with the CO2 concentrations computed by
+    `compute_variables`
+
+    *Arguments:*\n
+
+    `ParamStruct` : `ParamStructClass` :  Contains model paramaters
+
+    `weather_df` : `pd.DataFrame` :  weather data
+
+    `ClockStruct` : `ClockStructClass` :  time params
+
+    *Returns:*
+
+    `ParamStruct` : `ParamStructClass` :  updated model params
+
+
+    """
+
     for i in range(ParamStruct.NCrops):
 
         crop = ParamStruct.CropList[i]
         # crop.calculate_additional_params()
 
-        # Crop calander
-        crop = compute_crop_calander(crop, ClockStruct, weather_df)
+        # Crop calander (from the crop's first season)
+        crop = compute_crop_calander(
+            crop, ClockStruct, weather_df, ParamStruct.SeasonCrops.index(i)
+        )
 
         # Harvest index ParamStruct.Seasonal_Crop_List[ClockStruct.SeasonCounter].Paramsgrowth coefficient
         crop = calculate_HIGC(crop)
@@ -529,106 +832,45 @@ def compute_variables(
 
         ParamStruct.CropList[i] = crop
 
-    ## Calculate WP adjustment factor for elevation in CO2 concentration ##
-    # Load CO2 data
-    co2Data = pd.read_csv(
-        acfp / "data/MaunaLoaCO2.txt", header=1, delim_whitespace=True, names=["year", "ppm"]
-    )
-
-    # Years
-    start_year, end_year = pd.DatetimeIndex(
-        [ClockStruct.SimulationStartDate, ClockStruct.SimulationEndDate]
-    ).year
-    sim_years = np.arange(start_year, end_year + 1)
-
-    # Interpolate data
-    CO2conc = np.interp(sim_years, co2Data.year, co2Data.ppm)
-
-    # Store data
-    ParamStruct.CO2data = pd.Series(CO2conc, index=sim_years)  # maybe get rid of this
-
-    # Get CO2 concentration for first year
-    CO2conc = ParamStruct.CO2data.iloc[0]
-
-    ParamStruct.CO2 = CO2Class()
-
-    if ParamStruct.CO2concAdj != None:
-        CO2conc = ParamStruct.CO2concAdj
-
-    ParamStruct.CO2.CurrentConc = CO2conc
-
     CO2ref = ParamStruct.CO2.RefConc
 
-    # Get CO2 weighting factor for first year
-    if CO2conc <= CO2ref:
-        fw = 0
-    else:
-        if CO2conc >= 550:
-            fw = 1
-        else:
-            fw = 1 - ((550 - CO2conc) / (550 - CO2ref))
-
-    # Determine adjustment for each crop in first year of simulation
+    # Determine adjustment for each crop in every year of simulation
+    ParamStruct.fCO2data = {}
     for i in range(ParamStruct.NCrops):
         crop = ParamStruct.CropList[i]
-        # Determine initial adjustment
-        fCO2 = (CO2conc / CO2ref) / (
-            1
-            + (CO2conc - CO2ref)
-            * (
-                (1 - fw) * crop.bsted
-                + fw * ((crop.bsted * crop.fsink) + (crop.bface * (1 - crop.fsink)))
-            )
-        )
 
-        # Consider crop type
-        if crop.WP >= 40:
-            # No correction for C4 crops
-            ftype = 0
-        elif crop.WP <= 20:
-            # Full correction for C3 crops
-            ftype = 1
-        else:
-            ftype = (40 - crop.WP) / (40 - 20)
+        key = (crop.bsted, crop.bface, crop.fsink, crop.WP)
+        if key not in ParamStruct.fCO2data:
+            ParamStruct.fCO2data[key] = compute_fCO2(
+                ParamStruct.CO2conc, CO2ref, crop.bsted, crop.bface, crop.fsink, crop.WP
+            )
 
-        # Total adjustment
-        crop.fCO2 = 1 + ftype * (fCO2 - 1)
+        # Total adjustment for first year
+        crop.fCO2 = ParamStruct.fCO2data[key][0]
 
         ParamStruct.CropList[i] = crop
 
-    # change this later
-    if ParamStruct.NCrops == 1:
-        crop_list = [deepcopy(ParamStruct.CropList[0]) for i in range(len(ParamStruct.CropChoices))]
-        # ParamStruct.Seasonal_Crop_List = [deepcopy(ParamStruct.CropList[0]) for i in range(len(ParamStruct.CropChoices))]
-
-    else:
-        crop_list = ParamStruct.CropList
+    # Seasons of the same crop share its CropStruct, a season gets its own copy
+    # (with the values of the season table) when it starts (see
+    # reset_initial_conditions)
+    crop_structs = [make_crop_struct(crop) for crop in ParamStruct.CropList]
+    ParamStruct.Seasonal_Crop_List = [crop_structs[i] for i in ParamStruct.SeasonCrops]
 
     # add crop for out of growing season
-    # ParamStruct.Fallow_Crop = deepcopy(ParamStruct.Seasonal_Crop_List[0])
-    Fallow_Crop = deepcopy(crop_list[0])
-
-    ParamStruct.Seasonal_Crop_List = []
-    for crop in crop_list:
-        crop_struct = CropStruct()
-        for a, v in crop.__dict__.items():
-            if hasattr(crop_struct, a):
-                crop_struct.__setattr__(a, v)
+    ParamStruct.Fallow_Crop = make_crop_struct(ParamStruct.CropList[0])
 
-        ParamStruct.Seasonal_Crop_List.append(crop_struct)
+    # Crop calendars for seasons that develop in growing degree days
+    ParamStruct = compute_season_calendars(ParamStruct, ClockStruct, weather_df)
 
-    fallow_struct = CropStruct()
-    for a, v in Fallow_Crop.__dict__.items():
-        if hasattr(fallow_struct, a):
-            fallow_struct.__setattr__(a, v)
-
-    ParamStruct.Fallow_Crop = fallow_struct
+    # the first season starts with the CO2 adjustment of the first year
+    if ClockStruct.nSeasons > 0:
+        ParamStruct.SeasonCalendars[0]["fCO2"] = ParamStruct.Seasonal_Crop_List[0].fCO2
 
     return ParamStruct
 
 
 # Cell
-def compute_crop_calander(crop, ClockStruct, weather_df):
+def compute_crop_calander(crop, ClockStruct, weather_df, season=0):
     """
     Function to compute additional parameters needed to define crop phenological calendar
 
@@ -642,6 +884,8 @@ def compute_crop_calander(crop, ClockStruct, weather_df):
 
     `weather_df`: `pandas.DataFrame` :  weather data for simulation period
 
+    `season` : `int` :  first season of the crop (its weather is used to convert calendar days to GDD)
+
 
     *Returns:*
 
@@ -661,7 +905,7 @@ def compute_crop_calander(crop, ClockStruct, weather_df):
         else:
             pl_date = str(plant_year) + "/" + crop.PlantingDate
     else:
-        pl_date = ClockStruct.PlantingDates[0]
+        pl_date = ClockStruct.PlantingDates[season]
 
     # Define crop calendar mode
     Mode = crop.CalendarType
@@ -993,6 +1237,180 @@ def calculate_HI_linear(crop):
     return crop
 
 
+# Cell
+def compute_gdd_series(Tmin, Tmax, GDDmethod, Tbase, Tupp):
+    """
+    Function to calculate daily growing degree days for a series of
+    temperatures
+
+    *Arguments:*\n
+
+    `Tmin` : `np.array` :  minimum daily temperature (celcius)
+
+    `Tmax` : `np.array` :  maximum daily temperature (celcius)
+
+    `GDDmethod` : `int` :  growing degree day calculation method (1, 2 or 3)
+
+    `Tbase` : `float` :  base temperature (celcius)
+
+    `Tupp` : `float` :  upper temperature threshold (celcius)
+
+
+    *Returns:*
+
+    `GDD` : `np.array` : growing degree days for each day
+
+
+    """
+    if GDDmethod == 1:
+        Tmean = (Tmax + Tmin) / 2
+        Tmean = np.maximum(np.minimum(Tmean, Tupp), Tbase)
+    elif GDDmethod == 2:
+        Tmax = np.maximum(np.minimum(Tmax, Tupp), Tbase)
+        Tmin = np.maximum(np.minimum(Tmin, Tupp), Tbase)
+        Tmean = (Tmax + Tmin) / 2
+    elif GDDmethod == 3:
+        Tmax = np.maximum(np.minimum(Tmax, Tupp), Tbase)
+        Tmin = np.minimum(Tmin, Tupp)
+        Tmean = (Tmax + Tmin) / 2
+        Tmean = np.maximum(Tmean, Tbase)
+
+    return Tmean - Tbase
+
+
+# Cell
+# values of a crop that differ between its seasons: crop calendar (calendar
+# days, for crops that develop in growing degree days) and WP adjustment for
+# CO2 (set when the season starts)
+season_calendar_dtype = np.dtype(
+    [
+        ("MaturityCD", np.int64),
+        ("MaxCanopyCD", np.int64),
+        ("CanopyDevEndCD", np.int64),
+        ("HIstartCD", np.int64),
+        ("HIendCD", np.int64),
+        ("YldFormCD", np.int64),
+        ("FloweringCD", np.int64),
+        ("HIGC", np.float64),
+        ("tLinSwitch", np.int64),
+        ("dHILinear", np.float64),
+        ("fCO2", np.float64),
+    ]
+)
+
+
+def compute_season_calendars(ParamStruct, ClockStruct, weather_df):
+    """
+    Function to compute the crop calendar (in calendar days) of every
+    growing season for crops that develop in growing degree days.
+    Daily GDD's are calculated once for the whole simulation so that
+    the calendar only needs to be looked up at the start of each season
+
+    *Arguments:*\n
+
+    `ParamStruct` : `ParamStructClass` :  Contains model paramaters
+
+    `ClockStruct` : `ClockStructClass` :  model time paramaters
+
+    `weather_df`: `pandas.DataFrame` :  weather data for simulation period
+
+
+    *Returns:*
+
+    `ParamStruct` : `ParamStructClass` :  updated model params
+
+
+    """
+
+    Tmin = weather_df.MinTemp.values.astype(float)
+    Tmax = weather_df.MaxTemp.values.astype(float)
+
+    calendars = np.zeros(ClockStruct.nSeasons, dtype=season_calendar_dtype)
+    errors = {}
+
+    gdd_series = {}
+    hi_params = {}
+    for season, Crop in enumerate(ParamStruct.Seasonal_Crop_List):
+        if Crop.CalendarType != 2:
+            continue
+
+        # Daily GDD's for the whole simulation (shared by seasons of the same crop)
+        key = (Crop.GDDmethod, Crop.Tbase, Crop.Tupp)
+        if key not in gdd_series:
+            gdd_series[key] = compute_gdd_series(Tmin, Tmax, *key)
+
+        GDD = gdd_series[key]
+
+        # Crop must mature within a year so only the first 365 days of the
+        # season are needed
+        start = ClockStruct.TimeSpan.get_loc(ClockStruct.PlantingDates[season])
+        GDDcum = np.cumsum(GDD[start : start + 365])
+
+        if GDDcum[-1] <= Crop.Maturity:
+            total = np.cumsum(GDD[start:])[-1]
+            if total <= Crop.Maturity:
+                errors[season] = (
+                    f"not enough growing degree days in simulation ({total}) "
+                    f"to reach maturity ({Crop.Maturity})"
+                )
+            else:
+                errors[season] = "crop will take longer than 1 year to mature"
+            continue
+
+        # Calendar days from sowing until each GDD threshold is passed
+        thresholds = [
+            Crop.Maturity,
+            Crop.MaxCanopy,
+            Crop.CanopyDevEnd,
+            Crop.HIstart,
+            Crop.HIend,
+            Crop.FloweringEnd if Crop.CropType == 3 else 0,
+        ]
+        idx = np.searchsorted(GDDcum, thresholds, side="right")
+        idx[idx == len(GDDcum)] = 0
+        (MaturityCD, MaxCanopyCD, CanopyDevEndCD, HIstartCD, HIendCD, FloweringEnd) = idx + 1
+
+        if MaturityCD >= 365:
+            errors[season] = "crop will take longer than 1 year to mature"
+            continue
+
+        row = calendars[season]
+        row["MaturityCD"] = MaturityCD
+        row["MaxCanopyCD"] = MaxCanopyCD
+        row["CanopyDevEndCD"] = CanopyDevEndCD
+        row["HIstartCD"] = HIstartCD
+        row["HIendCD"] = HIendCD
+        row["YldFormCD"] = HIendCD - HIstartCD
+        if Crop.CropType == 3:
+            row["FloweringCD"] = FloweringEnd - HIstartCD
+        else:
+            row["FloweringCD"] = -999
+
+        # Harvest index growth coefficient and linear switch only depend on
+        # the length of yield formation
+        hi_key = (int(row["YldFormCD"]), Crop.HI0, Crop.HIini, Crop.CropType)
+        if hi_key not in hi_params:
+            hi_crop = CropStruct()
+            hi_crop.YldFormCD = hi_key[0]
+            hi_crop.HI0 = Crop.HI0
+            hi_crop.HIini = Crop.HIini
+            hi_crop = calculate_HIGC(hi_crop)
+            if Crop.CropType == 3:
+                hi_crop = calculate_HI_linear(hi_crop)
+            else:
+                hi_crop.tLinSwitch = 0
+                hi_crop.dHILinear = 0.0
+
+            hi_params[hi_key] = (hi_crop.HIGC, hi_crop.tLinSwitch, hi_crop.dHILinear)
+
+        row["HIGC"], row["tLinSwitch"], row["dHILinear"] = hi_params[hi_key]
+
+    ParamStruct.SeasonCalendars = calendars
+    ParamStruct.SeasonCalendarErrors = errors
+
+    return ParamStruct
+
+
 # Cell
 def read_model_initial_conditions(ParamStruct, ClockStruct, InitWC):
     """
@@ -1336,10 +1754,16 @@ def create_soil_profile(ParamStruct):
         Profile.aCR = pdf.dz.values*0.
         Profile.bCR = pdf.dz.values*0.
 
+    # drainage coefficients that only depend on soil hydraulic properties
+    # (math.exp matches the exp used in the compiled model, np.exp can differ in
+    # the last digit)
+    Profile.dthdt_s = Profile.tau * (Profile.th_s - Profile.th_fc)
+    Profile.exp_s = np.array([math.exp(x) for x in Profile.th_s - Profile.th_fc]) - 1
+
     # ParamStruct.Soil.Profile = Profile
 
 
-    ParamStruct.Soil.Profile = SoilProfileNT(dz=Profile.dz,
+    Profile = SoilProfileNT(dz=Profile.dz,
                                             dzsum=Profile.dzsum,
                                             zBot=Profile.zBot,
                                             zTop=Profile.zTop,
@@ -1356,7 +1780,12 @@ def create_soil_profile(ParamStruct):
                                             th_fc_Adj=Profile.th_fc_Adj,
                                             aCR=Profile.aCR,
                                             bCR=Profile.bCR,
+                                            dthdt_s=Profile.dthdt_s,
+                                            exp_s=Profile.exp_s,
                                             )
+    # fields of the kernel signature types, so the compiled functions can be
+    # called with the profile as it is
+    ParamStruct.Soil.Profile = typed_record(SoilProfileNT_typ_sig, Profile)
 
 
 
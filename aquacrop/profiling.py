@@ -0,0 +1,282 @@
+__all__ = ["solution_steps", "Profiler", "count_objects", "measure_allocations"]
+
+# Cell
+from collections import Counter
+import json
+import gc
+import sys
+import time
+import tracemalloc
+import types
+
+import pandas as pd
+
+# Cell
+# functions called by each numbered step of timestep.solution (steps 18, crop
+# yield, and 20, net irrigation, are inline and counted in "solution (other)")
+solution_steps = [
+    ("_check_groundwater_table", "1. Groundwater table"),
+    ("_root_development", "2. Root development"),
+    ("pre_irrigation", "3. Pre-irrigation"),
+    ("_drainage", "4. Drainage"),
+    ("_rainfall_partition", "5. Surface runoff"),
+    ("irrigation", "6. Irrigation"),
+    ("_infiltration", "7. Infiltration"),
+    ("capillary_rise", "8. Capillary rise"),
+    ("germination", "9. Germination"),
+    ("growth_stage", "10. Growth stage"),
+    ("canopy_cover", "11. Canopy cover"),
+    ("_soil_evaporation", "12. Soil evaporation"),
+    ("transpiration", "13. Transpiration"),
+    ("groundwater_inflow", "14. Groundwater inflow"),
+    ("_HIref_current_day", "15. Reference harvest index"),
+    ("_biomass_accumulation", "16. Biomass accumulation"),
+    ("harvest_index", "17. Harvest index"),
+    ("root_zone_summary", "19. Root zone water"),
+    # drainage, soil evaporation and root zone water of quiescent fallow days
+    # (see `timestep.quiescent_solution`), which skip the steps above
+    ("quiescent_solution", "Quiescent fallow days"),
+]
+
+
+# Cell
+class Profiler:
+    """
+    Records wall time and number of calls of each step of the model solution,
+    `update_time` and `reset_initial_conditions`. Profiled versions of the
+    functions are copies using their own globals, so models that are not
+    profiled run the original functions untouched. Only the totals of each
+    step are kept, unless the calls are traced
+
+    **Attributes**:\n
+
+    `calls` : `dict` : number of calls of each step
+
+    `total` : `dict` : cumulative time (ns) of each step
+
+    `trace` : `bool` : record every call in `events`
+
+    `events` : `list` : (step, start (ns), duration (ns)) of every call (if traced)
+
+    """
+
+    def __init__(self, trace=False):
+        self.calls = {}
+        self.total = {}
+        self.trace = trace
+        self.events = []
+
+    def timed(self, name, func):
+        """
+        Function to wrap `func` so that its calls are recorded under `name`
+        """
+        calls = self.calls
+        total = self.total
+        events = self.events
+        calls[name] = 0
+        total[name] = 0
+        perf_counter_ns = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls[name] += 1
+                total[name] += perf_counter_ns() - start
+
+        def traced(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = perf_counter_ns() - start
+                calls[name] += 1
+                total[name] += duration
+                events.append((name, start, duration))
+
+        return traced if self.trace else wrapper
+
+    def instrument(self, func, name, replacements):
+        """
+        Function to make a timed copy of `func` whose globals named in `replacements`
+        (global name: step name) are replaced by timed versions
+        """
+        new_globals = dict(func.__globals__)
+        for global_name, step in replacements.items():
+            new_globals[global_name] = self.timed(step, func.__globals__[global_name])
+
+        copy = types.FunctionType(
+            func.__code__, new_globals, func.__name__, func.__defaults__, func.__closure__
+        )
+        return self.timed(name, copy)
+
+    def profile_solution(self, solution):
+        """
+        Function to get a profiled copy of `timestep.solution`
+        """
+        return self.instrument(solution, "solution", dict(solution_steps))
+
+    def profile_update_time(self, update_time):
+        """
+        Function to get a profiled copy of `timestep.update_time`
+        """
+        return self.instrument(
+            update_time,
+            "update_time",
+            {"reset_initial_conditions": "reset_initial_conditions"},
+        )
+
+    def to_dataframe(self):
+        """
+        Function to summarise the recorded timings
+
+        *Returns:*
+
+        `df` : `pandas.DataFrame` : calls, total and mean time of each step and its share of the solution time
+
+        """
+        steps = [step for _, step in solution_steps if step in self.calls]
+        solution_total = self.total.get("solution", 0)
+        other = solution_total - sum(self.total[step] for step in steps)
+
+        rows = [(step, self.calls[step], self.total[step]) for step in steps]
+        if "solution" in self.calls:
+            rows.append(("solution (other)", self.calls["solution"], other))
+            rows.append(("solution (total)", self.calls["solution"], solution_total))
+        for name in ["update_time", "reset_initial_conditions"]:
+            if name in self.calls:
+                rows.append((name, self.calls[name], self.total[name]))
+
+        df = pd.DataFrame(rows, columns=["Step", "Calls", "Total time (s)"])
+        df["Mean time (us)"] = (df["Total time (s)"] / df.Calls.clip(lower=1)) / 1e3
+        df["Total time (s)"] = df["Total time (s)"] / 1e9
+        df["Share of solution (%)"] = 100 * df["Total time (s)"] * 1e9 / max(solution_total, 1)
+
+        return df
+
+    def to_chrome_trace(self, filepath=None):
+        """
+        Function to export the recorded calls in Chrome trace event format
+        (viewable in chrome://tracing or https://ui.perfetto.dev)
+
+        *Arguments:*\n
+
+        `filepath` : `str` : file to write the trace to (optional)
+
+        *Returns:*
+
+        `trace` : `dict` : trace events
+
+        """
+        assert self.trace, "calls are only recorded by a Profiler(trace=True)"
+
+        # events are recorded when calls end so nested steps come before their parent
+        t0 = min((start for _, start, _ in self.events), default=0)
+        trace = {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - t0) / 1e3,
+                    "dur": duration / 1e3,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                for name, start, duration in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+        if filepath is not None:
+            with open(filepath, "w") as f:
+                json.dump(trace, f)
+
+        return trace
+
+
+# Cell
+def count_objects(model, num_steps):
+    """
+    Function to count the python objects created by their constructors
+    (`__init__`, or `__new__` of named tuples) while running a model for a
+    number of time-steps. Arrays and objects created inside compiled kernels
+    are not counted, nor are objects made without calling a python
+    constructor (floats, lists, ...), which `measure_allocations` sees. With
+    the jit engine, numba types its arguments on every call and creates type
+    objects (`Array`, `_TypeofContext`, ...) that are freed straight away
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : initialized model
+
+    `num_steps` : `int` : number of time-steps
+
+    *Returns:*
+
+    `counts` : `pandas.Series` : number of objects created of each class
+
+    """
+    counts = Counter()
+
+    def count(frame, event, arg):
+        if event != "call":
+            return
+        f_locals = frame.f_locals
+        if frame.f_code.co_name == "__init__" and "self" in f_locals:
+            counts[type(f_locals["self"]).__name__] += 1
+        elif "_cls" in f_locals and isinstance(f_locals["_cls"], type):
+            # named tuple constructors are generated functions taking `_cls`
+            counts[f_locals["_cls"].__name__] += 1
+
+    sys.setprofile(count)
+    try:
+        model.step(num_steps)
+    finally:
+        sys.setprofile(None)
+
+    return pd.Series(counts, dtype=int).sort_values(ascending=False)
+
+
+# Cell
+def measure_allocations(model, num_steps):
+    """
+    Function to measure the memory allocated by python while running a model
+    for a number of time-steps, with `tracemalloc` and the number of
+    allocated memory blocks (`sys.getallocatedblocks`). Memory allocated inside
+    compiled kernels is traced only if numpy allocates it. The retained memory
+    is what is still allocated after the steps (e.g. the new state
+    variables), which must not grow with the number of steps
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : initialized model
+
+    `num_steps` : `int` : number of time-steps
+
+    *Returns:*
+
+    `allocations` : `pandas.Series` : retained memory blocks, retained and peak memory (bytes)
+
+    """
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.clear_traces()
+    else:
+        tracemalloc.start()
+    try:
+        model.step(num_steps)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    # blocks used by tracemalloc itself are freed when it stops
+    blocks = sys.getallocatedblocks() - blocks
+
+    return pd.Series(
+        {"Retained blocks": blocks, "Retained (B)": retained, "Peak (B)": peak},
+        dtype=int,
+    )
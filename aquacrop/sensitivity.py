@@ -0,0 +1,511 @@
+__all__ = [
+    "soil_hydraulic_properties",
+    "mean_yield",
+    "set_parameter",
+    "run_sample",
+    "evaluate",
+    "morris_sample",
+    "sobol_sample",
+    "morris_analysis",
+    "sobol_analysis",
+]
+
+# Cell
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy, deepcopy
+import os
+
+import numpy as np
+import pandas as pd
+
+from .initialize import (
+    compute_crop_variables,
+    compute_harvest_date,
+    compute_soil_variables,
+    create_soil_profile,
+    read_irrigation_management,
+    read_model_initial_conditions,
+)
+
+# Cell
+# soil profile columns that can be varied (for every layer or a single layer)
+soil_hydraulic_properties = ["th_wp", "th_fc", "th_s", "Ksat", "penetrability"]
+
+
+def mean_yield(model):
+    """
+    Function to get the mean yield (tonne/ha) over all seasons of a model that has been run
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : model that has been run till termination
+
+    *Returns:*
+
+    `yield` : `float` : mean yield (tonne/ha)
+
+    """
+    return model.Outputs.Final["Yield (tonne/ha)"].astype(float).mean()
+
+
+# Cell
+def set_parameter(model, name, value):
+    """
+    Function to set a parameter of the inputs of a model (before it is initialized).
+
+    Parameters are named `"<input>.<attribute>"`, where input is an attribute of
+    the model (`Crop`, `Soil`, `IrrMngt`, `FieldMngt`, ...). An index can be added
+    for list or array attributes, e.g. `"IrrMngt.SMT[1]"` or
+    `"IrrMngt.TDcriteria[0,2]"` (without an index every element is set). Soil
+    hydraulic properties (`soil_hydraulic_properties`) are set for every layer,
+    or for one layer, e.g. `"Soil.Ksat[2]"`
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : model that has not been initialized
+
+    `name` : `str` : parameter name
+
+    `value` : `float` : parameter value
+
+    """
+    input_name, attr = name.split(".", 1)
+    index = None
+    if attr.endswith("]"):
+        attr, index = attr[:-1].split("[")
+        index = tuple(int(i) for i in index.split(","))
+
+    obj = getattr(model, input_name)
+
+    if input_name == "Soil" and attr in soil_hydraulic_properties:
+        profile = obj.profile
+        rows = profile.index if index is None else profile.index[profile.Layer == index[0]]
+        profile.loc[rows, attr] = value
+        if attr == "th_wp":
+            profile.loc[rows, "th_dry"] = value / 2
+        elif attr == "Ksat":
+            # drainage characteristic as in SoilClass.add_layer
+            profile.loc[rows, "tau"] = min(max(round(0.0866 * (value ** 0.35), 2), 0), 1)
+        return
+
+    current = getattr(obj, attr)
+    if index is None:
+        if np.ndim(current) > 0:
+            value = np.full(np.shape(current), value, dtype=float)
+        setattr(obj, attr, value)
+    elif isinstance(current, pd.DataFrame):
+        current.iloc[index] = value
+    else:
+        current = np.array(current, dtype=float)
+        current[index] = value
+        setattr(obj, attr, current)
+
+
+def _copy_initialized(template, names, values):
+    """
+    Function to copy an initialized template with some of its parameters
+    changed, redoing only the parts of the initialization that depend on them:
+    the crops for `Crop.*`, the soil profile and initial conditions for
+    `Soil.*` and the irrigation schedule for `IrrMngt.*`. The copy is
+    initialized from scratch if other inputs are changed, or crop parameters
+    that change the seasons (planting and harvest dates, or harvest dates found
+    from the crop calendar) or the soil profile (maximum rooting depth)
+    """
+    assert template.ClockStruct.TimeStepCounter == 0, "the template must not have been run"
+    changed = {name.split(".", 1)[0] for name in names}
+
+    # the state is only copied if the sample is not initialized from scratch
+    sample = copy(template)
+    for input_name in changed:
+        setattr(sample, input_name, deepcopy(getattr(template, input_name)))
+    for name, value in zip(names, values):
+        set_parameter(sample, name, value)
+
+    ClockStruct = template.ClockStruct
+    ParamStruct = template.ParamStruct
+
+    reinitialize = not changed <= {"Crop", "Soil", "IrrMngt"}
+    if "Crop" in changed:
+        sample.Crop.calculate_additional_params()
+        # as in read_model_parameters
+        crop = deepcopy(sample.Crop)
+        if ParamStruct.SpecifiedPlantCalander == "N" and crop.HarvestDate == None:
+            crop = compute_harvest_date(crop, ClockStruct, sample.weather_df)
+        reinitialize = (
+            reinitialize
+            or crop.PlantingDate != ParamStruct.CropList[0].PlantingDate
+            or crop.HarvestDate != ParamStruct.CropList[0].HarvestDate
+            or crop.Zmax != ParamStruct.CropList[0].Zmax
+        )
+    if reinitialize:
+        sample.initialize()
+        return sample
+
+    sample = sample.copy()
+    ClockStruct = sample.ClockStruct
+    ParamStruct = sample.ParamStruct
+
+    if "Crop" in changed:
+        ParamStruct.CropList = [crop]
+        ParamStruct = compute_crop_variables(ParamStruct, sample.weather_df, ClockStruct)
+        if ClockStruct.SeasonCounter == 0:
+            sample.InitCond.Zroot = ParamStruct.Seasonal_Crop_List[0].Zmin
+            sample.InitCond.CC0adj = ParamStruct.Seasonal_Crop_List[0].CC0
+
+    if "Soil" in changed:
+        Soil = deepcopy(sample.Soil)
+        Soil.fill_nan()
+        Soil.extend_profile(max(crop.Zmax for crop in ParamStruct.CropList) + 0.1)
+        ParamStruct.Soil = Soil
+        ParamStruct = compute_soil_variables(ParamStruct)
+        ParamStruct, sample.InitCond = read_model_initial_conditions(
+            ParamStruct, ClockStruct, deepcopy(sample.InitWC)
+        )
+        ParamStruct = create_soil_profile(ParamStruct)
+
+    if "IrrMngt" in changed:
+        ParamStruct = read_irrigation_management(
+            ParamStruct, deepcopy(sample.IrrMngt), ClockStruct
+        )
+
+    sample.ParamStruct = ParamStruct
+    sample.checkpoints = {}
+    sample._save_checkpoint()
+
+    return sample
+
+
+def run_sample(model, names, values):
+    """
+    Function to run a copy of a model with some of its parameters changed.
+
+    A copy of an initialized template only redoes the parts of the
+    initialization that depend on the parameters, so a template that is run
+    with many samples is best initialized once
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : template model (initialized or not, not run)
+
+    `names` : `list` : parameter names (see `set_parameter`)
+
+    `values` : `list` : parameter values
+
+    *Returns:*
+
+    `sample` : `AquaCropModel` : copy of the model run till termination
+
+    """
+    if hasattr(model, "ClockStruct"):
+        sample = _copy_initialized(model, names, values)
+    else:
+        # every sample gets its own inputs but shares the weather data
+        sample = deepcopy(model, {id(model.wdf): model.wdf})
+        for name, value in zip(names, values):
+            set_parameter(sample, name, value)
+
+        if any(name.startswith("Crop.") for name in names):
+            sample.Crop.calculate_additional_params()
+
+        sample.initialize()
+
+    sample.step(till_termination=True)
+
+    return sample
+
+
+def _evaluate_chunk(model, names, X, output):
+    """
+    Function to run the model for each row of parameter values in `X`
+    """
+    # the samples are copies of the template initialized once
+    template = deepcopy(model, {id(model.wdf): model.wdf})
+    template.initialize()
+
+    y = np.zeros(len(X))
+    for row, values in enumerate(X):
+        y[row] = output(run_sample(template, names, values))
+
+    return y
+
+
+def evaluate(model, names, X, output=mean_yield, executor=None, n_jobs=1):
+    """
+    Function to run the model for each row of parameter values in `X`, split
+    into one batch per process if an executor is given
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : template model (not initialized), initialized once by each batch and copied for every sample
+
+    `names` : `list` : parameter names (see `set_parameter`)
+
+    `X` : `np.array` : parameter values (samples x parameters)
+
+    `output` : `function` : model output, called with the model after it has been run (must be picklable to run in parallel)
+
+    `executor` : `concurrent.futures.Executor` : executor to run the batches
+
+    `n_jobs` : `int` : number of batches
+
+    *Returns:*
+
+    `y` : `np.array` : output of each sample
+
+    """
+    if executor is None or n_jobs == 1:
+        return _evaluate_chunk(model, names, X, output)
+
+    batches = np.array_split(X, n_jobs)
+    results = executor.map(
+        _evaluate_chunk,
+        [model] * len(batches),
+        [names] * len(batches),
+        batches,
+        [output] * len(batches),
+    )
+    return np.concatenate(list(results))
+
+
+# Cell
+def morris_sample(num_params, num_trajectories, num_levels, rng):
+    """
+    Function to generate Morris trajectories in the unit hypercube. Each
+    trajectory starts at a random point of the grid and changes one parameter
+    at a time (in random order and direction) by `num_levels/(2*(num_levels-1))`
+
+    *Arguments:*\n
+
+    `num_params` : `int` : number of parameters
+
+    `num_trajectories` : `int` : number of trajectories
+
+    `num_levels` : `int` : number of grid levels (even)
+
+    `rng` : `np.random.Generator` : random numbers
+
+    *Returns:*
+
+    `X` : `np.array` : points of each trajectory (trajectories x (parameters + 1) x parameters)
+
+    `order` : `np.array` : parameter changed at each step of each trajectory (trajectories x parameters)
+
+    `direction` : `np.array` : direction (+1 or -1) of the change of each parameter (trajectories x parameters)
+
+    """
+    delta = num_levels / (2 * (num_levels - 1))
+
+    base = rng.integers(0, num_levels // 2, (num_trajectories, num_params)) / (num_levels - 1)
+    direction = rng.choice([-1, 1], (num_trajectories, num_params))
+    order = np.argsort(rng.random((num_trajectories, num_params)), axis=1)
+
+    X = np.zeros((num_trajectories, num_params + 1, num_params))
+    X[:, 0] = base + delta * (direction == -1)
+    for step in range(num_params):
+        X[:, step + 1] = X[:, step]
+        changed = order[:, step]
+        rows = np.arange(num_trajectories)
+        X[rows, step + 1, changed] += delta * direction[rows, changed]
+
+    return X, order, direction
+
+
+def sobol_sample(num_params, N, rng):
+    """
+    Function to generate the Saltelli sample matrices in the unit hypercube
+
+    *Arguments:*\n
+
+    `num_params` : `int` : number of parameters
+
+    `N` : `int` : number of base samples
+
+    `rng` : `np.random.Generator` : random numbers
+
+    *Returns:*
+
+    `A` : `np.array` : first matrix (N x parameters)
+
+    `B` : `np.array` : second matrix (N x parameters)
+
+    `AB` : `np.array` : `A` with column i taken from `B`, for each parameter i (parameters x N x parameters)
+
+    """
+    A = rng.random((N, num_params))
+    B = rng.random((N, num_params))
+    AB = np.repeat(A[np.newaxis], num_params, axis=0)
+    for i in range(num_params):
+        AB[i, :, i] = B[:, i]
+
+    return A, B, AB
+
+
+def _scale(problem, X):
+    """
+    Function to scale points of the unit hypercube to the parameter bounds
+    """
+    bounds = np.asarray(problem["bounds"], dtype=float)
+    return bounds[:, 0] + X * (bounds[:, 1] - bounds[:, 0])
+
+
+# Cell
+def morris_analysis(
+    model,
+    problem,
+    num_trajectories=10,
+    num_levels=4,
+    output=mean_yield,
+    n_jobs=None,
+    chunk_size=50,
+    seed=None,
+):
+    """
+    Function to run a Morris (elementary effects) screening of model parameters.
+
+    Trajectories are generated, run and added to the statistics `chunk_size`
+    trajectories at a time, so memory does not grow with the number of
+    trajectories
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : template model (not initialized)
+
+    `problem` : `dict` : `"names"`: parameter names (see `set_parameter`) and `"bounds"`: [lower, upper] bound of each parameter
+
+    `num_trajectories` : `int` : number of trajectories ((parameters + 1) model runs each)
+
+    `num_levels` : `int` : number of grid levels (even)
+
+    `output` : `function` : model output, called with the model after it has been run
+
+    `n_jobs` : `int` : number of processes (default: number of processors, 1 runs
+    everything in the current process)
+
+    `chunk_size` : `int` : number of trajectories run at a time
+
+    `seed` : `int` : seed of the random numbers
+
+    *Returns:*
+
+    `indices` : `pandas.DataFrame` : mean (mu), mean absolute (mu_star) and standard deviation (sigma) of the elementary effects of each parameter (in units of the output per unit of the parameter range)
+
+    """
+    names = list(problem["names"])
+    d = len(names)
+    rng = np.random.default_rng(seed)
+    delta = num_levels / (2 * (num_levels - 1))
+
+    sum_ee = np.zeros(d)
+    sum_abs = np.zeros(d)
+    sum_sq = np.zeros(d)
+
+    n_jobs = n_jobs or os.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs != 1 else None
+    try:
+        done = 0
+        while done < num_trajectories:
+            n = min(chunk_size, num_trajectories - done)
+            X, order, direction = morris_sample(d, n, num_levels, rng)
+            y = evaluate(
+                model, names, _scale(problem, X.reshape(-1, d)), output, executor, n_jobs
+            ).reshape(n, d + 1)
+
+            rows = np.arange(n)[:, np.newaxis]
+            ee = np.zeros((n, d))
+            ee[rows, order] = np.diff(y, axis=1) * direction[rows, order] / delta
+
+            sum_ee += ee.sum(axis=0)
+            sum_abs += np.abs(ee).sum(axis=0)
+            sum_sq += (ee ** 2).sum(axis=0)
+            done += n
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    r = num_trajectories
+    mu = sum_ee / r
+    sigma = np.sqrt(np.maximum(sum_sq - r * mu ** 2, 0) / max(r - 1, 1))
+
+    return pd.DataFrame({"mu": mu, "mu_star": sum_abs / r, "sigma": sigma}, index=names)
+
+
+def sobol_analysis(model, problem, N=100, output=mean_yield, n_jobs=None, chunk_size=50, seed=None):
+    """
+    Function to estimate first order (Saltelli 2010) and total (Jansen) Sobol
+    sensitivity indices of model parameters from N*(parameters+2) model runs.
+
+    Base samples are generated, run and added to the sums the estimators
+    need `chunk_size` at a time, so memory does not grow with N
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : template model (not initialized)
+
+    `problem` : `dict` : `"names"`: parameter names (see `set_parameter`) and `"bounds"`: [lower, upper] bound of each parameter
+
+    `N` : `int` : number of base samples
+
+    `output` : `function` : model output, called with the model after it has been run
+
+    `n_jobs` : `int` : number of processes (default: number of processors, 1 runs
+    everything in the current process)
+
+    `chunk_size` : `int` : number of base samples run at a time
+
+    `seed` : `int` : seed of the random numbers
+
+    *Returns:*
+
+    `indices` : `pandas.DataFrame` : first order (S1) and total (ST) index of each parameter and the half width of their 95% confidence intervals (S1_conf, ST_conf)
+
+    """
+    names = list(problem["names"])
+    d = len(names)
+    rng = np.random.default_rng(seed)
+
+    # running sums of the outputs (for the variance) and of the terms of the
+    # estimators (and their squares for the confidence intervals)
+    sum_f = 0.0
+    sum_f2 = 0.0
+    sum_s1 = np.zeros(d)
+    sum_s1_sq = np.zeros(d)
+    sum_st = np.zeros(d)
+    sum_st_sq = np.zeros(d)
+
+    n_jobs = n_jobs or os.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs != 1 else None
+    try:
+        done = 0
+        while done < N:
+            n = min(chunk_size, N - done)
+            A, B, AB = sobol_sample(d, n, rng)
+            X = np.concatenate([A, B, AB.reshape(-1, d)])
+            y = evaluate(model, names, _scale(problem, X), output, executor, n_jobs)
+
+            fA = y[:n]
+            fB = y[n : 2 * n]
+            fAB = y[2 * n :].reshape(d, n).T
+
+            s1 = fB[:, np.newaxis] * (fAB - fA[:, np.newaxis])
+            st = 0.5 * (fA[:, np.newaxis] - fAB) ** 2
+
+            sum_f += fA.sum() + fB.sum()
+            sum_f2 += (fA ** 2).sum() + (fB ** 2).sum()
+            sum_s1 += s1.sum(axis=0)
+            sum_s1_sq += (s1 ** 2).sum(axis=0)
+            sum_st += st.sum(axis=0)
+            sum_st_sq += (st ** 2).sum(axis=0)
+            done += n
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    V = sum_f2 / (2 * N) - (sum_f / (2 * N)) ** 2
+    S1 = sum_s1 / N / V
+    ST = sum_st / N / V
+    S1_conf = 1.96 * np.sqrt(np.maximum(sum_s1_sq / N - (sum_s1 / N) ** 2, 0) / N) / V
+    ST_conf = 1.96 * np.sqrt(np.maximum(sum_st_sq / N - (sum_st / N) ** 2, 0) / N) / V
+
+    return pd.DataFrame(
+        {"S1": S1, "S1_conf": S1_conf, "ST": ST, "ST_conf": ST_conf}, index=names
+    )
@@ -8,6 +8,7 @@
 
 # remove functions from __all__ as they become replace by compiled equivalent
 __all__ = [
+    "root_zone_summary",
     "pre_irrigation",
     "capillary_rise",
     "irrigation",
@@ -34,27 +35,17 @@ from numba import njit, f8, i8, b1
 
 
 
-from numba.pycc import CC
+if __name__ == "__main__":
+    from numba.pycc import CC
 
-# temporary name for compiled module
-cc = CC("solution_aot")
+    # temporary name for compiled module
+    cc = CC("solution_aot")
 
-# This compiled function is called a few times inside other functions
-if __name__ != "__main__":
-    from .solution_aot import (
-        _water_stress,
-        _evap_layer_water_content,
-        _root_zone_water,
-        _cc_development,
-        _update_CCx_CDC,
-        _cc_required_time,
-        _aeration_stress, 
-        _temperature_stress, 
-        _HIadj_pre_anthesis,                      
-        _HIadj_post_anthesis, 
-        _HIadj_pollination
-        
-        )
+else:
+    # Kernels are registered with the engine, which loads the AOT compiled
+    # versions when built and otherwise compiles them with numba.njit.
+    # Creating the pycc compiler probes for a C toolchain, so skip it on import.
+    from .engine import registry as cc
 
 # Cell
 # @njit()
@@ -291,6 +282,50 @@ def root_zone_water(
     )
 
 
+# Cell
+def root_zone_summary(prof, NewCond, Soil_zTop, Crop):
+    """
+    Function to get the root zone water content and depletion for the current soil
+    water content. The summary is stored in `NewCond.RootZone` and reused by later
+    steps on the same day until a sub-model modifies `NewCond.th` (and resets
+    `NewCond.RootZone` to `None`) or the rooting depth changes
+
+
+    *Arguments:*
+
+    `prof`: `SoilProfileClass` : jit class Object containing soil paramaters
+
+    `NewCond`: `InitCondClass` : InitCond object
+
+    `Soil_zTop`: `float` : Top soil depth
+
+    `Crop`: `CropClass` : Crop object
+
+    *Returns:*
+
+     `RootZone`: `tuple` : outputs of `root_zone_water` (WrAct, Dr_Zt, Dr_Rz, TAW_Zt, TAW_Rz,
+     thRZ_Act, thRZ_S, thRZ_FC, thRZ_WP, thRZ_Dry, thRZ_Aer)
+
+
+    """
+    RootZone = NewCond.RootZone
+    if (RootZone is None) or (RootZone[0] != NewCond.Zroot):
+        RootZone = (
+            NewCond.Zroot,
+            _root_zone_water(
+                prof,
+                float(NewCond.Zroot),
+                NewCond.th,
+                Soil_zTop,
+                float(Crop.Zmin),
+                Crop.Aer,
+            ),
+        )
+        NewCond.RootZone = RootZone
+
+    return RootZone[1]
+
+
 # Cell
 @cc.export("_check_groundwater_table", (SoilProfileNT_typ_sig,f8,f8[:],f8[:],i8,f8))
 def check_groundwater_table(
@@ -688,7 +723,50 @@ def pre_irrigation(prof, Crop, InitCond, GrowingSeason, IrrMngt):
 
 
 # Cell
-# @njit()
+@njit
+def drainage_ability(th, th_fc_Adj, th_fc, th_s, dthdt_s, exp_s):
+    """
+    Function to calculate the drainage ability of a compartment
+
+
+    <a href="../pdfs/ac_ref_man_3.pdf#page=51" target="_blank">Reference Manual: drainage calculations</a> (pg. 42-65)
+
+
+    *Arguments:*
+
+    `th`: `float` : water content of compartment
+
+    `th_fc_Adj`: `float` : adjusted water content at field capacity
+
+    `th_fc`: `float` : water content at field capacity
+
+    `th_s`: `float` : water content at saturation
+
+    `dthdt_s`: `float` : drainage ability at saturation (`tau * (th_s - th_fc)`)
+
+    `exp_s`: `float` : `exp(th_s - th_fc) - 1`
+
+    *Returns:*
+
+    `dthdt`: `float` : drainage ability (m3/m3/day)
+
+
+    """
+    if th <= th_fc_Adj:
+        dthdt = 0.0
+    else:
+        if th >= th_s:
+            dthdt = dthdt_s
+        else:
+            dthdt = dthdt_s * ((np.exp(th - th_fc) - 1) / exp_s)
+
+        if (th - dthdt) < th_fc_Adj:
+            dthdt = th - th_fc_Adj
+
+    return dthdt
+
+
+# Cell
 @cc.export("_drainage", (SoilProfileNT_typ_sig,f8[:],f8[:]))
 def drainage(
     prof, th_init, th_fc_Adj_init
@@ -727,15 +805,11 @@ def drainage(
 
     """
 
-    # Store initial conditions in new structure for updating %%
-    #     NewCond = InitCond
-
-    #     th_init = InitCond.th
-    #     th_fc_Adj_init = InitCond.th_fc_Adj
-
     #  Preallocate arrays %%
     thnew = np.zeros(th_init.shape[0])
     FluxOut = np.zeros(th_init.shape[0])
+    # Excess water (mm) that cannot be stored in each compartment
+    Excess = np.zeros(th_init.shape[0])
 
     # Initialise counters and states %%
     drainsum = 0
@@ -745,30 +819,14 @@ def drainage(
         # Specify layer for compartment
         cth_fc = prof.th_fc[ii]
         cth_s = prof.th_s[ii]
-        ctau = prof.tau[ii]
+        cdthdt_s = prof.dthdt_s[ii]
+        cexp_s = prof.exp_s[ii]
         cdz = prof.dz[ii]
-        cdzsum = prof.dzsum[ii]
         cKsat = prof.Ksat[ii]
+        cth_fc_Adj = th_fc_Adj_init[ii]
 
         # Calculate drainage ability of compartment ii
-        if th_init[ii] <= th_fc_Adj_init[ii]:
-            dthdt = 0
-
-        elif th_init[ii] >= cth_s:
-            dthdt = ctau * (cth_s - cth_fc)
-
-            if (th_init[ii] - dthdt) < th_fc_Adj_init[ii]:
-                dthdt = th_init[ii] - th_fc_Adj_init[ii]
-
-        else:
-            dthdt = (
-                ctau
-                * (cth_s - cth_fc)
-                * ((np.exp(th_init[ii] - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-            )
-
-            if (th_init[ii] - dthdt) < th_fc_Adj_init[ii]:
-                dthdt = th_init[ii] - th_fc_Adj_init[ii]
+        dthdt = drainage_ability(th_init[ii], cth_fc_Adj, cth_fc, cth_s, cdthdt_s, cexp_s)
 
         # Drainage from compartment ii (mm)
         draincomp = dthdt * cdz * 1000
@@ -776,15 +834,11 @@ def drainage(
         # Check drainage ability of compartment ii against cumulative drainage
         # from compartments above
         excess = 0
-        prethick = cdzsum - cdz
+        prethick = prof.dzsum[ii] - cdz
         drainmax = dthdt * 1000 * prethick
-        if drainsum <= drainmax:
-            drainability = True
-        else:
-            drainability = False
 
         # Drain compartment ii
-        if drainability == True:
+        if drainsum <= drainmax:
             # No storage needed. Update water content in compartment ii
             thnew[ii] = th_init[ii] - dthdt
 
@@ -797,206 +851,119 @@ def drainage(
                 excess = excess + drainsum - cKsat
                 drainsum = cKsat
 
-        elif drainability == False:
+        else:
             # Storage is needed
             dthdt = drainsum / (1000 * prethick)
 
             # Calculate value of theta (thX) needed to provide a
             # drainage ability equal to cumulative drainage
             if dthdt <= 0:
-                thX = th_fc_Adj_init[ii]
-            elif ctau > 0:
-                A = 1 + ((dthdt * (np.exp(cth_s - cth_fc) - 1)) / (ctau * (cth_s - cth_fc)))
+                thX = cth_fc_Adj
+            elif prof.tau[ii] > 0:
+                A = 1 + ((dthdt * cexp_s) / cdthdt_s)
                 thX = cth_fc + np.log(A)
-                if thX < th_fc_Adj_init[ii]:
-                    thX = th_fc_Adj_init[ii]
+                if thX < cth_fc_Adj:
+                    thX = cth_fc_Adj
 
             else:
                 thX = cth_s + 0.01
 
-            # Check thX against hydraulic properties of current soil layer
-            if thX <= cth_s:
-                # Increase compartment ii water content with cumulative
-                # drainage
-                thnew[ii] = th_init[ii] + (drainsum / (1000 * cdz))
-                # Check updated water content against thX
-                if thnew[ii] > thX:
-                    # Cumulative drainage is the drainage difference
-                    # between theta_x and new theta plus drainage ability
-                    # at theta_x.
-                    drainsum = (thnew[ii] - thX) * 1000 * cdz
-                    # Calculate drainage ability for thX
-                    if thX <= th_fc_Adj_init[ii]:
-                        dthdt = 0
-                    elif thX >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
-                        if (thX - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thX - th_fc_Adj_init[ii]
-
-                    else:
-                        dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
-                            * ((np.exp(thX - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-                        )
-
-                        if (thX - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thX - th_fc_Adj_init[ii]
-
-                    # Update drainage total
-                    drainsum = drainsum + (dthdt * 1000 * cdz)
-                    # Restrict cumulative drainage to saturated hydraulic
-                    # conductivity and adjust excess drainage flow
-                    if drainsum > cKsat:
-                        excess = excess + drainsum - cKsat
-                        drainsum = cKsat
-
-                    # Update water content
-                    thnew[ii] = thX - dthdt
-
-                elif thnew[ii] > th_fc_Adj_init[ii]:
-                    # Calculate drainage ability for updated water content
-                    if thnew[ii] <= th_fc_Adj_init[ii]:
-                        dthdt = 0
-                    elif thnew[ii] >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
-                        if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thnew[ii] - th_fc_Adj_init[ii]
-
-                    else:
-                        dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
-                            * ((np.exp(thnew[ii] - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-                        )
-                        if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thnew[ii] - th_fc_Adj_init[ii]
-
-                    # Update water content in compartment ii
-                    thnew[ii] = thnew[ii] - dthdt
-                    # Update cumulative drainage
-                    drainsum = dthdt * 1000 * cdz
-                    # Restrict cumulative drainage to saturated hydraulic
-                    # conductivity and adjust excess drainage flow
-                    if drainsum > cKsat:
-                        excess = excess + drainsum - cKsat
-                        drainsum = cKsat
-
-                else:
-                    # Drainage and cumulative drainage are zero as water
-                    # content has not risen above field capacity in
-                    # compartment ii.
-                    drainsum = 0
-
-            elif thX > cth_s:
-                # Increase water content in compartment ii with cumulative
-                # drainage from above
-                thnew[ii] = th_init[ii] + (drainsum / (1000 * cdz))
-                # Check new water content against hydraulic properties of soil
-                # layer
-                if thnew[ii] <= cth_s:
-                    if thnew[ii] > th_fc_Adj_init[ii]:
-                        # Calculate new drainage ability
-                        if thnew[ii] <= th_fc_Adj_init[ii]:
-                            dthdt = 0
-                        elif thnew[ii] >= cth_s:
-                            dthdt = ctau * (cth_s - cth_fc)
-                            if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                                dthdt = thnew[ii] - th_fc_Adj_init[ii]
-
-                        else:
-                            dthdt = (
-                                ctau
-                                * (cth_s - cth_fc)
-                                * ((np.exp(thnew[ii] - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-                            )
-                            if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                                dthdt = thnew[ii] - th_fc_Adj_init[ii]
-
-                        # Update water content in compartment ii
-                        thnew[ii] = thnew[ii] - dthdt
-                        # Update cumulative drainage
-                        drainsum = dthdt * 1000 * cdz
-                        # Restrict cumulative drainage to saturated hydraulic
-                        # conductivity and adjust excess drainage flow
-                        if drainsum > cKsat:
-                            excess = excess + drainsum - cKsat
-                            drainsum = cKsat
-
-                    else:
-                        drainsum = 0
-
-                elif thnew[ii] > cth_s:
-                    # Calculate excess drainage above saturation
-                    excess = (thnew[ii] - cth_s) * 1000 * cdz
-                    # Calculate drainage ability for updated water content
-                    if thnew[ii] <= th_fc_Adj_init[ii]:
-                        dthdt = 0
-                    elif thnew[ii] >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
-                        if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thnew[ii] - th_fc_Adj_init[ii]
+            # Increase compartment ii water content with cumulative
+            # drainage
+            thnew[ii] = th_init[ii] + (drainsum / (1000 * cdz))
+
+            if (thX <= cth_s) and (thnew[ii] > thX):
+                # Cumulative drainage is the drainage difference
+                # between theta_x and new theta plus drainage ability
+                # at theta_x.
+                drainsum = (thnew[ii] - thX) * 1000 * cdz
+                # Calculate drainage ability for thX
+                dthdt = drainage_ability(thX, cth_fc_Adj, cth_fc, cth_s, cdthdt_s, cexp_s)
+                # Update drainage total
+                drainsum = drainsum + (dthdt * 1000 * cdz)
+                # Restrict cumulative drainage to saturated hydraulic
+                # conductivity and adjust excess drainage flow
+                if drainsum > cKsat:
+                    excess = excess + drainsum - cKsat
+                    drainsum = cKsat
 
-                    else:
-                        dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
-                            * ((np.exp(thnew[ii] - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-                        )
-                        if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
-                            dthdt = thnew[ii] - th_fc_Adj_init[ii]
-
-                    # Update water content in compartment ii
-                    thnew[ii] = cth_s - dthdt
-
-                    # Update drainage from compartment ii
-                    draincomp = dthdt * 1000 * cdz
-                    # Update maximum drainage
-                    drainmax = dthdt * 1000 * prethick
-
-                    # Update excess drainage
-                    if drainmax > excess:
-                        drainmax = excess
+                # Update water content
+                thnew[ii] = thX - dthdt
+
+            elif thnew[ii] > cth_s:
+                # Calculate excess drainage above saturation (only possible
+                # if thX is above saturation)
+                excess = (thnew[ii] - cth_s) * 1000 * cdz
+                # Calculate drainage ability for updated water content
+                dthdt = drainage_ability(thnew[ii], cth_fc_Adj, cth_fc, cth_s, cdthdt_s, cexp_s)
+
+                # Update water content in compartment ii
+                thnew[ii] = cth_s - dthdt
+
+                # Update drainage from compartment ii
+                draincomp = dthdt * 1000 * cdz
+                # Update maximum drainage
+                drainmax = dthdt * 1000 * prethick
+
+                # Update excess drainage
+                if drainmax > excess:
+                    drainmax = excess
+
+                excess = excess - drainmax
+                # Update drainsum and restrict to saturated hydraulic
+                # conductivity of soil layer
+                drainsum = draincomp + drainmax
+                if drainsum > cKsat:
+                    excess = excess + drainsum - cKsat
+                    drainsum = cKsat
+
+            elif thnew[ii] > cth_fc_Adj:
+                # Calculate drainage ability for updated water content
+                dthdt = drainage_ability(thnew[ii], cth_fc_Adj, cth_fc, cth_s, cdthdt_s, cexp_s)
+                # Update water content in compartment ii
+                thnew[ii] = thnew[ii] - dthdt
+                # Update cumulative drainage
+                drainsum = dthdt * 1000 * cdz
+                # Restrict cumulative drainage to saturated hydraulic
+                # conductivity and adjust excess drainage flow
+                if drainsum > cKsat:
+                    excess = excess + drainsum - cKsat
+                    drainsum = cKsat
 
-                    excess = excess - drainmax
-                    # Update drainsum and restrict to saturated hydraulic
-                    # conductivity of soil layer
-                    drainsum = draincomp + drainmax
-                    if drainsum > cKsat:
-                        excess = excess + drainsum - cKsat
-                        drainsum = cKsat
+            else:
+                # Drainage and cumulative drainage are zero as water
+                # content has not risen above field capacity in
+                # compartment ii.
+                drainsum = 0
 
         # Store output flux from compartment ii
         FluxOut[ii] = drainsum
-
-        # Redistribute excess in compartment above
+        Excess[ii] = excess
+
+    ## Redistribute excess in compartments above ##
+    # Compartments above ii are not used again in the loop above, so excess
+    # water from all compartments is stored in a single pass up the profile
+    excess = 0
+    for ii in range(th_init.shape[0] - 1, -1, -1):
+        # Excess from compartments below flows up through compartment ii
         if excess > 0:
-            precomp = ii + 1
-            while (excess > 0) and (precomp != 0):
-                # Update compartment counter
-                precomp = precomp - 1
-                # Update layer counter
-                # precompdf = Soil.Profile.Comp[precomp]
-
-                # Update flux from compartment
-                if precomp < ii:
-                    FluxOut[precomp] = FluxOut[precomp] - excess
+            FluxOut[ii] = FluxOut[ii] - excess
 
-                # Increase water content to store excess
-                thnew[precomp] = thnew[precomp] + (excess / (1000 * prof.dz[precomp]))
+        excess = excess + Excess[ii]
+        if excess > 0:
+            # Increase water content to store excess
+            thnew[ii] = thnew[ii] + (excess / (1000 * prof.dz[ii]))
 
-                # Limit water content to saturation and adjust excess counter
-                if thnew[precomp] > prof.th_s[precomp]:
-                    excess = (thnew[precomp] - prof.th_s[precomp]) * 1000 * prof.dz[precomp]
-                    thnew[precomp] = prof.th_s[precomp]
-                else:
-                    excess = 0
+            # Limit water content to saturation and adjust excess counter
+            if thnew[ii] > prof.th_s[ii]:
+                excess = (thnew[ii] - prof.th_s[ii]) * 1000 * prof.dz[ii]
+                thnew[ii] = prof.th_s[ii]
+            else:
+                excess = 0
 
     ## Update conditions and outputs ##
     # Total deep percolation (mm)
     DeepPerc = drainsum
-    # Water contents
-    # NewCond.th = thnew
 
     return thnew, DeepPerc, FluxOut
 
@@ -2336,34 +2303,25 @@ def canopy_cover(Crop, prof, Soil_zTop, InitCond, GDD, Et0, GrowingSeason):
     ## Calculate canopy development (if in growing season) ##
     if GrowingSeason == True:
         # Calculate root zone water content
-        TAW = TAWClass()
-        Dr = DrClass()
-        # thRZ = thRZClass()
-        _, Dr.Zt, Dr.Rz, TAW.Zt, TAW.Rz, _,_,_,_,_,_ = _root_zone_water(
-            prof,
-            float(NewCond.Zroot),
-            NewCond.th,
-            Soil_zTop,
-            float(Crop.Zmin),
-            Crop.Aer,
+        _, Dr_Zt, Dr_Rz, TAW_Zt, TAW_Rz, _, _, _, _, _, _ = root_zone_summary(
+            prof, NewCond, Soil_zTop, Crop
         )
 
         # _,Dr,TAW,_ = root_zone_water(Soil_Profile,float(NewCond.Zroot),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
         # Check whether to use root zone or top soil depletions for calculating
         # water stress
-        if (Dr.Rz / TAW.Rz) <= (Dr.Zt / TAW.Zt):
+        if (Dr_Rz / TAW_Rz) <= (Dr_Zt / TAW_Zt):
             # Root zone is wetter than top soil, so use root zone value
-            Dr = Dr.Rz
-            TAW = TAW.Rz
+            Dr = Dr_Rz
+            TAW = TAW_Rz
         else:
             # Top soil is wetter than root zone, so use top soil values
-            Dr = Dr.Zt
-            TAW = TAW.Zt
+            Dr = Dr_Zt
+            TAW = TAW_Zt
 
         # Determine if water stress is occurring
         beta = True
-        Ksw = KswClass()
-        Ksw.Exp, Ksw.Sto, Ksw.Sen, Ksw.Pol, Ksw.StoLin = _water_stress(
+        Ksw_Exp, Ksw_Sto, Ksw_Sen, Ksw_Pol, Ksw_StoLin = _water_stress(
             Crop.p_up,
             Crop.p_lo,
             Crop.ETadj,
@@ -2461,7 +2419,7 @@ def canopy_cover(Crop, prof, Soil_zTop, InitCond, GDD, Et0, GrowingSeason):
                 if InitCond_CC < (0.9799 * Crop.CCx):
                     # Adjust canopy growth coefficient for leaf expansion water
                     # stress effects
-                    CGCadj = Crop.CGC * Ksw.Exp
+                    CGCadj = Crop.CGC * Ksw_Exp
                     if CGCadj > 0:
 
                         # Adjust CCx for change in CGC
@@ -2574,7 +2532,7 @@ def canopy_cover(Crop, prof, Soil_zTop, InitCond, GDD, Et0, GrowingSeason):
             if (tCCadj < Crop.Senescence) or (InitCond_tEarlySen > 0):
                 # Check for early canopy senescence  due to severe water
                 # stress.
-                if (Ksw.Sen < 1) and (InitCond_ProtectedSeed == False):
+                if (Ksw_Sen < 1) and (InitCond_ProtectedSeed == False):
 
                     # Early canopy senescence
                     NewCond.PrematSenes = True
@@ -2587,8 +2545,7 @@ def canopy_cover(Crop, prof, Soil_zTop, InitCond, GDD, Et0, GrowingSeason):
                     # Adjust canopy decline coefficient for water stress
                     beta = False
 
-                    Ksw = KswClass()
-                    Ksw.Exp, Ksw.Sto, Ksw.Sen, Ksw.Pol, Ksw.StoLin = _water_stress(
+                    Ksw_Exp, Ksw_Sto, Ksw_Sen, Ksw_Pol, Ksw_StoLin = _water_stress(
                         Crop.p_up,
                         Crop.p_lo,
                         Crop.ETadj,
@@ -2602,10 +2559,10 @@ def canopy_cover(Crop, prof, Soil_zTop, InitCond, GDD, Et0, GrowingSeason):
                     )
 
                     # Ksw = water_stress(Crop, NewCond, Dr, TAW, Et0, beta)
-                    if Ksw.Sen > 0.99999:
+                    if Ksw_Sen > 0.99999:
                         CDCadj = 0.0001
                     else:
-                        CDCadj = (1 - (Ksw.Sen ** 8)) * Crop.CDC
+                        CDCadj = (1 - (Ksw_Sen ** 8)) * Crop.CDC
 
                     # Get new canpy cover size after senescence
                     if NewCond.CCxEarlySen < 0.001:
@@ -3224,8 +3181,8 @@ def soil_evaporation(
 
 # Cell
 # @njit()
-@cc.export("_aeration_stress", (f8,f8,thRZNT_type_sig))
-def aeration_stress(NewCond_AerDays, Crop_LagAer, thRZ):
+@cc.export("_aeration_stress", "(f8,f8,f8,f8,f8)")
+def aeration_stress(NewCond_AerDays, Crop_LagAer, thRZ_Act, thRZ_S, thRZ_Aer):
     """
     Function to calculate aeration stress coefficient
 
@@ -3239,7 +3196,11 @@ def aeration_stress(NewCond_AerDays, Crop_LagAer, thRZ):
 
     `Crop_LagAer`: `int` : lag days before aeration stress
 
-    `thRZ`: `thRZClass` : object that contains information on the total water in the root zone
+    `thRZ_Act`: `float` : root zone water content
+
+    `thRZ_S`: `float` : root zone water content at saturation
+
+    `thRZ_Aer`: `float` : root zone water content at which aeration stress starts
 
 
 
@@ -3254,13 +3215,13 @@ def aeration_stress(NewCond_AerDays, Crop_LagAer, thRZ):
     """
 
     ## Determine aeration stress (root zone) ##
-    if thRZ.Act > thRZ.Aer:
+    if thRZ_Act > thRZ_Aer:
         # Calculate aeration stress coefficient
         if NewCond_AerDays < Crop_LagAer:
-            stress = 1 - ((thRZ.S - thRZ.Act) / (thRZ.S - thRZ.Aer))
+            stress = 1 - ((thRZ_S - thRZ_Act) / (thRZ_S - thRZ_Aer))
             Ksa_Aer = 1 - ((NewCond_AerDays / 3) * stress)
         elif NewCond_AerDays >= Crop_LagAer:
-            Ksa_Aer = (thRZ.S - thRZ.Act) / (thRZ.S - thRZ.Aer)
+            Ksa_Aer = (thRZ_S - thRZ_Act) / (thRZ_S - thRZ_Aer)
 
         # Increment aeration days counter
         NewCond_AerDays = NewCond_AerDays + 1
@@ -3477,49 +3438,35 @@ def transpiration(
         # Determine root zone and top soil depletion, and root zone water
         # content
 
-        TAW = TAWClass()
-        Dr = DrClass()
-        thRZ = thRZClass()
         (
             _,
-            Dr.Zt,
-            Dr.Rz,
-            TAW.Zt,
-            TAW.Rz,
-            thRZ.Act,
-            thRZ.S,
-            thRZ.FC,
-            thRZ.WP,
-            thRZ.Dry,
-            thRZ.Aer,
-        ) = _root_zone_water(
-            prof,
-            float(NewCond.Zroot),
-            NewCond.th,
-            Soil_zTop,
-            float(Crop.Zmin),
-            Crop.Aer,
-        )
-
-        class_args = {key:value for key, value in thRZ.__dict__.items() if not key.startswith('__') and not callable(key)}
-        thRZ = thRZNT(**class_args)
+            Dr_Zt,
+            Dr_Rz,
+            TAW_Zt,
+            TAW_Rz,
+            thRZ_Act,
+            thRZ_S,
+            _,
+            _,
+            _,
+            thRZ_Aer,
+        ) = root_zone_summary(prof, NewCond, Soil_zTop, Crop)
 
         # _,Dr,TAW,thRZ = root_zone_water(Soil_Profile,float(NewCond.Zroot),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
         # Check whether to use root zone or top soil depletions for calculating
         # water stress
-        if (Dr.Rz / TAW.Rz) <= (Dr.Zt / TAW.Zt):
+        if (Dr_Rz / TAW_Rz) <= (Dr_Zt / TAW_Zt):
             # Root zone is wetter than top soil, so use root zone value
-            Dr = Dr.Rz
-            TAW = TAW.Rz
+            Dr = Dr_Rz
+            TAW = TAW_Rz
         else:
             # Top soil is wetter than root zone, so use top soil values
-            Dr = Dr.Zt
-            TAW = TAW.Zt
+            Dr = Dr_Zt
+            TAW = TAW_Zt
 
         # Calculate water stress coefficients
         beta = True
-        Ksw = KswClass()
-        Ksw.Exp, Ksw.Sto, Ksw.Sen, Ksw.Pol, Ksw.StoLin = _water_stress(
+        Ksw_Exp, Ksw_Sto, Ksw_Sen, Ksw_Pol, Ksw_StoLin = _water_stress(
             Crop.p_up,
             Crop.p_lo,
             Crop.ETadj,
@@ -3534,9 +3481,11 @@ def transpiration(
         # Ksw = water_stress(Crop, NewCond, Dr, TAW, Et0, beta)
 
         # Calculate aeration stress coefficients
-        Ksa_Aer, NewCond.AerDays = _aeration_stress(NewCond.AerDays, Crop.LagAer, thRZ)
+        Ksa_Aer, NewCond.AerDays = _aeration_stress(
+            NewCond.AerDays, Crop.LagAer, thRZ_Act, thRZ_S, thRZ_Aer
+        )
         # Maximum stress effect
-        Ks = min(Ksw.StoLin, Ksa_Aer)
+        Ks = min(Ksw_StoLin, Ksa_Aer)
         # Update potential transpiration in root zone
         if IrrMngt_IrrMethod != 4:
             # No adjustment to TrPot for water stress when in net irrigation mode
@@ -3686,43 +3635,37 @@ def transpiration(
             # Update actual transpiration
             TrAct = TrAct + (Sink * 1000 * prof.dz[comp])
 
+        if TrAct > 0:
+            # Water has been extracted so root zone summary is out of date
+            NewCond.RootZone = None
+
         ## Add net irrigation water requirement (if this mode is specified) ##
         if (IrrMngt_IrrMethod == 4) and (TrPot > 0):
             # Initialise net irrigation counter
             IrrNet = 0
             # Get root zone water content
 
-            TAW = TAWClass()
-            Dr = DrClass()
-            thRZ = thRZClass()
             (
                 _,
-                Dr.Zt,
-                Dr.Rz,
-                TAW.Zt,
-                TAW.Rz,
-                thRZ.Act,
-                thRZ.S,
-                thRZ.FC,
-                thRZ.WP,
-                thRZ.Dry,
-                thRZ.Aer,
-            ) = _root_zone_water(
-                prof,
-                float(NewCond.Zroot),
-                NewCond.th,
-                Soil_zTop,
-                float(Crop.Zmin),
-                Crop.Aer,
-            )
+                _,
+                Dr_Rz,
+                _,
+                TAW_Rz,
+                thRZ_Act,
+                _,
+                thRZ_FC,
+                thRZ_WP,
+                _,
+                _,
+            ) = root_zone_summary(prof, NewCond, Soil_zTop, Crop)
 
             # _,_Dr,_TAW,thRZ = root_zone_water(Soil_Profile,float(NewCond.Zroot),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
-            NewCond.Depletion = Dr.Rz
-            NewCond.TAW = TAW.Rz
+            NewCond.Depletion = Dr_Rz
+            NewCond.TAW = TAW_Rz
             # Determine critical water content for net irrigation
-            thCrit = thRZ.WP + ((IrrMngt_NetIrrSMT / 100) * (thRZ.FC - thRZ.WP))
+            thCrit = thRZ_WP + ((IrrMngt_NetIrrSMT / 100) * (thRZ_FC - thRZ_WP))
             # Check if root zone water content is below net irrigation trigger
-            if thRZ.Act < thCrit:
+            if thRZ_Act < thCrit:
                 # Initialise layer counter
                 prelayer = 0
                 for ii in range(comp_sto):
@@ -3745,6 +3688,8 @@ def transpiration(
                     # Update net irrigation counter
                     IrrNet = IrrNet + dWC
 
+                NewCond.RootZone = None
+
             # Update net irrigation counter for the growing season
             NewCond.IrrNetCum = NewCond.IrrNetCum + IrrNet
         elif (IrrMngt_IrrMethod == 4) and (TrPot <= 0):
@@ -4218,15 +4163,16 @@ def HIadj_pre_anthesis(
 
 # Cell
 # @njit()
-@cc.export("_HIadj_pollination", (f8,f8,f8,f8,f8,KswNT_type_sig,KstNT_type_sig,f8))
+@cc.export("_HIadj_pollination", "f8(f8,f8,f8,f8,f8,f8,f8,f8,f8)")
 def HIadj_pollination(
     NewCond_CC,
     NewCond_Fpol,
-    Crop_FloweringCD, 
-    Crop_CCmin, 
-    Crop_exc, 
-    Ksw, 
-    Kst, 
+    Crop_FloweringCD,
+    Crop_CCmin,
+    Crop_exc,
+    Ksw_Pol,
+    Kst_PolH,
+    Kst_PolC,
     HIt
 ):
     """
@@ -4244,9 +4190,11 @@ def HIadj_pollination(
 
     `Crop`: `CropClass` : Crop object containing Crop paramaters
 
-    `Ksw`: `KswClass` : Ksw object containing water stress paramaters
+    `Ksw_Pol`: `float` : water stress coefficient for pollination failure
+
+    `Kst_PolH`: `float` : heat stress coefficient for pollination failure
 
-    `Kst`: `KstClass` : Kst object containing tempature stress paramaters
+    `Kst_PolC`: `float` : cold stress coefficient for pollination failure
 
     `HIt`: `float` : time for harvest index build-up (calander days)
 
@@ -4308,7 +4256,7 @@ def HIadj_pollination(
         # threshold
         dFpol = 0
     else:
-        Ks = min([Ksw.Pol, Kst.PolC, Kst.PolH])
+        Ks = min(Ksw_Pol, Kst_PolC, Kst_PolH)
         dFpol = Ks * FracFlow * (1 + (Crop_exc / 100))
 
     # Calculate pollination adjustment to date
@@ -4322,7 +4270,7 @@ def HIadj_pollination(
 
 # Cell
 # @njit()
-@cc.export("_HIadj_post_anthesis", (i8,f8,f8,i8,f8,f8,f8,f8,CropStructNT_type_sig,KswNT_type_sig,))
+@cc.export("_HIadj_post_anthesis", (i8,f8,f8,i8,f8,f8,f8,f8,CropStructNT_type_sig,f8,f8))
 def HIadj_post_anthesis(
                     NewCond_DelayedCDs,
                     NewCond_sCor1,
@@ -4332,8 +4280,9 @@ def HIadj_post_anthesis(
                     NewCond_CC,
                     NewCond_fpost_upp,
                     NewCond_fpost_dwn,
-                    Crop, 
-                    Ksw):
+                    Crop,
+                    Ksw_Exp,
+                    Ksw_Sto):
     """
     Function to calculate adjustment to harvest index for post-anthesis water
     stress
@@ -4349,7 +4298,9 @@ def HIadj_post_anthesis(
 
     `Crop`: `CropClass` : Crop object containing Crop paramaters
 
-    `Ksw`: `KswClass` : Ksw object containing water stress paramaters
+    `Ksw_Exp`: `float` : water stress coefficient for canopy expansion
+
+    `Ksw_Sto`: `float` : water stress coefficient for stomatal closure
 
     *Returns:*
 
@@ -4377,7 +4328,7 @@ def HIadj_post_anthesis(
         and (NewCond_CC > 0.001)
         and (Crop.a_HI > 0)
     ):
-        dCor = 1 + (1 - Ksw.Exp) / Crop.a_HI
+        dCor = 1 + (1 - Ksw_Exp) / Crop.a_HI
         NewCond_sCor1 = InitCond_sCor1 + (dCor / tmax1)
         DayCor = DAP - 1 - Crop.HIstartCD
         NewCond_fpost_upp = (tmax1 / DayCor) * NewCond_sCor1
@@ -4392,8 +4343,7 @@ def HIadj_post_anthesis(
         and (NewCond_CC > 0.001)
         and (Crop.b_HI > 0)
     ):
-        # print(Ksw.Sto)
-        dCor = np.power(Ksw.Sto, 0.1) * (1 - (1 - Ksw.Sto) / Crop.b_HI)
+        dCor = np.power(Ksw_Sto, 0.1) * (1 - (1 - Ksw_Sto) / Crop.b_HI)
         NewCond_sCor2 = InitCond_sCor2 + (dCor / tmax2)
         DayCor = DAP - 1 - Crop.HIstartCD
         NewCond_fpost_dwn = (tmax2 / DayCor) * NewCond_sCor2
@@ -4472,29 +4422,21 @@ def harvest_index(prof, Soil_zTop, Crop, InitCond, Et0, Tmax, Tmin, GrowingSeaso
     if GrowingSeason == True:
         # Calculate root zone water content
 
-        TAW = TAWClass()
-        Dr = DrClass()
-        # thRZ = thRZClass()
-        _, Dr.Zt, Dr.Rz, TAW.Zt, TAW.Rz, _,_,_,_,_,_, = _root_zone_water(
-            prof,
-            float(NewCond.Zroot),
-            NewCond.th,
-            Soil_zTop,
-            float(Crop.Zmin),
-            Crop.Aer,
+        _, Dr_Zt, Dr_Rz, TAW_Zt, TAW_Rz, _, _, _, _, _, _ = root_zone_summary(
+            prof, NewCond, Soil_zTop, Crop
         )
 
         # _,Dr,TAW,_ = root_zone_water(Soil_Profile,float(NewCond.Zroot),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
         # Check whether to use root zone or top soil depletions for calculating
         # water stress
-        if (Dr.Rz / TAW.Rz) <= (Dr.Zt / TAW.Zt):
+        if (Dr_Rz / TAW_Rz) <= (Dr_Zt / TAW_Zt):
             # Root zone is wetter than top soil, so use root zone value
-            Dr = Dr.Rz
-            TAW = TAW.Rz
+            Dr = Dr_Rz
+            TAW = TAW_Rz
         else:
             # Top soil is wetter than root zone, so use top soil values
-            Dr = Dr.Zt
-            TAW = TAW.Zt
+            Dr = Dr_Zt
+            TAW = TAW_Zt
 
         # Calculate water stress
         beta = True
@@ -4512,10 +4454,8 @@ def harvest_index(prof, Soil_zTop, Crop, InitCond, Et0, Tmax, Tmin, GrowingSeaso
             Et0,
             beta,
         )
-        Ksw = KswNT(Exp=Ksw_Exp, Sto=Ksw_Sto, Sen=Ksw_Sen, Pol=Ksw_Pol, StoLin=Ksw_StoLin )
         # Calculate temperature stress
         (Kst_PolH,Kst_PolC) = _temperature_stress(Crop, Tmax, Tmin)
-        Kst = KstNT(PolH=Kst_PolH,PolC=Kst_PolC)
         # Get reference harvest index on current day
         HIi = NewCond.HIref
 
@@ -4545,8 +4485,9 @@ def harvest_index(prof, Soil_zTop, Crop, InitCond, Et0, Tmax, Tmin, GrowingSeaso
                             Crop.FloweringCD,
                             Crop.CCmin,
                             Crop.exc,
-                            Ksw,
-                            Kst,
+                            Ksw_Pol,
+                            Kst_PolH,
+                            Kst_PolC,
                             HIt,
                         )
 
@@ -4569,8 +4510,9 @@ def harvest_index(prof, Soil_zTop, Crop, InitCond, Et0, Tmax, Tmin, GrowingSeaso
                                                         NewCond.CC,
                                                         NewCond.fpost_upp,
                                                         NewCond.fpost_dwn,
-                                                        Crop, 
-                                                        Ksw)
+                                                        Crop,
+                                                        Ksw_Exp,
+                                                        Ksw_Sto)
 
                 # Limit HI to maximum allowable increase due to pre- and
                 # post-anthesis water stress combinations
@@ -4609,5 +4551,65 @@ def harvest_index(prof, Soil_zTop, Crop, InitCond, Et0, Tmax, Tmin, GrowingSeaso
     return NewCond
 
 
+# Cell
+@cc.export("_water_storage", (SoilProfileNT_typ_sig,f8[:],f8))
+def water_storage(prof, th, SurfaceStorage):
+    """
+    Function to calculate the water stored in the soil profile and on the
+    soil surface (used to check the water balance of each day)
+
+
+    *Arguments:*
+
+
+    `prof`: `SoilProfileClass` : jit class object containing soil paramaters
+
+    `th`: `np.array` : water content of each compartment
+
+    `SurfaceStorage`: `float` : water stored on the soil surface (mm)
+
+
+    *Returns:*
+
+
+    `Storage`: `float` : total water stored (mm)
+
+
+    """
+    Storage = SurfaceStorage
+    for ii in range(th.shape[0]):
+        Storage = Storage + th[ii] * prof.dz[ii] * 1000
+
+    return Storage
+
+
 if __name__ == "__main__":
+    from engine import kernel_stamp
+
+    # stamp of the kernels, checked when the compiled module is loaded
+    with open(__file__, "rb") as f:
+        _stamp = kernel_stamp(
+            {name: entry.signature for name, entry in cc._exported_functions.items()}, f.read()
+        )
+
+    @cc.export("_kernel_stamp", "i8()")
+    def _kernel_stamp():
+        return _stamp
+
     cc.compile()
+
+else:
+    # These compiled functions are called a few times inside other functions
+    from .engine import load_kernels
+
+    _kernels = load_kernels()
+    _water_stress = _kernels._water_stress
+    _root_zone_water = _kernels._root_zone_water
+    _cc_development = _kernels._cc_development
+    _update_CCx_CDC = _kernels._update_CCx_CDC
+    _cc_required_time = _kernels._cc_required_time
+    _aeration_stress = _kernels._aeration_stress
+    _temperature_stress = _kernels._temperature_stress
+    _HIadj_pre_anthesis = _kernels._HIadj_pre_anthesis
+    _HIadj_post_anthesis = _kernels._HIadj_post_anthesis
+    _HIadj_pollination = _kernels._HIadj_pollination
@@ -0,0 +1,274 @@
+__all__ = ["weather_names", "output_names", "run_grid"]
+
+# Cell
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+import os
+
+import numpy as np
+import pandas as pd
+
+from .core import AquaCropModel
+
+# Cell
+# daily weather grids (cells x cells x days) read from the input directory
+weather_names = ["MinTemp", "MaxTemp", "Precipitation", "ReferenceET"]
+
+# seasonal grids (seasons x cells x cells) written to the output directory
+output_names = ["Yield", "Irrigation"]
+
+# number of initialized models kept by each chunk for reuse
+max_templates = 64
+
+
+# Cell
+def _cell_template(setup, idx, weather):
+    """
+    Function to make and initialize the model of a cell
+
+    *Arguments:*\n
+
+    `setup` : `dict` : settings of the run (see `run_grid`)
+
+    `idx` : `tuple` : index of the cell's object in each list of `setup["inputs"]`
+
+    `weather` : `list` : MinTemp, MaxTemp, Precipitation and ReferenceET of each day
+
+    *Returns:*
+
+    `model` : `AquaCropModel` : initialized model
+
+    """
+    wdf = pd.DataFrame(dict(zip(weather_names, weather)))
+    wdf["ReferenceET"] = wdf.ReferenceET.clip(lower=0.1)
+    wdf["Date"] = pd.date_range(setup["weather_start"], periods=len(wdf))
+
+    inputs = {
+        name: deepcopy(objects[i]) for (name, objects), i in zip(setup["inputs"].items(), idx)
+    }
+    model = AquaCropModel(
+        setup["SimStartTime"], setup["SimEndTime"], wdf, **inputs, **setup["kwargs"]
+    )
+    model.initialize()
+
+    return model
+
+
+def _run_chunk(setup, window):
+    """
+    Function to simulate every cell of a chunk and write its yields and
+    irrigation to the output grids.
+
+    Only temperature is used to initialize a model, so cells with the same
+    inputs and temperatures (e.g. weather from a coarser grid) share an
+    initialized model and only swap in their own precipitation and reference ET
+
+    *Arguments:*\n
+
+    `setup` : `dict` : settings of the run (see `run_grid`)
+
+    `window` : `tuple` : (first row, last row + 1), (first column, last column + 1) of the chunk
+
+    *Returns:*
+
+    `window` : `tuple` : window of the chunk
+
+    """
+    input_dir, output_dir = setup["input_dir"], setup["output_dir"]
+    rows, cols = slice(*window[0]), slice(*window[1])
+
+    weather = [
+        np.asarray(np.load(os.path.join(input_dir, name + ".npy"), mmap_mode="r")[rows, cols])
+        for name in weather_names
+    ]
+    shape = weather[0].shape[:2]
+    rasters = [
+        np.asarray(np.load(os.path.join(input_dir, name + ".npy"), mmap_mode="r")[rows, cols])
+        if os.path.exists(os.path.join(input_dir, name + ".npy"))
+        else np.zeros(shape, dtype=int)
+        for name in setup["inputs"]
+    ]
+
+    n_seasons = setup["n_seasons"]
+    results = {name: np.full((n_seasons,) + shape, np.nan) for name in output_names}
+
+    templates = {}
+    for i, j in np.ndindex(shape):
+        idx = tuple(int(raster[i, j]) for raster in rasters)
+        if min(idx) < 0:
+            continue
+
+        key = (idx, weather[0][i, j].tobytes(), weather[1][i, j].tobytes())
+        template = templates.get(key)
+        if template is None:
+            template = _cell_template(setup, idx, [w[i, j] for w in weather])
+            if len(templates) == max_templates:
+                templates.pop(next(iter(templates)))
+            templates[key] = template
+
+        model = template.copy()
+
+        start = setup["start_step"]
+        days = slice(start, start + len(model.weather))
+        model.weather[:, 2] = weather[2][i, j, days]
+        model.weather[:, 3] = weather[3][i, j, days].clip(min=0.1)
+
+        model.step(till_termination=True)
+
+        Final = model.Outputs.Final
+        seasons = Final.Season.values.astype(int)
+        keep = seasons < n_seasons
+        results["Yield"][seasons[keep], i, j] = Final["Yield (tonne/ha)"].values[keep]
+        results["Irrigation"][seasons[keep], i, j] = Final["Seasonal irrigation (mm)"].values[
+            keep
+        ]
+
+    for name in output_names:
+        grid = np.load(os.path.join(output_dir, name + ".npy"), mmap_mode="r+")
+        grid[:, rows, cols] = results[name]
+        grid.flush()
+        del grid
+
+    # chunks that have been written are skipped if the run is restarted
+    open(_done_path(output_dir, window), "w").close()
+
+    return window
+
+
+def _done_path(output_dir, window):
+    """
+    Function to get the path of the file marking a chunk as done
+    """
+    return os.path.join(output_dir, "chunks", f"{window[0][0]}_{window[1][0]}.done")
+
+
+# Cell
+def run_grid(
+    input_dir,
+    output_dir,
+    SimStartTime,
+    SimEndTime,
+    weather_start,
+    inputs,
+    chunk_shape=(32, 32),
+    n_jobs=None,
+    retries=2,
+    **kwargs,
+):
+    """
+    Function to simulate every cell of a grid and write the yield and seasonal
+    irrigation of each season to grids on disk, one chunk of cells at a time.
+
+    `input_dir` contains a daily grid (rows x columns x days, `.npy`) of each
+    weather variable in `weather_names`, and an integer grid (rows x columns,
+    `.npy`) for each model input in `inputs` that gives the index of each cell's
+    object in its list. A grid can be left out for inputs with a single object,
+    and cells with a negative index are not simulated.
+
+    Chunks are run in parallel and each chunk writes its part of the output
+    grids (`output_names`, seasons x rows x columns, `.npy`, `NaN` where not
+    simulated) to `output_dir` when it is done. Failed chunks are retried on their
+    own (up to `retries` times), the chunks that fail every time are returned
+    with their exception, and a run that is restarted with the same output
+    directory only runs the chunks that are not done
+
+    *Arguments:*\n
+
+    `input_dir` : `str` : directory of input grids
+
+    `output_dir` : `str` : directory of output grids
+
+    `SimStartTime` : `str` : simulation start date
+
+    `SimEndTime` : `str` : simulation end date
+
+    `weather_start` : `str` : date of the first day of the weather grids
+
+    `inputs` : `dict` : list of objects of each model input (`Soil`, `Crop` and `InitWC` are required, `IrrMngt`, `FieldMngt`, `FallowFieldMngt` and `Groundwater` are optional)
+
+    `chunk_shape` : `tuple` : number of rows and columns of each chunk
+
+    `n_jobs` : `int` : number of processes (default: number of processors, 1 runs
+    everything in the current process)
+
+    `retries` : `int` : number of times a failed chunk is run again
+
+    `kwargs` : other `AquaCropModel` arguments (`CO2conc`)
+
+    *Returns:*
+
+    `failed` : `dict` : exception of the last attempt of each chunk that failed every time, by window ((first row, last row + 1), (first column, last column + 1))
+
+    """
+    ny, nx = np.load(os.path.join(input_dir, weather_names[0] + ".npy"), mmap_mode="r").shape[:2]
+    setup = dict(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        SimStartTime=SimStartTime,
+        SimEndTime=SimEndTime,
+        weather_start=weather_start,
+        inputs=dict(inputs),
+        kwargs=kwargs,
+        start_step=(pd.to_datetime(SimStartTime) - pd.to_datetime(weather_start)).days,
+    )
+
+    # number of seasons from the model of the first cell that is simulated
+    rasters = [
+        np.load(os.path.join(input_dir, name + ".npy"))
+        if os.path.exists(os.path.join(input_dir, name + ".npy"))
+        else np.zeros((ny, nx), dtype=int)
+        for name in setup["inputs"]
+    ]
+    valid = np.argwhere(np.min(rasters, axis=0) >= 0)
+    assert len(valid) > 0, "no cells to simulate"
+    i, j = valid[0]
+    weather = [
+        np.load(os.path.join(input_dir, name + ".npy"), mmap_mode="r")[i, j]
+        for name in weather_names
+    ]
+    idx = tuple(int(raster[i, j]) for raster in rasters)
+    setup["n_seasons"] = n_seasons = _cell_template(setup, idx, weather).ClockStruct.nSeasons
+
+    # output grids are kept if they are from an earlier run of the same grid
+    os.makedirs(os.path.join(output_dir, "chunks"), exist_ok=True)
+    for name in output_names:
+        path = os.path.join(output_dir, name + ".npy")
+        if not os.path.exists(path) or np.load(path, mmap_mode="r").shape != (n_seasons, ny, nx):
+            grid = np.lib.format.open_memmap(path, "w+", float, (n_seasons, ny, nx))
+            grid[:] = np.nan
+            grid.flush()
+            del grid
+            for f in os.listdir(os.path.join(output_dir, "chunks")):
+                os.remove(os.path.join(output_dir, "chunks", f))
+
+    windows = [
+        ((r, min(r + chunk_shape[0], ny)), (c, min(c + chunk_shape[1], nx)))
+        for r in range(0, ny, chunk_shape[0])
+        for c in range(0, nx, chunk_shape[1])
+    ]
+    pending = [w for w in windows if not os.path.exists(_done_path(output_dir, w))]
+
+    n_jobs = n_jobs or os.cpu_count()
+    failed = {}
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+
+        failed = {}
+        if n_jobs == 1:
+            for window in pending:
+                try:
+                    _run_chunk(setup, window)
+                except Exception as e:
+                    failed[window] = e
+        else:
+            # a new pool for every attempt, so that a crashed worker only
+            # affects the chunks that were running
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = {executor.submit(_run_chunk, setup, w): w for w in pending}
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        failed[futures[future]] = future.exception()
+        pending = [w for w in pending if w in failed]
+
+    return {window: failed[window] for window in pending}
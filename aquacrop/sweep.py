@@ -0,0 +1,154 @@
+__all__ = ["planting_date_sweep"]
+
+# Cell
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+
+import pandas as pd
+
+from .core import AquaCropModel
+
+
+# Cell
+def _run_member(model):
+    """
+    Function to run a sweep member from its current time-step till termination
+
+    *Arguments:*\n
+
+    `model` : `AquaCropModel` : initialized model
+
+    *Returns:*
+
+    `PlantingDates` : `pandas.DatetimeIndex` : planting date of each season
+
+    `Final` : `pandas.DataFrame` : final (seasonal) model outputs
+
+    """
+    model.step(till_termination=True)
+
+    return model.ClockStruct.PlantingDates, model.Outputs.Final
+
+
+def _fork(base, member):
+    """
+    Function to continue `member` from the state of `base` at its current time-step.
+    Both models must still be in the fallow period before their first growing season
+
+    *Arguments:*\n
+
+    `base` : `AquaCropModel` : model that has simulated the fallow period so far
+
+    `member` : `AquaCropModel` : initialized model that has not been run yet
+
+    """
+    t = base.ClockStruct.TimeStepCounter
+    assert base.ClockStruct.SeasonCounter == member.ClockStruct.SeasonCounter == -1
+
+    member.InitCond = deepcopy(base.InitCond)
+    member.ClockStruct.TimeStepCounter = t
+    member.ClockStruct.StepStartTime = base.ClockStruct.StepStartTime
+    member.ClockStruct.StepEndTime = base.ClockStruct.StepEndTime
+
+    member.Outputs.Water[:t] = base.Outputs.Water[:t]
+    member.Outputs.Flux[:t] = base.Outputs.Flux[:t]
+    member.Outputs.Growth[:t] = base.Outputs.Growth[:t]
+    member.Outputs.MonthTotals[:] = base.Outputs.MonthTotals
+    member.Outputs.WeekTotals[:] = base.Outputs.WeekTotals
+    member.Outputs.BalanceDays = list(base.Outputs.BalanceDays)
+
+
+# Cell
+def planting_date_sweep(
+    SimStartTime, SimEndTime, wdf, Soil, Crop, InitWC, planting_dates, n_jobs=None, **kwargs
+):
+    """
+    Function to run the same simulation for a number of planting dates.
+
+    The days before the first growing season of each planting date are a fallow
+    period that is the same for every planting date, so it is only simulated once
+    (by the planting date that starts last). Every other planting date continues
+    from that shared state on the day before its first planting, and the planting
+    dates are then run in parallel
+
+    *Arguments:*\n
+
+    `SimStartTime` : `str` : simulation start date
+
+    `SimEndTime` : `str` : simulation end date
+
+    `wdf` : `pandas.DataFrame` : weather data
+
+    `Soil` : `SoilClass` : soil
+
+    `Crop` : `CropClass` : crop, its `PlantingDate` is replaced by each planting date
+
+    `InitWC` : `InitWCClass` : initial water content
+
+    `planting_dates` : `list` : planting dates (mm/dd)
+
+    `n_jobs` : `int` : number of processes (default: number of processors, 1 runs
+    everything in the current process)
+
+    `kwargs` : other `AquaCropModel` arguments (`IrrMngt`, `FieldMngt`, `FallowFieldMngt`,
+    `Groundwater`, `CO2conc`)
+
+    *Returns:*
+
+    `results` : `pandas.DataFrame` : yield and seasonal irrigation indexed by
+    planting date and year of planting (use `results.unstack()` for a planting date by
+    year matrix)
+
+    """
+    members = []
+    for date in planting_dates:
+        crop = deepcopy(Crop)
+        crop.PlantingDate = date
+        model = AquaCropModel(
+            SimStartTime,
+            SimEndTime,
+            wdf,
+            deepcopy(Soil),
+            crop,
+            deepcopy(InitWC),
+            **deepcopy(kwargs),
+        )
+        model.initialize()
+        members.append(model)
+
+    # time-step of the first planting of each member
+    starts = [m.ClockStruct.TimeSpan.get_loc(m.ClockStruct.PlantingDates[0]) for m in members]
+    order = sorted(range(len(members)), key=lambda i: starts[i])
+
+    # the member that is planted last simulates the fallow period and the other
+    # members are forked from it the day before their first planting (so that they
+    # start their first season themselves)
+    base = members[order[-1]]
+    for i in order[:-1]:
+        if starts[i] > 0:
+            base.step(num_steps=starts[i] - 1 - base.ClockStruct.TimeStepCounter)
+            _fork(base, members[i])
+
+    if n_jobs == 1:
+        outputs = [_run_member(model) for model in members]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            outputs = list(executor.map(_run_member, members))
+
+    results = []
+    for date, (PlantingDates, Final) in zip(planting_dates, outputs):
+        seasons = Final.index.astype(int)
+        results.append(
+            pd.DataFrame(
+                {
+                    "Planting Date (mm/dd)": date,
+                    "Year": PlantingDates[seasons].year,
+                    "Yield (tonne/ha)": Final["Yield (tonne/ha)"].values.astype(float),
+                    "Seasonal irrigation (mm)": Final["Seasonal irrigation (mm)"].values.astype(
+                        float
+                    ),
+                }
+            )
+        )
+
+    return pd.concat(results).set_index(["Planting Date (mm/dd)", "Year"])
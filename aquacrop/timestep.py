@@ -1,27 +1,67 @@
-__all__ = ["solution", "check_model_termination", "reset_initial_conditions", "update_time"]
+__all__ = [
+    "solution",
+    "quiescent_solution",
+    "check_model_termination",
+    "reset_initial_conditions",
+    "update_time",
+    "outputs_to_dataframes",
+    "flux_total_names",
+    "init_flux_totals",
+    "totals_to_dataframes",
+    "balance_total_names",
+    "water_balance_to_dataframes",
+]
 
 # Cell
 from .solution import *
-from .initialize import calculate_HI_linear, calculate_HIGC
+from .initialize import compute_fCO2, season_calendar_dtype
 from .classes import *
+from copy import copy
 import numpy as np
 import pandas as pd
 
 
 
 
+# daily fluxes (columns of Outputs.Flux) that are summed over each season,
+# month and week while the model runs
+flux_total_names = [
+    "IrrDay",
+    "Infl",
+    "Runoff",
+    "DeepPerc",
+    "CR",
+    "GwIn",
+    "Es",
+    "EsPot",
+    "Tr",
+    "P",
+]
+
+# seasonal totals of the water balance check (see `AquaCropModel`
+# `water_balance_tol`)
+balance_total_names = [
+    "Storage change (mm)",
+    "Net inflow (mm)",
+    "Residual (mm)",
+    "Largest daily residual (mm)",
+    "Flagged days",
+]
+
 # compiled functions
-from .solution_aot import (
-    _growing_degree_day, 
-    _drainage, 
-    _root_zone_water, 
-    _rainfall_partition, 
-    _check_groundwater_table, 
-    _soil_evaporation,
-    _root_development, 
-    _infiltration, 
-    _HIref_current_day, 
-    _biomass_accumulation)
+from .engine import load_kernels, typed_record
+
+_kernels = load_kernels()
+_growing_degree_day = _kernels._growing_degree_day
+_drainage = _kernels._drainage
+_rainfall_partition = _kernels._rainfall_partition
+_check_groundwater_table = _kernels._check_groundwater_table
+_soil_evaporation = _kernels._soil_evaporation
+_root_development = _kernels._root_development
+_infiltration = _kernels._infiltration
+_HIref_current_day = _kernels._HIref_current_day
+_biomass_accumulation = _kernels._biomass_accumulation
+_water_storage = _kernels._water_storage
 
 
 # Cell
@@ -67,6 +107,11 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
     # Store initial conditions in structure for updating %%
     NewCond = InitCond
 
+    # Previous day was simulated and outside of the growing season
+    Fallow = (InitCond.GrowingSeason == False) and (
+        InitCond.TimeStepCounter == ClockStruct.TimeStepCounter - 1
+    )
+
     # Check if growing season is active on current time step %%
     if ClockStruct.SeasonCounter >= 0:
         # Check if in growing season
@@ -142,10 +187,36 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
 
     
 
-    class_args = {key:value for key, value in Crop_.__dict__.items() if not key.startswith('__') and not callable(key)}
-    Crop = CropStructNT(**class_args)
+    # named tuple of the crop parameters for the compiled functions, only
+    # made again when the crop changes
+    if (ParamStruct.CropNT is None) or (ParamStruct.CropNT[0] is not Crop_):
+        class_args = {key:value for key, value in Crop_.__dict__.items() if not key.startswith('__') and not callable(key)}
+        ParamStruct.CropNT = (
+            Crop_,
+            typed_record(CropStructNT_type_sig, CropStructNT(**class_args)),
+        )
 
+    Crop = ParamStruct.CropNT[1]
+
+    # Quiescent fallow day: outside of the growing season the crop steps only
+    # repeat the resets of the previous fallow day, and without rain, surface
+    # water or a water table only drainage and soil evaporation change the soil
+    if (
+        Fallow
+        and (GrowingSeason == False)
+        and (P == 0)
+        and (ParamStruct.WaterTable == 0)
+        and (NewCond.SurfaceStorage == 0)
+        and ((ClockStruct.SeasonCounter == -1) or (NewCond.HarvestFlag == True))
+    ):
+        NewCond, Outputs = quiescent_solution(
+            NewCond, ParamStruct, ClockStruct, Crop, IrrMngt, FieldMngt, Et0, GDD, Outputs
+        )
+        return NewCond, ParamStruct, Outputs
 
+    # water stored at the start of the day (for the water balance check)
+    if Outputs.BalanceTol is not None:
+        Storage0 = _water_storage(Soil.Profile, NewCond.th, NewCond.SurfaceStorage)
 
     # Run simulations %%
     # 1. Check for groundwater table
@@ -193,6 +264,9 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         NewCond.th,
         NewCond.th_fc_Adj,
     )
+    # root zone summary (see root_zone_summary) has to be recalculated after each
+    # step that modifies th (this also covers steps 1 and 3)
+    NewCond.RootZone = None
 
     # 5. Surface runoff
     Runoff, Infl, NewCond.DaySubmerged = _rainfall_partition(
@@ -247,10 +321,14 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         Runoff,
         GrowingSeason,
     )
+    NewCond.RootZone = None
+
     # 8. Capillary Rise
     NewCond, CR = capillary_rise(
         Soil.Profile, Soil.nLayer, Soil.fshape_cr, NewCond, FluxOut, ParamStruct.WaterTable
     )
+    if CR > 0:
+        NewCond.RootZone = None
 
     # 9. Check germination
     NewCond = germination(
@@ -306,6 +384,8 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         GrowingSeason,
     )
 
+    NewCond.RootZone = None
+
     # 13. Crop transpiration
     Tr, TrPot_NS, TrPot, NewCond, IrrNet = transpiration(
         Soil.Profile,
@@ -323,6 +403,8 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
 
     # 14. Groundwater inflow
     NewCond, GwIn = groundwater_inflow(Soil.Profile, NewCond)
+    if GwIn > 0:
+        NewCond.RootZone = None
 
     # 15. Reference harvest index
     (NewCond.HIref,
@@ -370,17 +452,8 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         NewCond.Y = 0
 
     # 19. Root zone water
-    _TAW = TAWClass()
-    _Dr = DrClass()
-    # thRZ = thRZClass()
-
-    Wr, _Dr.Zt, _Dr.Rz, _TAW.Zt, _TAW.Rz, _, _, _, _, _, _ = _root_zone_water(
-        Soil.Profile,
-        float(NewCond.Zroot),
-        NewCond.th,
-        Soil.zTop,
-        float(Crop.Zmin),
-        Crop.Aer,
+    Wr, _, Dr_Rz, _, TAW_Rz, _, _, _, _, _, _ = root_zone_summary(
+        Soil.Profile, NewCond, Soil.zTop, Crop
     )
 
     # Wr, _Dr, _TAW, _thRZ = root_zone_water(
@@ -392,7 +465,8 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
     NewCond.IrrNetCum = NewCond.IrrNetCum + PreIrr
 
     # Update model outputs %%
-    row_day = ClockStruct.TimeStepCounter
+    # (days are written to the first row if daily outputs are not kept)
+    row_day = ClockStruct.TimeStepCounter if Outputs.Daily else 0
     row_gs = ClockStruct.SeasonCounter
 
     # Irrigation
@@ -410,8 +484,8 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         IrrDay = 0
         IrrTot = 0
 
-        NewCond.Depletion = _Dr.Rz
-        NewCond.TAW = _TAW.Rz
+        NewCond.Depletion = Dr_Rz
+        NewCond.TAW = TAW_Rz
 
     # Water contents
     Outputs.Water[row_day, :3] = np.array([ClockStruct.TimeStepCounter, GrowingSeason, NewCond.DAP])
@@ -436,6 +510,25 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
         Tr,
         P,
     ]
+    if not Outputs.Daily:
+        _add_flux_totals(
+            Outputs,
+            row_day,
+            ClockStruct.TimeStepCounter,
+            ClockStruct.SeasonCounter if GrowingSeason else -1,
+        )
+
+    # Water balance check (the total runoff includes water overtopping the
+    # bunds, and only the irrigation reaching the field is stored)
+    if Outputs.BalanceTol is not None:
+        IrrIn = Irr * (IrrMngt.AppEff / 100) if GrowingSeason else 0
+        _check_water_balance(
+            Outputs,
+            ClockStruct.TimeStepCounter,
+            ClockStruct.SeasonCounter if GrowingSeason else -1,
+            _water_storage(Soil.Profile, NewCond.th, NewCond.SurfaceStorage) - Storage0,
+            P + IrrIn + IrrNet + CR + GwIn - RunoffTot - DeepPerc - Es - Tr,
+        )
 
     # Crop growth
     Outputs.Growth[row_day, :] = [
@@ -478,6 +571,258 @@ def solution(InitCond, ParamStruct, ClockStruct, weather_step, Outputs):
     return NewCond, ParamStruct, Outputs
 
 
+# Cell
+def quiescent_solution(NewCond, ParamStruct, ClockStruct, Crop, IrrMngt, FieldMngt, Et0, GDD, Outputs):
+    """
+    Function to perform the solution for a quiescent fallow day (no crop,
+    rain, surface water or water table, after a fallow day): only drainage
+    and soil evaporation are calculated, giving the same results as `solution`
+
+    *Arguments:*\n
+
+    `NewCond` : `InitCondClass` :  containing current model paramaters
+
+    `ParamStruct` : `ParamStructClass` :  Contains model paramaters
+
+    `ClockStruct` : `ClockStructClass` :  model time paramaters
+
+    `Crop` : `CropStructNT` :  crop paramaters
+
+    `IrrMngt` : `IrrMngtStruct` :  irrigation management paramaters
+
+    `FieldMngt` : `FieldMngtStruct` :  field management paramaters
+
+    `Et0` : `float` :  reference evapotranspiration
+
+    `GDD` : `float` :  growing degree days of the day
+
+    `Outputs` : `OutputClass` :  object to store outputs
+
+    *Returns:*
+
+    `NewCond` : `InitCondClass` :  containing updated model paramaters
+
+    `Outputs` : `OutputClass` :  object to store outputs
+
+    """
+    Soil = ParamStruct.Soil
+    if Outputs.BalanceTol is not None:
+        Storage0 = _water_storage(Soil.Profile, NewCond.th, NewCond.SurfaceStorage)
+
+    # 4. Drainage
+    NewCond.th, DeepPerc, FluxOut = _drainage(
+        Soil.Profile,
+        NewCond.th,
+        NewCond.th_fc_Adj,
+    )
+    NewCond.RootZone = None
+
+    # 12. Soil evaporation
+    NewCond.Epot,NewCond.th,NewCond.Stage2,NewCond.Wstage2,NewCond.Wsurf,NewCond.SurfaceStorage,NewCond.EvapZ, Es, EsPot = _soil_evaporation(
+        ClockStruct.EvapTimeSteps,
+        ClockStruct.SimOffSeason,
+        ClockStruct.TimeStepCounter,
+        Soil.Profile,
+        Soil.EvapZmin,
+        Soil.EvapZmax,
+        Soil.REW,
+        Soil.Kex,
+        Soil.fwcc,
+        Soil.fWrelExp,
+        Soil.fevap,
+        Crop.CalendarType,
+        Crop.Senescence,
+        IrrMngt.IrrMethod,
+        IrrMngt.WetSurf,
+        FieldMngt.Mulches,
+        FieldMngt.fMulch,
+        FieldMngt.MulchPct,
+        NewCond.DAP,
+        NewCond.Wsurf,
+        NewCond.EvapZ,
+        NewCond.Stage2,
+        NewCond.th,
+        NewCond.DelayedCDs,
+        NewCond.GDDcum,
+        NewCond.DelayedGDDs,
+        NewCond.CCxW,
+        NewCond.CCadj,
+        NewCond.CCxAct,
+        NewCond.CC,
+        NewCond.PrematSenes,
+        NewCond.SurfaceStorage,
+        NewCond.Wstage2,
+        NewCond.Epot,
+        Et0,
+        0.0,
+        0.0,
+        0.0,
+        False,
+    )
+    NewCond.RootZone = None
+
+    # 19. Root zone water
+    Wr, _, Dr_Rz, _, TAW_Rz, _, _, _, _, _, _ = root_zone_summary(
+        Soil.Profile, NewCond, Soil.zTop, Crop
+    )
+    NewCond.Depletion = Dr_Rz
+    NewCond.TAW = TAW_Rz
+
+    # Update model outputs %%
+    row_day = ClockStruct.TimeStepCounter if Outputs.Daily else 0
+    Outputs.Water[row_day, :3] = np.array([ClockStruct.TimeStepCounter, False, NewCond.DAP])
+    Outputs.Water[row_day, 3:] = NewCond.th
+    Outputs.Flux[row_day, :] = [
+        ClockStruct.TimeStepCounter,
+        ClockStruct.SeasonCounter,
+        NewCond.DAP,
+        Wr,
+        NewCond.zGW,
+        NewCond.SurfaceStorage,
+        0,
+        0,
+        0,
+        DeepPerc,
+        0,
+        0,
+        Es,
+        EsPot,
+        0,
+        0,
+    ]
+    if not Outputs.Daily:
+        _add_flux_totals(Outputs, row_day, ClockStruct.TimeStepCounter, -1)
+    if Outputs.BalanceTol is not None:
+        _check_water_balance(
+            Outputs,
+            ClockStruct.TimeStepCounter,
+            -1,
+            _water_storage(Soil.Profile, NewCond.th, NewCond.SurfaceStorage) - Storage0,
+            -DeepPerc - Es,
+        )
+    Outputs.Growth[row_day, :] = [
+        ClockStruct.TimeStepCounter,
+        ClockStruct.SeasonCounter,
+        NewCond.DAP,
+        GDD,
+        NewCond.GDDcum,
+        NewCond.Zroot,
+        NewCond.CC,
+        NewCond.CC_NS,
+        NewCond.B,
+        NewCond.B_NS,
+        NewCond.HI,
+        NewCond.HIadj,
+        NewCond.Y,
+    ]
+
+    return NewCond, Outputs
+
+
+# Cell
+def _add_flux_totals(Outputs, row_day, step, season):
+    """
+    Function to add the fluxes of a day (see `flux_total_names`) to the totals
+    of its month, week and (if in a growing season) season. Only used without
+    daily outputs, the totals are summed from the daily outputs otherwise
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object to store outputs
+
+    `row_day` : `int` :  row of the day in the daily outputs
+
+    `step` : `int` :  time-step of the day
+
+    `season` : `int` :  growing season of the day (-1 if out of season)
+
+    """
+    flux = Outputs.Flux[row_day, 6:]
+    Outputs.MonthTotals[Outputs.MonthIndex[step]] += flux
+    Outputs.WeekTotals[Outputs.WeekIndex[step]] += flux
+    if season > -1:
+        Outputs.SeasonTotals[season] += flux
+
+
+def _check_water_balance(Outputs, step, season, dS, inflow):
+    """
+    Function to check that the change in water stored in the soil and on the
+    surface over a day equals the net inflow of the day. Days with a residual
+    larger than the tolerance are flagged and the residuals of growing seasons
+    are added to the seasonal totals (see `balance_total_names`)
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object to store outputs
+
+    `step` : `int` :  time-step of the day
+
+    `season` : `int` :  growing season of the day (-1 if out of season)
+
+    `dS` : `float` :  change in water stored (mm)
+
+    `inflow` : `float` :  rain, irrigation, capillary rise and groundwater inflow less runoff, deep percolation, evaporation and transpiration (mm)
+
+    """
+    Residual = dS - inflow
+    flagged = abs(Residual) > Outputs.BalanceTol
+    if flagged:
+        Outputs.BalanceDays.append((step, season, dS, inflow, Residual))
+
+    if season > -1:
+        totals = Outputs.BalanceTotals[season]
+        totals[0] += dS
+        totals[1] += inflow
+        totals[2] += Residual
+        totals[3] = max(totals[3], abs(Residual))
+        totals[4] += flagged
+
+
+def init_flux_totals(Outputs, ClockStruct):
+    """
+    Function to set up (or extend to a later simulation end date) the
+    seasonal, monthly and weekly flux totals (and the seasonal totals of the
+    water balance check) of the outputs. Weeks start on Mondays
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object to store outputs
+
+    `ClockStruct` : `ClockStructClass` :  model time paramaters
+
+    """
+    TimeSpan = ClockStruct.TimeSpan
+    n = len(flux_total_names)
+
+    months = TimeSpan.year * 12 + TimeSpan.month
+    # (lists, python ints index the totals faster than numpy ones)
+    Outputs.MonthIndex = (months - months[0]).tolist()
+    Outputs.MonthStart = pd.date_range(
+        TimeSpan[0] - pd.offsets.MonthBegin(1) if TimeSpan[0].day > 1 else TimeSpan[0],
+        periods=Outputs.MonthIndex[-1] + 1,
+        freq="MS",
+    )
+
+    offset = TimeSpan[0].dayofweek
+    Outputs.WeekIndex = ((np.arange(len(TimeSpan)) + offset) // 7).tolist()
+    Outputs.WeekStart = pd.date_range(
+        TimeSpan[0] - pd.Timedelta(days=offset), periods=Outputs.WeekIndex[-1] + 1, freq="7D"
+    )
+
+    # totals so far are kept if the simulation is extended
+    for name, rows, columns in [
+        ("SeasonTotals", ClockStruct.nSeasons, n),
+        ("MonthTotals", len(Outputs.MonthStart), n),
+        ("WeekTotals", len(Outputs.WeekStart), n),
+        ("BalanceTotals", ClockStruct.nSeasons, len(balance_total_names)),
+    ]:
+        totals = np.zeros((rows, columns))
+        old = getattr(Outputs, name)
+        if isinstance(old, np.ndarray):
+            totals[: len(old)] = old[:rows]
+        setattr(Outputs, name, totals)
+
+
 # Cell
 def check_model_termination(ClockStruct, InitCond):
     """
@@ -515,6 +860,10 @@ def check_model_termination(ClockStruct, InitCond):
 
 
 # Cell
+# crop calendar fields of the season table
+_calendar_names = [name for name in season_calendar_dtype.names if name != "fCO2"]
+
+
 def reset_initial_conditions(ClockStruct, InitCond, ParamStruct, weather):
 
     """
@@ -546,7 +895,6 @@ def reset_initial_conditions(ClockStruct, InitCond, ParamStruct, weather):
     Crop = ParamStruct.Seasonal_Crop_List[ClockStruct.SeasonCounter]
     FieldMngt = ParamStruct.FieldMngt
     CO2 = ParamStruct.CO2
-    CO2_data = ParamStruct.CO2data
 
     ## Reset counters ##
     InitCond.AgeDays = 0
@@ -613,51 +961,26 @@ def reset_initial_conditions(ClockStruct, InitCond, ParamStruct, weather):
     InitCond.ProtectedSeed = 0
 
     ## Update CO2 concentration ##
-    # Get CO2 concentration
-
-    if ParamStruct.CO2concAdj != None:
-        CO2.CurrentConc = ParamStruct.CO2concAdj
-    else:
-        Yri = pd.DatetimeIndex([ClockStruct.StepStartTime]).year[0]
-        CO2.CurrentConc = CO2_data.loc[Yri]
-    # Get CO2 weighting factor for first year
-    CO2conc = CO2.CurrentConc
-    CO2ref = CO2.RefConc
-    if CO2conc <= CO2ref:
-        fw = 0
-    else:
-        if CO2conc >= 550:
-            fw = 1
-        else:
-            fw = 1 - ((550 - CO2conc) / (550 - CO2ref))
-
-    # Determine initial adjustment
-    fCO2 = (CO2conc / CO2ref) / (
-        1
-        + (CO2conc - CO2ref)
-        * (
-            (1 - fw) * Crop.bsted
-            + fw * ((Crop.bsted * Crop.fsink) + (Crop.bface * (1 - Crop.fsink)))
+    # Get CO2 concentration and WP adjustment for current year from the
+    # tables precomputed in compute_variables
+    Yri = ClockStruct.StepStartTime.year - ParamStruct.CO2years[0]
+    CO2.CurrentConc = ParamStruct.CO2conc[Yri]
+
+    key = (Crop.bsted, Crop.bface, Crop.fsink, Crop.WP)
+    if key not in ParamStruct.fCO2data:
+        ParamStruct.fCO2data[key] = compute_fCO2(
+            ParamStruct.CO2conc, CO2.RefConc, Crop.bsted, Crop.bface, Crop.fsink, Crop.WP
         )
-    )
-
-    # Consider crop type
-    if Crop.WP >= 40:
-        # No correction for C4 crops
-        ftype = 0
-    elif Crop.WP <= 20:
-        # Full correction for C3 crops
-        ftype = 1
-    else:
-        ftype = (40 - Crop.WP) / (40 - 20)
 
     # Total adjustment
-    Crop.fCO2 = 1 + ftype * (fCO2 - 1)
+    season = ParamStruct.SeasonCalendars[ClockStruct.SeasonCounter]
+    season["fCO2"] = ParamStruct.fCO2data[key][Yri]
 
     ## Reset soil water conditions (if not running off-season) ##
     if ClockStruct.SimOffSeason == False:
         # Reset water content to starting conditions
         InitCond.th = InitCond.thini
+        InitCond.RootZone = None
         # Reset surface storage
         if (FieldMngt.Bunds) and (FieldMngt.zBund > 0.001):
             # Get initial storage between surface bunds
@@ -666,79 +989,25 @@ def reset_initial_conditions(ClockStruct, InitCond, ParamStruct, weather):
             # No surface bunds
             InitCond.SurfaceStorage = 0
 
-    ## Update crop parameters (if in GDD mode) ##
+    ## Update crop parameters ##
+    # The season's own copy of the CropStruct shared by the seasons of the
+    # crop, with the values of the season from the season table
+    Crop = copy(Crop)
+    Crop.fCO2 = season["fCO2"]
     if Crop.CalendarType == 2:
-        # Extract weather data for upcoming growing season
-        wdf = weather[weather[:, 4] >= ClockStruct.PlantingDates[ClockStruct.SeasonCounter]]
-        # wdf = wdf[wdf[:,4]<=ClockStruct.HarvestDates[ClockStruct.SeasonCounter]]
-        Tmin = wdf[:, 0]
-        Tmax = wdf[:, 1]
-
-        # Calculate GDD's
-        if Crop.GDDmethod == 1:
-            Tmean = (Tmax + Tmin) / 2
-            Tmean[Tmean > Crop.Tupp] = Crop.Tupp
-            Tmean[Tmean < Crop.Tbase] = Crop.Tbase
-            GDD = Tmean - Crop.Tbase
-        elif Crop.GDDmethod == 2:
-            Tmax[Tmax > Crop.Tupp] = Crop.Tupp
-            Tmax[Tmax < Crop.Tbase] = Crop.Tbase
-            Tmin[Tmin > Crop.Tupp] = Crop.Tupp
-            Tmin[Tmin < Crop.Tbase] = Crop.Tbase
-            Tmean = (Tmax + Tmin) / 2
-            GDD = Tmean - Crop.Tbase
-        elif Crop.GDDmethod == 3:
-            Tmax[Tmax > Crop.Tupp] = Crop.Tupp
-            Tmax[Tmax < Crop.Tbase] = Crop.Tbase
-            Tmin[Tmin > Crop.Tupp] = Crop.Tupp
-            Tmean = (Tmax + Tmin) / 2
-            Tmean[Tmean < Crop.Tbase] = Crop.Tbase
-            GDD = Tmean - Crop.Tbase
-
-        GDDcum = np.cumsum(GDD)
-
+        # Look up calendar for upcoming growing season (precomputed in
+        # compute_season_calendars)
         assert (
-            GDDcum[-1] > Crop.Maturity
-        ), f"not enough growing degree days in simulation ({GDDcum[-1]}) to reach maturity ({Crop.Maturity})"
-
-        Crop.MaturityCD = np.argmax((GDDcum > Crop.Maturity)) + 1
-
-        assert Crop.MaturityCD < 365, "crop will take longer than 1 year to mature"
-
-        # 1. GDD's from sowing to maximum canopy cover
-        Crop.MaxCanopyCD = (GDDcum > Crop.MaxCanopy).argmax() + 1
-        # 2. GDD's from sowing to end of vegetative growth
-        Crop.CanopyDevEndCD = (GDDcum > Crop.CanopyDevEnd).argmax() + 1
-        # 3. Calendar days from sowing to start of yield formation
-        Crop.HIstartCD = (GDDcum > Crop.HIstart).argmax() + 1
-        # 4. Calendar days from sowing to end of yield formation
-        Crop.HIendCD = (GDDcum > Crop.HIend).argmax() + 1
-        # 5. Duration of yield formation in calendar days
-        Crop.YldFormCD = Crop.HIendCD - Crop.HIstartCD
-        if Crop.CropType == 3:
-            # 1. Calendar days from sowing to end of flowering
-            FloweringEnd = (GDDcum > Crop.FloweringEnd).argmax() + 1
-            # 2. Duration of flowering in calendar days
-            Crop.FloweringCD = FloweringEnd - Crop.HIstartCD
-        else:
-            Crop.FloweringCD = -999
-
-        # Update harvest index growth coefficient
-        Crop = calculate_HIGC(Crop)
+            ClockStruct.SeasonCounter not in ParamStruct.SeasonCalendarErrors
+        ), ParamStruct.SeasonCalendarErrors.get(ClockStruct.SeasonCounter)
 
-        # Update day to switch to linear HI build-up
-        if Crop.CropType == 3:
-            # Determine linear switch point and HIGC rate for fruit/grain crops
-            Crop = calculate_HI_linear(Crop)
-
-        else:
-            # No linear switch for leafy vegetable or root/tiber crops
-            Crop.tLinSwitch = 0
-            Crop.dHILinear = 0.0
+        for name in _calendar_names:
+            setattr(Crop, name, season[name])
 
     ## Update global variables ##
     ParamStruct.Seasonal_Crop_List[ClockStruct.SeasonCounter] = Crop
     ParamStruct.CO2 = CO2
+    ParamStruct.CropNT = None
 
     return InitCond, ParamStruct
 
@@ -818,51 +1087,177 @@ def update_time(ClockStruct, InitCond, ParamStruct, Outputs, weather):
         ClockStruct.StepStartTime = ClockStruct.StepEndTime
         ClockStruct.StepEndTime = ClockStruct.StepEndTime + np.timedelta64(1, "D")
 
-        Outputs.Flux = pd.DataFrame(
-            Outputs.Flux,
-            columns=[
-                "TimeStepCounter",
-                "SeasonCounter",
-                "DAP",
-                "Wr",
-                "zGW",
-                "SurfaceStorage",
-                "IrrDay",
-                "Infl",
-                "Runoff",
-                "DeepPerc",
-                "CR",
-                "GwIn",
-                "Es",
-                "EsPot",
-                "Tr",
-                "P",
-            ],
-        )
+        Outputs = outputs_to_dataframes(Outputs, ClockStruct.nSteps)
 
-        Outputs.Water = pd.DataFrame(
-            Outputs.Water,
-            columns=["TimeStepCounter", "GrowingSeason", "DAP"]
-            + ["th" + str(i) for i in range(1, Outputs.Water.shape[1] - 2)],
-        )
+    return ClockStruct, InitCond, ParamStruct, Outputs
 
-        Outputs.Growth = pd.DataFrame(
-            Outputs.Growth,
-            columns=[
-                "TimeStepCounter",
-                "SeasonCounter",
-                "DAP",
-                "GDD",
-                "GDDcum",
-                "Zroot",
-                "CC",
-                "CC_NS",
-                "B",
-                "B_NS",
-                "HI",
-                "HIadj",
-                "Y",
-            ],
-        )
 
-    return ClockStruct, InitCond, ParamStruct, Outputs
+# Cell
+def outputs_to_dataframes(Outputs, nSteps):
+    """
+    Function to convert the daily output arrays to DataFrames at the end of
+    the simulation
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    `nSteps` : `int` :  number of days of simulation
+
+    *Returns:*
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    """
+    Outputs = totals_to_dataframes(Outputs, nSteps)
+    Outputs = water_balance_to_dataframes(Outputs)
+    if not Outputs.Daily:
+        Outputs.Water = None
+        Outputs.Flux = None
+        Outputs.Growth = None
+        return Outputs
+
+    # output arrays may have spare rows if the simulation has been extended
+    Outputs.Flux = pd.DataFrame(
+        Outputs.Flux[:nSteps],
+        columns=[
+            "TimeStepCounter",
+            "SeasonCounter",
+            "DAP",
+            "Wr",
+            "zGW",
+            "SurfaceStorage",
+            "IrrDay",
+            "Infl",
+            "Runoff",
+            "DeepPerc",
+            "CR",
+            "GwIn",
+            "Es",
+            "EsPot",
+            "Tr",
+            "P",
+        ],
+    )
+
+    Outputs.Water = pd.DataFrame(
+        Outputs.Water[:nSteps],
+        columns=["TimeStepCounter", "GrowingSeason", "DAP"]
+        + ["th" + str(i) for i in range(1, Outputs.Water.shape[1] - 2)],
+    )
+
+    Outputs.Growth = pd.DataFrame(
+        Outputs.Growth[:nSteps],
+        columns=[
+            "TimeStepCounter",
+            "SeasonCounter",
+            "DAP",
+            "GDD",
+            "GDDcum",
+            "Zroot",
+            "CC",
+            "CC_NS",
+            "B",
+            "B_NS",
+            "HI",
+            "HIadj",
+            "Y",
+        ],
+    )
+
+    return Outputs
+
+
+def totals_to_dataframes(Outputs, nSteps):
+    """
+    Function to make tables of the seasonal, monthly and weekly flux totals,
+    with the yield and water productivities (kg of yield per m3 of
+    evapotranspiration, transpiration and irrigation) of each season.
+    With daily outputs the totals are summed from the daily fluxes (in the
+    same order as the running totals)
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    `nSteps` : `int` :  number of days of simulation
+
+    *Returns:*
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    """
+    if Outputs.Daily:
+        flux = Outputs.Flux[:nSteps, 6:]
+        growing = Outputs.Water[:nSteps, 1] == 1
+        for totals, idx, days in [
+            (Outputs.MonthTotals, Outputs.MonthIndex[:nSteps], slice(None)),
+            (Outputs.WeekTotals, Outputs.WeekIndex[:nSteps], slice(None)),
+            (Outputs.SeasonTotals, Outputs.Flux[:nSteps, 1][growing].astype(int), growing),
+        ]:
+            totals[:] = 0
+            np.add.at(totals, idx, flux[days])
+
+    Final = Outputs.Final
+    nSeasons = len(Outputs.SeasonTotals)
+    seasons = Final.Season.values.astype(int)
+
+    Outputs.Seasonal = pd.DataFrame(Outputs.SeasonTotals, columns=flux_total_names)
+    Outputs.Seasonal.insert(0, "Season", np.arange(nSeasons))
+    Outputs.Seasonal.insert(
+        1, "Crop Type", pd.Series(Final["Crop Type"].values, index=seasons).reindex(range(nSeasons)).values
+    )
+    Y = pd.Series(Final["Yield (tonne/ha)"].values.astype(float), index=seasons)
+    Y = Y.reindex(range(nSeasons)).values
+    Outputs.Seasonal.insert(2, "Yield (tonne/ha)", Y)
+
+    # tonne/ha per mm is 100 kg/m3 (no water productivity without water)
+    Seasonal = Outputs.Seasonal
+    for name, water in [
+        ("ET WP (kg/m3)", Seasonal.Es + Seasonal.Tr),
+        ("Tr WP (kg/m3)", Seasonal.Tr),
+        ("Irrigation WP (kg/m3)", Seasonal.IrrDay),
+    ]:
+        Seasonal[name] = 100 * Y / water.where(water > 0)
+
+    Outputs.Monthly = pd.DataFrame(Outputs.MonthTotals, columns=flux_total_names)
+    Outputs.Monthly.insert(0, "Month", Outputs.MonthStart)
+    Outputs.Weekly = pd.DataFrame(Outputs.WeekTotals, columns=flux_total_names)
+    Outputs.Weekly.insert(0, "Week", Outputs.WeekStart)
+
+    return Outputs
+
+
+def water_balance_to_dataframes(Outputs):
+    """
+    Function to make tables of the water balance check (if the model was run
+    with a `water_balance_tol`): the seasonal totals and the flagged days
+
+    *Arguments:*\n
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    *Returns:*
+
+    `Outputs` : `OutputClass` :  object storing outputs
+
+    """
+    if Outputs.BalanceTol is None:
+        return Outputs
+
+    Outputs.WaterBalance = pd.DataFrame(Outputs.BalanceTotals, columns=balance_total_names)
+    Outputs.WaterBalance.insert(0, "Season", np.arange(len(Outputs.BalanceTotals)))
+    Outputs.WaterBalance["Flagged days"] = Outputs.WaterBalance["Flagged days"].astype(int)
+
+    Outputs.BalanceErrors = pd.DataFrame(
+        Outputs.BalanceDays,
+        columns=[
+            "TimeStepCounter",
+            "SeasonCounter",
+            "Storage change (mm)",
+            "Net inflow (mm)",
+            "Residual (mm)",
+        ],
+    )
+
+    return Outputs
@@ -0,0 +1,294 @@
+"""
+asv benchmarks for the model engine, initialization and weather parsing.
+
+    asv check --python=same    # import the benchmarks in this environment
+    asv run                    # benchmark the current commit
+    asv continuous master HEAD # compare a branch against master
+    asv publish && asv preview # browse results across commits
+
+Results are stored in benchmarks/results (see asv.conf.json).
+"""
+
+from aquacrop.classes import (
+    SoilClass,
+    CropClass,
+    InitWCClass,
+    FieldMngtClass,
+    crop_records,
+)
+from aquacrop.core import prepare_weather, get_filepath, AquaCropModel
+from aquacrop.discretization import coarsen_soil
+from aquacrop.engine import load_kernels
+from aquacrop.lars import prepare_lars_weather
+from aquacrop.profiling import count_objects
+
+
+def wheat_tunis():
+    wdf = prepare_weather(get_filepath("tunis_climate.txt"))
+    return AquaCropModel(
+        "1979/10/01",
+        "1985/05/30",
+        wdf,
+        SoilClass("SandyLoam"),
+        CropClass("Wheat", PlantingDate="10/01"),
+        InitWC=InitWCClass(value=["FC"]),
+    )
+
+
+def paddyrice_hyderabad():
+    wdf = prepare_weather(get_filepath("hyderabad_climate.txt"))
+    fm = FieldMngtClass(Bunds=True, zBund=0.2)
+    return AquaCropModel(
+        "2000/01/01",
+        "2010/12/31",
+        wdf,
+        SoilClass("Paddy"),
+        CropClass("localpaddy", PlantingDate="08/01"),
+        InitWC=InitWCClass(depth_layer=[1, 2], value=["FC", "FC"]),
+        FieldMngt=fm,
+        FallowFieldMngt=fm,
+    )
+
+
+def layered_paddy_soil():
+    # 4 m deep profile of 40 compartments in 10 layers alternating between
+    # puddled clay and a sandier, more permeable soil
+    soil = SoilClass("custom", dz=[0.1] * 40)
+    soil.CN = 77
+    soil.REW = 10
+    for i in range(10):
+        if i % 2 == 0:
+            soil.add_layer(0.4, 0.39, 0.54, 0.55, 2, 100)
+        else:
+            soil.add_layer(0.4, 0.10, 0.22, 0.41, 300, 100)
+
+    return soil
+
+
+def paddyrice_hyderabad_layered():
+    wdf = prepare_weather(get_filepath("hyderabad_climate.txt"))
+    fm = FieldMngtClass(Bunds=True, zBund=0.2)
+    return AquaCropModel(
+        "2000/01/01",
+        "2010/12/31",
+        wdf,
+        layered_paddy_soil(),
+        CropClass("localpaddy", PlantingDate="08/01"),
+        InitWC=InitWCClass(value=["SAT"]),
+        FieldMngt=fm,
+        FallowFieldMngt=fm,
+    )
+
+
+def potato_brussels():
+    wdf = prepare_weather(get_filepath("brussels_climate.txt"))
+    return AquaCropModel(
+        "1976/01/01",
+        "2005/12/31",
+        wdf,
+        SoilClass("Loam"),
+        CropClass("PotatoLocal", PlantingDate="04/25"),
+        InitWC=InitWCClass(),
+    )
+
+
+models = {
+    "wheat_tunis": wheat_tunis,
+    "paddyrice_hyderabad": paddyrice_hyderabad,
+    "paddyrice_hyderabad_layered": paddyrice_hyderabad_layered,
+    "potato_brussels": potato_brussels,
+}
+
+
+class Import:
+    """
+    Import time in a fresh interpreter
+    """
+
+    def timeraw_import_aquacrop(self):
+        return "import aquacrop"
+
+    def timeraw_import_model(self):
+        return "from aquacrop.core import AquaCropModel"
+
+
+class Model:
+    """
+    Model set up and run for each of the bundled test cases
+    """
+
+    params = list(models)
+    param_names = ["model"]
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, name):
+        self.model = models[name]()
+        self.initialized = models[name]()
+        self.initialized.initialize()
+
+    def time_initialize(self, name):
+        self.model.initialize()
+
+    def time_step_one_year(self, name):
+        # one year of daily time-steps (365 calls of `perform_timestep`)
+        self.initialized.step(num_steps=365)
+
+    def time_step_till_termination(self, name):
+        self.initialized.step(till_termination=True)
+
+    def peakmem_step_till_termination(self, name):
+        self.initialized.step(till_termination=True)
+
+
+class Timestep:
+    """
+    Daily time-steps from the same day of the growing season (60 days after the
+    first planting) of an initialized model, without the set up and the
+    fallow days of `Model`
+    """
+
+    params = list(models)
+    param_names = ["model"]
+    # every sample starts from the same day, so a benchmark is run once after
+    # each setup and without warm-up runs
+    number = 1
+    repeat = 50
+    warmup_time = 0
+
+    def setup(self, name):
+        self.model = models[name]()
+        self.model.initialize()
+        ClockStruct = self.model.ClockStruct
+        self.model.step(num_steps=ClockStruct.TimeSpan.get_loc(ClockStruct.PlantingDates[0]) + 60)
+
+    def time_perform_timestep(self, name):
+        self.model.perform_timestep()
+
+    def time_step_ten_days(self, name):
+        self.model.step(num_steps=10)
+
+
+class Allocations:
+    """
+    Python objects created by the model steps (the steps should only update
+    existing objects and arrays)
+    """
+
+    params = list(models)
+    param_names = ["model"]
+    number = 1
+    repeat = 1
+
+    def setup(self, name):
+        self.model = models[name]()
+        self.model.initialize()
+
+    def track_objects_per_day(self, name):
+        # one year of daily time-steps
+        return count_objects(self.model, 365).sum() / 365
+
+    track_objects_per_day.unit = "objects"
+
+
+class Crops:
+    """
+    Building crops from the catalog (as in parameter sweeps)
+    """
+
+    def setup(self):
+        self.records = crop_records("localpaddy", 1000)
+
+    def time_crop_class(self):
+        for _ in range(1000):
+            CropClass("localpaddy", PlantingDate="08/01", Zmax=0.5)
+
+    def time_crop_records(self):
+        crop_records("localpaddy", 1000, Zmax=0.5)
+
+    def time_from_record(self):
+        for record in self.records:
+            CropClass.from_record(record, PlantingDate="08/01")
+
+
+class Drainage:
+    """
+    Drainage kernel on the deep, heavily layered paddy soil
+    """
+
+    params = ["FC", "SAT"]
+    param_names = ["water_content"]
+
+    def setup(self, water_content):
+        model = paddyrice_hyderabad_layered()
+        model.initialize()
+        self.prof = model.ParamStruct.Soil.Profile
+        self.th = getattr(self.prof, {"FC": "th_fc", "SAT": "th_s"}[water_content]).copy()
+        # wet the top of the profile above saturation so that excess water has
+        # to be stored in the compartments above the slowly draining layers
+        self.th[:4] += 0.05
+        self.drainage = load_kernels()._drainage
+
+    def time_drainage(self, water_content):
+        self.drainage(self.prof, self.th, self.prof.th_fc_Adj)
+
+
+class Coarsening:
+    """
+    Deep, layered paddy soil with the compartments below the rooting depth
+    merged (compare with `Model` on `paddyrice_hyderabad_layered`)
+    """
+
+    params = [0.4, 1.6]
+    param_names = ["max_dz"]
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, max_dz):
+        self.model = paddyrice_hyderabad_layered()
+        self.model.Soil = coarsen_soil(self.model.Soil, self.model.Crop.Zmax, max_dz)
+        self.model.initialize()
+
+    def time_step_till_termination(self, max_dz):
+        self.model.step(till_termination=True)
+
+
+class PrepareWeather:
+    """
+    Parsing of the bundled weather files
+    """
+
+    params = [
+        "tunis_climate.txt",
+        "hyderabad_climate.txt",
+        "brussels_climate.txt",
+        "champion_climate.txt",
+    ]
+    param_names = ["file"]
+
+    def time_prepare_weather(self, filename):
+        prepare_weather(get_filepath(filename))
+
+
+class PrepareLarsWeather:
+    """
+    Parsing of the bundled LARS-WG baseline and generated weather files
+    """
+
+    def time_prepare_lars_weather_baseline(self):
+        prepare_lars_weather(
+            get_filepath("CP.dat"),
+            -1,
+            False,
+            ["year", "jday", "maxTemp", "minTemp", "precip", "rad"],
+        )
+
+    def time_prepare_lars_weather_generated(self):
+        prepare_lars_weather(
+            get_filepath("CP_EC-EARTH[CP,RCP45,2041-2060]WG.dat"),
+            2050,
+            True,
+            ["simyear", "jday", "minTemp", "maxTemp", "precip", "rad"],
+        )
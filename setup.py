@@ -12,8 +12,8 @@ class post_install(install):
     def run(self):
         install.run(self)
         from subprocess import call
-        call(['python', 'solution.py'],
-             cwd=self.install_lib + 'aquacrop')
+        call([sys.executable, '-m', 'aquacrop.build'],
+             cwd=self.install_lib)
 
 # do not want to compile when uploading files to pypi
 # only want to compile when user installs package
@@ -0,0 +1,42 @@
+import pytest
+
+from aquacrop.classes import SoilClass, CropClass, InitWCClass
+from aquacrop.core import prepare_weather, get_filepath, AquaCropModel
+
+
+@pytest.fixture
+def tunis_weather():
+    return prepare_weather(get_filepath("tunis_climate.txt"))
+
+
+@pytest.fixture
+def hyderabad_weather():
+    return prepare_weather(get_filepath("hyderabad_climate.txt"))
+
+
+@pytest.fixture
+def wheat_model(tunis_weather):
+    """
+    Factory of wheat models planted on 1 October on a sandy loam in Tunis,
+    starting at field capacity (one season by default)
+    """
+
+    def make(
+        SimEndTime="1980/05/30",
+        wdf=None,
+        Soil="SandyLoam",
+        Crop=None,
+        SimStartTime="1979/10/01",
+        **kwargs,
+    ):
+        return AquaCropModel(
+            SimStartTime=SimStartTime,
+            SimEndTime=SimEndTime,
+            wdf=tunis_weather if wdf is None else wdf,
+            Soil=SoilClass(soilType=Soil),
+            Crop=CropClass("Wheat", PlantingDate="10/01") if Crop is None else Crop,
+            InitWC=InitWCClass(value=["FC"]),
+            **kwargs,
+        )
+
+    return make
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+import time
+
+from aquacrop.cache import ResultCache, fingerprint
+from aquacrop.classes import CropClass
+from aquacrop.core import AquaCropModel
+
+
+def test_result_cache(tunis_weather, wheat_model):
+    def make(wdf=None, **kwargs):
+        return wheat_model(
+            f"{1981}/05/30", wdf, Crop=CropClass("Wheat", PlantingDate="10/01", **kwargs)
+        )
+
+    # inputs equal in value give the same key, weather outside the
+    # simulation period is ignored
+    key = fingerprint(make())
+    later = tunis_weather.copy()
+    later.loc[later.Date > f"{1981}/06/01", "Precipitation"] += 1
+    assert fingerprint(make(later)) == key
+    wetter = tunis_weather.copy()
+    wetter.loc[wetter.Date == f"{1980}/01/10", "Precipitation"] += 1
+    assert fingerprint(make(wetter)) != key
+    assert fingerprint(make(Zmax=1.1)) != key
+
+    directory = tempfile.mkdtemp()
+    cache = ResultCache(directory)
+    Outputs = cache.run(make())
+
+    start = time.time()
+    cached = cache.run(make())
+    t = time.time() - start
+    print(f"cache hit: {round(t,4)}")
+    assert t < 0.1
+    for name in ["Water", "Flux", "Growth", "Final"]:
+        assert getattr(cached, name).equals(getattr(Outputs, name)), name
+
+    # results on disk are shared, least recently used are evicted
+    cache.run(make(Zmax=1.1))
+    # room for two results on disk
+    other = ResultCache(directory, max_disk=int(cache.metrics()["disk_bytes"] * 1.25))
+    other.run(make())
+    other.run(make(Zmax=1.0))
+    metrics = other.metrics()
+    print(cache.metrics(), metrics)
+    assert (cache.hits, cache.misses, cache.memory_hits) == (1, 2, 1)
+    assert (metrics["disk_hits"], metrics["misses"], metrics["disk_entries"]) == (1, 1, 2)
+    assert metrics["evictions"] == 1
+    assert other.get(fingerprint(make(Zmax=1.1))) is None
+
+    shutil.rmtree(directory)
+
+
+def test_fingerprint_after_run(wheat_model):
+    # models made from the same input objects hit the cache after a run
+    model = wheat_model()
+    key = fingerprint(model)
+    cache = ResultCache()
+    cache.run(model)
+    assert fingerprint(model) == key
+
+    reused = AquaCropModel(
+        model.SimStartTime,
+        model.SimEndTime,
+        model.wdf,
+        model.Soil,
+        model.Crop,
+        model.InitWC,
+        IrrMngt=model.IrrMngt,
+    )
+    cache.run(reused)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_fingerprint_daily_outputs(wheat_model):
+    # runs without daily outputs are cached apart from runs with them
+    assert fingerprint(wheat_model(daily_outputs=False)) != fingerprint(wheat_model())
+
+    cache = ResultCache()
+    totals = cache.run(wheat_model(daily_outputs=False))
+    daily = cache.run(wheat_model())
+    assert totals.Flux is None and daily.Flux is not None
+    assert cache.misses == 2
+    assert daily.Seasonal.equals(totals.Seasonal)
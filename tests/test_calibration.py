@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from aquacrop.calibration import CalibrationSiteClass, calibrate, site_error
+from aquacrop.sensitivity import run_sample
+
+
+def test_calibration(wheat_model):
+    # observations simulated with known parameters
+    problem = {"names": ["Crop.WP", "Crop.CCx"], "bounds": [[13, 19], [0.8, 0.99]]}
+    sites = []
+    for soil in ["SandyLoam", "Clay"]:
+        model = run_sample(wheat_model(Soil=soil), problem["names"], [16.0, 0.9])
+        Outputs = model.Outputs
+        daily = Outputs.Growth[["CC"]].set_index(model.ClockStruct.TimeSpan[: len(Outputs.Growth)])
+        daily["th1"] = Outputs.Water.th1.values
+        yields = Outputs.Final.set_index("Season")["Yield (tonne/ha)"].astype(float)
+        sites.append(CalibrationSiteClass(wheat_model(Soil=soil), yields, daily.iloc[::7]))
+
+    cache = {}
+    start = time.time()
+    best, history = calibrate(
+        sites, problem, popsize=2, maxiter=2, decimals=3, cache=cache, n_jobs=1, seed=0
+    )
+    print(f"calibration: {round(time.time() - start, 3)}")
+    print(history.head())
+    assert (history.objective[0] <= history.objective).all()
+    assert (best.values == history.loc[0, problem["names"]].values).all()
+
+    # the same calibration again only uses cached runs
+    n_points = len(cache)
+    best_again, history = calibrate(
+        sites, problem, popsize=2, maxiter=2, decimals=3, cache=cache, n_jobs=1, seed=0
+    )
+    assert len(cache) == n_points
+    assert best_again.equals(best)
+
+    # runs are only reused for the same observations and parameters (the
+    # second site is the same)
+    other = CalibrationSiteClass(sites[0].model, sites[0].yields * 1.1, sites[0].daily)
+    n_points = len(cache)
+    _, history = calibrate(
+        [other, sites[1]], problem, popsize=2, maxiter=0, decimals=3, cache=cache, n_jobs=1, seed=0
+    )
+    assert len(cache) == n_points + len(history)
+    n_points = len(cache)
+    swapped = {"names": problem["names"][::-1], "bounds": problem["bounds"][::-1]}
+    _, history = calibrate(
+        sites, swapped, popsize=2, maxiter=0, decimals=3, cache=cache, n_jobs=1, seed=0
+    )
+    assert len(cache) == n_points + 2 * len(history)
+
+
+def test_site_error_daily(wheat_model):
+    # daily observations are not compared with a model run without daily outputs
+    model = run_sample(wheat_model(), [], [])
+    Outputs = model.Outputs
+    daily = Outputs.Growth[["CC"]].set_index(model.ClockStruct.TimeSpan[: len(Outputs.Growth)])
+    site = CalibrationSiteClass(wheat_model(daily_outputs=False), daily=daily.iloc[::7])
+    assert site_error(model, site) == 0
+    with pytest.raises(AssertionError, match="daily outputs"):
+        site_error(run_sample(site.model, [], []), site)
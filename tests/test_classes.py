@@ -0,0 +1,26 @@
+import numpy as np
+
+from aquacrop.classes import CropClass, crop_records
+
+
+def test_crop_records(wheat_model):
+    # a record for each maximum rooting depth of the sweep, in one step
+    Zmax = np.array([0.8, 1.2, 1.6])
+    records = crop_records("Wheat", len(Zmax), Zmax=Zmax, CCx=0.9)
+    assert (records["Zmax"] == Zmax).all() and (records["CCx"] == 0.9).all()
+
+    for record, z in zip(records, Zmax):
+        crops = [
+            CropClass.from_record(record, PlantingDate="10/01"),
+            CropClass("Wheat", PlantingDate="10/01", Zmax=z, CCx=0.9),
+        ]
+        assert crops[0].__dict__.keys() == crops[1].__dict__.keys()
+
+        yields = []
+        for crop in crops:
+            model = wheat_model(Crop=crop)
+            model.initialize()
+            model.step(till_termination=True)
+            yields.append(model.Outputs.Final["Yield (tonne/ha)"].values)
+
+        assert (yields[0] == yields[1]).all()
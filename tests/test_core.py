@@ -0,0 +1,184 @@
+import time
+
+import pandas as pd
+import pytest
+
+from aquacrop.classes import SoilClass, CropClass, InitWCClass, IrrMngtClass
+from aquacrop.core import AquaCropModel
+
+
+def test_extend_end_date(tunis_weather, wheat_model):
+    full = wheat_model(f"{1981}/05/30")
+    full.initialize()
+    full.step(till_termination=True)
+
+    # start with weather up to mid season and add it day by day during the season
+    # and then in one go for the rest of the simulation
+    model = wheat_model(f"{1980}/02/01", tunis_weather[tunis_weather.Date <= f"{1980}/02/01"])
+    model.initialize()
+    model.step(till_termination=True)
+    for date in pd.date_range(f"{1980}/02/02", f"{1980}/03/31"):
+        model.extend_weather(tunis_weather[tunis_weather.Date <= date])
+        model.extend_end_date()
+        model.step(till_termination=True)
+
+    model.extend_weather(tunis_weather)
+    model.extend_end_date(f"{1981}/05/30")
+    model.step(till_termination=True)
+
+    assert model.Outputs.Water.equals(full.Outputs.Water)
+    assert model.Outputs.Flux.equals(full.Outputs.Flux)
+    assert model.Outputs.Growth.equals(full.Outputs.Growth)
+    assert model.Outputs.Final.equals(full.Outputs.Final)
+
+
+
+def test_extend_end_date_checks(tunis_weather, wheat_model):
+    model = wheat_model(f"{1980}/02/01", tunis_weather[tunis_weather.Date <= f"{1980}/02/10"])
+    model.initialize()
+    model.step(till_termination=True)
+    nSteps = model.ClockStruct.nSteps
+
+    # extensions past the weather data or before the end date fail and leave
+    # the model as it was
+    for date in [f"{1980}/03/01", f"{1980}/01/15"]:
+        with pytest.raises(AssertionError):
+            model.extend_end_date(date)
+        assert model.ClockStruct.nSteps == nSteps
+        assert len(model.ClockStruct.TimeSpan) == nSteps
+        assert model.ClockStruct.SimulationEndDate == pd.Timestamp(f"{1980}/02/01")
+
+    model.extend_end_date(f"{1980}/02/10")
+    model.step(till_termination=True)
+    assert len(model.Outputs.Flux) == nSteps + 9
+
+
+def test_crop_rotation(hyderabad_weather):
+    rice = CropClass("localpaddy", PlantingDate="07/01")
+    wheat = CropClass("Wheat", PlantingDate="11/25")
+
+    # rice-wheat rotation in one run, soil water carries over between seasons
+    model = AquaCropModel(
+        SimStartTime="2000/01/01",
+        SimEndTime="2002/06/30",
+        wdf=hyderabad_weather,
+        Soil=SoilClass("Paddy"),
+        Crop=[rice, wheat, rice, wheat],
+        InitWC=InitWCClass(depth_layer=[1, 2], value=["FC", "FC"]),
+        IrrMngt=IrrMngtClass(IrrMethod=1, SMT=[70] * 4),
+        planting_dates=["2000/07/01", "2000/11/25", "2001/07/01", "2001/11/25"],
+        harvest_dates=["2000/11/15", "2001/04/30", "2001/11/15", "2002/04/30"],
+        OffSeason=True,
+    )
+    model.initialize()
+    assert model.ParamStruct.NCrops == 2
+    assert model.ParamStruct.SeasonCrops == [0, 1, 0, 1]
+
+    model.step(till_termination=True)
+    Final = model.Outputs.Final
+    print(Final)
+    assert list(Final["Crop Type"]) == ["localpaddy", "Wheat"] * 2
+    assert (Final["Yield (tonne/ha)"] > 0).all()
+
+
+def test_update_weather(tunis_weather, wheat_model):
+    def make(wdf):
+        return wheat_model(
+            f"{1985}/05/30",
+            wdf,
+            Crop=CropClass("WheatGDD", PlantingDate="10/01"),
+            checkpoint_interval=10,
+        )
+
+    model = make(tunis_weather)
+    model.initialize()
+    model.step(till_termination=True)
+    Outputs = model.Outputs
+    Water = Outputs.Water.copy()
+
+    # forecast of the last 10 days updated
+    forecast = tunis_weather.copy()
+    days = (forecast.Date > f"{1985}/05/20") & (forecast.Date <= f"{1985}/05/30")
+    forecast.loc[days, "Precipitation"] += 5
+    forecast.loc[days, "ReferenceET"] -= 1
+
+    start = time.time()
+    first = model.update_weather(forecast)
+    t = time.time() - start
+    print(f"update weather: {round(t,4)}")
+    assert first == model.ClockStruct.TimeSpan.get_loc(f"{1985}/05/21")
+    assert model.ClockStruct.ModelTermination
+    assert Outputs.Water.iloc[:first].equals(Water.iloc[:first])
+    assert model.update_weather(forecast) is None
+
+    # a colder month changes the GDD calendar of a season that has started,
+    # which is re-simulated from before its planting date
+    cold = forecast.copy()
+    cold.loc[(cold.Date >= f"{1983}/12/01") & (cold.Date < f"{1984}/01/01"), "MaxTemp"] -= 4
+    assert model.update_weather(cold) == model.ClockStruct.TimeSpan.get_loc(f"{1983}/09/30")
+
+    def check(model, wdf):
+        ref = make(wdf)
+        ref.initialize()
+        ref.step(till_termination=True)
+        for name in ["Water", "Flux", "Growth", "Final"]:
+            assert getattr(model.Outputs, name).equals(getattr(ref.Outputs, name)), name
+
+    check(model, cold)
+
+    # model stopped before the change
+    model = make(tunis_weather)
+    model.initialize()
+    model.step(2000)
+    step = model.ClockStruct.TimeStepCounter
+    model.update_weather(forecast)
+    assert model.ClockStruct.TimeStepCounter == step
+    model.step(till_termination=True)
+    check(model, forecast)
+
+
+def test_update_weather_checkpoints(tunis_weather, wheat_model):
+    model = wheat_model(f"{1982}/05/30")
+    model.initialize()
+    model.step(till_termination=True)
+    assert len(model.checkpoints) > 1
+
+    steps = []
+    perform_timestep = model.perform_timestep
+    model.perform_timestep = lambda: steps.append(1) or perform_timestep()
+
+    # by default a late change is re-simulated from a checkpoint at most 30
+    # days before it
+    forecast = tunis_weather.copy()
+    forecast.loc[forecast.Date > f"{1982}/03/01", "Precipitation"] += 5
+    first = model.update_weather(forecast)
+    print(first, len(steps))
+    assert first > 0
+    assert 0 < len(steps) <= model.ClockStruct.TimeStepCounter + 1 - first + 30
+
+
+def test_copy(wheat_model):
+    # running copies of a model does not change its state or checkpoints
+    template = wheat_model()
+    template.initialize()
+    checkpoints = dict(template.checkpoints)
+    crops = list(template.ParamStruct.Seasonal_Crop_List)
+    calendars = template.ParamStruct.SeasonCalendars.copy()
+
+    for i in range(2):
+        model = template.copy()
+        model.step(till_termination=True)
+        assert len(model.checkpoints) > 1
+
+    assert template.checkpoints == checkpoints
+    assert template.ParamStruct.Seasonal_Crop_List == crops
+    assert template.ParamStruct.SeasonCalendars.tobytes() == calendars.tobytes()
+    assert template.ClockStruct.TimeStepCounter == 0
+
+    # and their outputs are those of a model of their own
+    model = wheat_model()
+    model.initialize()
+    model.step(till_termination=True)
+    sample = template.copy()
+    sample.step(till_termination=True)
+    assert model.Outputs.Final.equals(sample.Outputs.Final)
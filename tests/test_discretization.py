@@ -0,0 +1,57 @@
+from copy import deepcopy
+
+import numpy as np
+
+from aquacrop.classes import SoilClass, CropClass, InitWCClass, FieldMngtClass
+from aquacrop.core import AquaCropModel
+from aquacrop.discretization import coarsen_soil, optimize_compartments
+
+
+def test_compartment_coarsening(hyderabad_weather):
+    # 4 m deep paddy soil of 40 compartments in 10 alternating layers
+    soil = SoilClass("custom", dz=[0.1] * 40)
+    soil.CN = 77
+    soil.REW = 10
+    for i in range(10):
+        if i % 2 == 0:
+            soil.add_layer(0.4, 0.39, 0.54, 0.55, 2, 100)
+        else:
+            soil.add_layer(0.4, 0.10, 0.22, 0.41, 300, 100)
+
+    fm = FieldMngtClass(Bunds=True, zBund=0.2)
+    model = AquaCropModel(
+        "2000/01/01",
+        "2002/12/31",
+        hyderabad_weather,
+        soil,
+        CropClass("localpaddy", PlantingDate="08/01"),
+        InitWC=InitWCClass(value=["SAT"]),
+        FieldMngt=fm,
+        FallowFieldMngt=fm,
+    )
+
+    # compartments above the rooting depth and layer boundaries are kept
+    coarse = coarsen_soil(soil, 0.5, 0.4)
+    prof = coarse.profile
+    assert coarse.nComp == len(prof) < 40
+    assert (prof.dz[prof.zTop < 0.5] == 0.1).all()
+    assert prof.dz.max() <= 0.4
+    assert abs(prof.dzsum.iloc[-1] - 4) < 1e-9
+    filled = deepcopy(soil)
+    filled.fill_nan()
+    thickness = filled.profile.groupby("Layer").dz.sum()
+    assert prof.groupby("Layer").dz.sum().round(2).equals(thickness.round(2))
+
+    best, report = optimize_compartments(model, yield_tol=0.01, water_tol=0.01)
+    print(report)
+    assert report.nComp.iloc[0] == 40
+    assert best.nComp == report[report.accepted].nComp.min() < 40
+    accepted = report[report.accepted]
+    assert (accepted["yield error"] <= 0.01).all()
+    assert (accepted["water balance error"] <= 0.01).all()
+
+    # the same errors from a model run without daily outputs
+    model.daily_outputs = False
+    _, quiet = optimize_compartments(model, max_dz=[0.4])
+    for name in ["yield error", "water balance error"]:
+        assert np.allclose(quiet[name], report[name].iloc[[0, 2]], rtol=1e-9, atol=1e-12)
@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+from aquacrop.engine import registry, engine_info, load_kernels, _aot_mismatch
+
+
+def test_aot_mismatch():
+    load_kernels()
+    names = list(registry.kernels)
+
+    # modules built from other kernels are not loaded
+    stale = SimpleNamespace(**{name: None for name in names[1:]})
+    assert names[0] in _aot_mismatch(stale)
+    unstamped = SimpleNamespace(**{name: None for name in names})
+    assert _aot_mismatch(unstamped) == "it has no kernel stamp"
+    unstamped._kernel_stamp = lambda: 0
+    assert "changed" in _aot_mismatch(unstamped)
+
+    if engine_info()["backend"] == "aot":
+        from aquacrop import solution_aot
+
+        assert _aot_mismatch(solution_aot) is None
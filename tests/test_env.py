@@ -0,0 +1,31 @@
+import time
+
+import numpy as np
+
+from aquacrop.classes import IrrMngtClass
+from aquacrop.env import IrrigationVectorEnv
+
+
+def test_irrigation_vector_env(wheat_model):
+    IrrMngt = IrrMngtClass(IrrMethod=5)
+    IrrMngt.depth = 5.0
+    model = wheat_model(IrrMngt=IrrMngt)
+    model.initialize()
+    model.step(till_termination=True)
+
+    env = IrrigationVectorEnv(wheat_model(IrrMngt=IrrMngtClass(IrrMethod=5)), num_envs=2)
+    for episode in range(2):
+        start = time.time()
+        observations, infos = env.reset()
+        print(f"reset: {round(time.time() - start, 4)}")
+        assert observations.shape == (2, len(env.observation_names))
+
+        rewards = np.zeros(2)
+        terminated = np.zeros(2, dtype=bool)
+        while not terminated.all():
+            observations, reward, terminated, truncated, infos = env.step([5.0, 0.0])
+            rewards += reward
+
+        # a fixed daily depth is the same as irrigation method 5 in the model
+        assert env.FinalOutputs[0].Flux.equals(model.Outputs.Flux)
+        assert rewards[0] == model.Outputs.Final["Yield (tonne/ha)"].iloc[0]
@@ -0,0 +1,21 @@
+from aquacrop.classes import CropClass
+
+
+def test_seasonal_crop_list(wheat_model):
+    model = wheat_model(f"{1985}/05/30", Crop=CropClass("WheatGDD", PlantingDate="10/01"))
+    model.initialize()
+
+    # seasons share the crop's CropStruct until they start
+    crops = model.ParamStruct.Seasonal_Crop_List
+    assert all(crop is crops[0] for crop in crops)
+
+    model.step(till_termination=True)
+
+    # each season gets its own copy with its calendar and CO2 adjustment
+    crops = model.ParamStruct.Seasonal_Crop_List
+    seasons = model.ParamStruct.SeasonCalendars
+    assert len(set(map(id, crops))) == len(crops)
+    assert (seasons["fCO2"] > 0).all()
+    for crop, season in zip(crops, seasons):
+        assert crop.fCO2 == season["fCO2"]
+        assert crop.MaturityCD == season["MaturityCD"]
@@ -0,0 +1,68 @@
+import pytest
+
+from aquacrop.engine import engine_info
+from aquacrop.profiling import count_objects, measure_allocations
+
+
+def test_profiling(wheat_model):
+    outputs = []
+    for profile in [False, True, "trace"]:
+        model = wheat_model("1981/05/30", OffSeason=True, profile=profile)
+        model.initialize()
+        model.step(till_termination=True)
+        outputs.append(model.Outputs.Flux)
+
+    # profiling must not change the results
+    assert outputs[0].equals(outputs[1])
+    assert outputs[0].equals(outputs[2])
+
+    df = model.profiler.to_dataframe().set_index("Step")
+    print(df)
+    # every day runs either every step or the quiescent fallow day steps
+    days = df.Calls["solution (total)"]
+    assert df.Calls["update_time"] == days
+    quiescent = df.Calls["Quiescent fallow days"]
+    assert 0 < quiescent < days
+    steps = df.Calls.drop(
+        ["Quiescent fallow days", "update_time", "reset_initial_conditions"], errors="ignore"
+    )
+    assert (steps[~steps.index.str.startswith("solution")] + quiescent == days).all()
+
+    trace = model.profiler.to_chrome_trace()
+    assert min(e["ts"] for e in trace["traceEvents"]) == 0
+    assert len(trace["traceEvents"]) == df.Calls.sum() - days
+
+    # only the totals of each step are kept by default
+    model = wheat_model(profile=True)
+    model.initialize()
+    model.step(10)
+    assert model.profiler.events == []
+
+
+@pytest.mark.skipif(
+    engine_info()["backend"] == "jit",
+    reason="numba types the arguments of jit dispatchers on every call",
+)
+def test_step_objects(wheat_model):
+    model = wheat_model()
+    model.initialize()
+    model.step()
+
+    # no python objects are constructed by the daily steps in the growing season
+    counts = count_objects(model, 150)
+    print(counts)
+    assert counts.sum() == 0
+
+
+def test_step_allocations(wheat_model):
+    # no periodic checkpoints, they keep a copy of the state by design
+    model = wheat_model(checkpoint_interval=None)
+    model.initialize()
+    model.step()
+
+    # the memory kept by the daily steps (new state values) does not grow
+    # with the number of steps, with either engine
+    short = measure_allocations(model, 30)
+    long = measure_allocations(model, 90)
+    print(short, long)
+    assert long["Retained (B)"] < short["Retained (B)"] + 2048
@@ -0,0 +1,51 @@
+from copy import deepcopy
+import time
+
+from aquacrop.classes import IrrMngtClass
+from aquacrop.sensitivity import morris_analysis, sobol_analysis, run_sample
+
+
+def test_sensitivity(wheat_model):
+    model = wheat_model(IrrMngt=IrrMngtClass(IrrMethod=0))
+    # soil moisture targets are not used without irrigation
+    problem = {
+        "names": ["Crop.CCx", "Crop.WP", "Soil.Ksat", "IrrMngt.SMT"],
+        "bounds": [[0.8, 0.99], [13, 17], [200, 800], [0, 100]],
+    }
+
+    start = time.time()
+    morris = morris_analysis(model, problem, num_trajectories=3, n_jobs=1, chunk_size=2, seed=0)
+    print(f"morris: {round(time.time() - start, 3)}")
+    print(morris)
+    assert (morris.loc[["Crop.CCx", "Crop.WP"], "mu_star"] > 0).all()
+    assert morris.loc["IrrMngt.SMT", "mu_star"] == 0
+
+    start = time.time()
+    sobol = sobol_analysis(model, problem, N=4, n_jobs=1, chunk_size=3, seed=0)
+    print(f"sobol: {round(time.time() - start, 3)}")
+    print(sobol)
+    assert sobol.loc["Crop.WP", "ST"] > 0
+    assert sobol.loc["IrrMngt.SMT", "ST"] == 0
+
+
+def test_run_sample(wheat_model):
+    model = wheat_model(f"{1981}/05/30", IrrMngt=IrrMngtClass(IrrMethod=1, SMT=[60] * 4))
+    template = deepcopy(model)
+    template.initialize()
+
+    # a copy of the initialized template gives the same outputs as a model
+    # initialized with the parameters (Crop.Zmax extends the soil profile, so it
+    # is initialized from scratch)
+    samples = [
+        (["Crop.CCx", "Crop.WP"], [0.9, 16]),
+        (["Soil.Ksat", "Soil.th_fc"], [300, 0.25]),
+        (["Crop.CCx", "Soil.th_wp", "IrrMngt.SMT"], [0.9, 0.12, 40]),
+        (["Crop.Zmax"], [2.5]),
+    ]
+    for names, values in samples:
+        sample = run_sample(template, names, values)
+        expected = run_sample(model, names, values)
+        for name in ["Final", "Water", "Flux", "Growth"]:
+            assert getattr(sample.Outputs, name).equals(getattr(expected.Outputs, name))
+
+    assert template.ClockStruct.TimeStepCounter == 0
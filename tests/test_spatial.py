@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from aquacrop.classes import SoilClass, CropClass, InitWCClass
+from aquacrop.spatial import weather_names, run_grid
+
+
+def test_spatial_grid(tunis_weather, wheat_model):
+    weather_data = tunis_weather[
+        (tunis_weather.Date >= f"{1979}/09/01") & (tunis_weather.Date <= f"{1980}/12/31")
+    ].reset_index(drop=True)
+
+    # 3 x 4 grid with more rain towards the last cell, two soils and a cell
+    # that is not simulated
+    directory = tempfile.mkdtemp()
+    input_dir = os.path.join(directory, "inputs")
+    output_dir = os.path.join(directory, "outputs")
+    os.makedirs(input_dir)
+    rain = np.linspace(0.2, 1.5, 12).reshape(3, 4)
+    for name in weather_names:
+        grid = np.broadcast_to(weather_data[name].values, (3, 4, len(weather_data)))
+        if name == "Precipitation":
+            grid = grid * rain[:, :, np.newaxis]
+        np.save(os.path.join(input_dir, name + ".npy"), grid)
+    soil = np.zeros((3, 4), dtype=int)
+    soil[:, 2:] = 1
+    soil[0, 0] = -1
+    soil[2, 3] = 2  # no such soil, so its chunk fails
+    np.save(os.path.join(input_dir, "Soil.npy"), soil)
+
+    inputs = {
+        "Soil": [SoilClass(soilType="SandyLoam"), SoilClass(soilType="Clay")],
+        "Crop": [CropClass("Wheat", PlantingDate="10/01")],
+        "InitWC": [InitWCClass(value=["FC"])],
+    }
+    args = (input_dir, output_dir, f"{1979}/10/01", f"{1980}/05/30", f"{1979}/09/01", inputs)
+
+    start = time.time()
+    failed = run_grid(*args, chunk_shape=(2, 2), n_jobs=1, retries=1)
+    print(f"spatial grid: {round(time.time() - start, 3)}")
+    assert list(failed) == [((2, 3), (2, 4))]
+    assert isinstance(failed[(2, 3), (2, 4)], IndexError)
+
+    # only the failed chunk is run again
+    soil[2, 3] = 1
+    np.save(os.path.join(input_dir, "Soil.npy"), soil)
+    assert run_grid(*args, chunk_shape=(2, 2), n_jobs=1) == {}
+
+    Yield = np.load(os.path.join(output_dir, "Yield.npy"))
+    assert np.isnan(Yield[:, 0, 0]).all() and not np.isnan(Yield[:, 1:]).any()
+
+    wdf = weather_data.copy()
+    wdf["Precipitation"] = wdf.Precipitation * rain[2, 3]
+    model = wheat_model(wdf=wdf, Soil="Clay")
+    model.initialize()
+    model.step(till_termination=True)
+    assert (Yield[:, 2, 3] == model.Outputs.Final["Yield (tonne/ha)"].values.astype(float)).all()
+
+    shutil.rmtree(directory)
+
@@ -0,0 +1,36 @@
+import time
+
+from aquacrop.classes import SoilClass, CropClass, InitWCClass
+from aquacrop.sweep import planting_date_sweep
+
+
+def test_planting_date_sweep(tunis_weather, wheat_model):
+    planting_dates = ["10/01", "11/15"]
+
+    start = time.time()
+    results = planting_date_sweep(
+        f"{1979}/08/01",
+        f"{1982}/07/31",
+        tunis_weather,
+        SoilClass(soilType="SandyLoam"),
+        CropClass("Wheat", PlantingDate="10/01"),
+        InitWCClass(value=["FC"]),
+        planting_dates,
+        n_jobs=1,
+    )
+    print(f"planting date sweep: {round(time.time() - start, 3)}")
+    print(results.unstack())
+
+    # members forked from the shared fallow period match separate runs
+    for date in planting_dates:
+        model = wheat_model(
+            f"{1982}/07/31",
+            SimStartTime=f"{1979}/08/01",
+            Crop=CropClass("Wheat", PlantingDate=date),
+        )
+        model.initialize()
+        model.step(till_termination=True)
+        assert (
+            results.loc[date]["Yield (tonne/ha)"].values
+            == model.Outputs.Final["Yield (tonne/ha)"].values.astype(float)
+        ).all()
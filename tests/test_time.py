@@ -10,6 +10,48 @@ def test_compile_time():
     assert t < 60
 
 
+def test_import_time():
+    import subprocess
+    import sys
+    import os
+
+    # time import in a fresh interpreter so nothing is already loaded
+    script = """
+import time
+start = time.perf_counter()
+import aquacrop
+t_import = time.perf_counter() - start
+
+start = time.perf_counter()
+from aquacrop import AquaCropModel, SoilClass, CropClass, InitWCClass, prepare_weather, get_filepath
+t_engine = time.perf_counter() - start
+
+start = time.perf_counter()
+weather_data = prepare_weather(get_filepath("tunis_climate.txt"))
+model = AquaCropModel("1979/10/01", "1980/05/30", weather_data, SoilClass("SandyLoam"),
+                      CropClass("Wheat", PlantingDate="10/01"), InitWCClass(value=["FC"]))
+model.initialize()
+model.step(till_termination=True)
+t_model = time.perf_counter() - start
+print(t_import, t_engine, t_model)
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    t_import, t_engine, t_model = map(float, out.stdout.split()[-3:])
+    print(f"import aquacrop: {round(t_import,3)}")
+    print(f"import model: {round(t_engine,3)}")
+    print(f"first model run: {round(t_model,3)}")
+    print(f"total: {round(t_import+t_engine+t_model,3)}")
+    assert t_import < 1
+    assert t_import + t_engine + t_model < 60
+
+
 def test_tunis_model_run(n=1):
 
 
@@ -47,6 +89,16 @@ def test_tunis_model_run(n=1):
     print(f"total sim time for {n} repetitions: {round(t,3)}")
     assert t < 60
 
+
+def test_engine_backend():
+    from aquacrop.engine import engine_info
+    import aquacrop.timestep  # loads the kernels
+
+    info = engine_info()
+    print(f"engine: {info['backend']} (compile time: {round(info['compile_time'],3)})")
+    assert info["backend"] in ("aot", "jit")
+
+
 test_compile_time()
 test_tunis_model_run()
 test_tunis_model_run(10)